@@ -37,6 +37,14 @@ export default function StatusClient({ appId }: Props) {
         <p>
           {t('status.status')}: <strong>{status.status}</strong>
         </p>
+        {status.estimated_completion_at && (
+          <p className={styles.eta}>
+            {t('status.estimatedCompletion')}:{' '}
+            <time dateTime={status.estimated_completion_at}>
+              {new Date(status.estimated_completion_at).toLocaleString()}
+            </time>
+          </p>
+        )}
       </header>
       <div className={styles.cards}>
         <article>
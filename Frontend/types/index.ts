@@ -15,6 +15,7 @@ export interface KycApplication {
   updated_at: string;
   risk_score?: number; // 0.0 to 1.0
   drpa_level?: 'low' | 'medium' | 'high';
+  estimated_completion_at?: string; // ISO 8601, while processing
 }
 
 export interface ApplicationSummary {
@@ -0,0 +1,51 @@
+"""Checkpointed pipeline stages."""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = "0002_pipeline_stages"
+down_revision = "0001_init"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Apply migration."""
+
+    op.create_table(
+        "pipeline_stages",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.func.now(),
+        ),
+        sa.Column(
+            "application_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("kyc_applications.id"),
+            nullable=False,
+        ),
+        sa.Column("stage", sa.String(length=32), nullable=False),
+        sa.Column("status", sa.String(length=16), nullable=False, server_default="PENDING"),
+        sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("output", sa.JSON()),
+        sa.Column("error", sa.Text()),
+    )
+    op.create_unique_constraint(
+        "uq_pipeline_stage", "pipeline_stages", ["application_id", "stage"]
+    )
+    op.create_index(
+        "ix_pipeline_stages_application_id", "pipeline_stages", ["application_id"]
+    )
+
+
+def downgrade() -> None:
+    """Rollback migration."""
+
+    op.drop_table("pipeline_stages")
@@ -0,0 +1,25 @@
+"""Keyset indexes for compliance exports."""
+
+from __future__ import annotations
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0003_export_indexes"
+down_revision = "0002_pipeline_stages"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Apply migration."""
+
+    op.create_index("idx_applications_created", "kyc_applications", ["created_at", "id"])
+    op.create_index("idx_audit_created", "audit_logs", ["created_at", "id"])
+
+
+def downgrade() -> None:
+    """Rollback migration."""
+
+    op.drop_index("idx_audit_created", table_name="audit_logs")
+    op.drop_index("idx_applications_created", table_name="kyc_applications")
@@ -0,0 +1,101 @@
+"""Range-partition audit_logs by month of created_at."""
+
+from __future__ import annotations
+
+from datetime import date
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0004_partition_audit_logs"
+down_revision = "0003_export_indexes"
+branch_labels = None
+depends_on = None
+
+# Partitions created beyond the current month; the worker keeps this horizon
+# topped up afterwards (app.services.audit_partitions.ensure_partitions).
+MONTHS_AHEAD = 3
+COLUMNS = "id, application_id, actor, action, payload, log_hash, external_audit_id, created_at"
+
+
+def _add_months(value: date, months: int) -> date:
+    index = value.year * 12 + value.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def upgrade() -> None:
+    """Apply migration."""
+
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        return
+
+    op.execute("ALTER TABLE audit_logs RENAME TO audit_logs_unpartitioned")
+    op.execute("ALTER INDEX idx_audit_application RENAME TO idx_audit_application_old")
+    op.execute("ALTER INDEX idx_audit_created RENAME TO idx_audit_created_old")
+    op.execute("UPDATE audit_logs_unpartitioned SET created_at = now() WHERE created_at IS NULL")
+    op.execute(
+        """
+        CREATE TABLE audit_logs (
+            id UUID NOT NULL,
+            application_id UUID REFERENCES kyc_applications (id),
+            actor VARCHAR(128) NOT NULL,
+            action VARCHAR(128) NOT NULL,
+            payload JSON,
+            log_hash VARCHAR(256),
+            external_audit_id VARCHAR(128),
+            created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+            PRIMARY KEY (created_at, id)
+        ) PARTITION BY RANGE (created_at)
+        """
+    )
+    op.create_index("idx_audit_application", "audit_logs", ["application_id", "created_at"])
+    op.create_index("idx_audit_created", "audit_logs", ["created_at", "id"])
+
+    oldest = bind.execute(sa.text("SELECT min(created_at) FROM audit_logs_unpartitioned")).scalar()
+    today = date.today().replace(day=1)
+    month = date(oldest.year, oldest.month, 1) if oldest else today
+    while month <= _add_months(today, MONTHS_AHEAD):
+        following = _add_months(month, 1)
+        op.execute(
+            f"CREATE TABLE audit_logs_y{month.year:04d}m{month.month:02d} "
+            f"PARTITION OF audit_logs FOR VALUES FROM ('{month}') TO ('{following}')"
+        )
+        month = following
+
+    op.execute(
+        f"INSERT INTO audit_logs ({COLUMNS}) SELECT {COLUMNS} FROM audit_logs_unpartitioned"
+    )
+    op.execute("DROP TABLE audit_logs_unpartitioned")
+
+
+def downgrade() -> None:
+    """Rollback migration."""
+
+    if op.get_bind().dialect.name != "postgresql":
+        return
+
+    op.execute("ALTER TABLE audit_logs RENAME TO audit_logs_partitioned")
+    op.execute("ALTER INDEX idx_audit_application RENAME TO idx_audit_application_part")
+    op.execute("ALTER INDEX idx_audit_created RENAME TO idx_audit_created_part")
+    op.execute(
+        """
+        CREATE TABLE audit_logs (
+            id UUID PRIMARY KEY,
+            application_id UUID REFERENCES kyc_applications (id),
+            actor VARCHAR(128) NOT NULL,
+            action VARCHAR(128) NOT NULL,
+            payload JSON,
+            log_hash VARCHAR(256),
+            external_audit_id VARCHAR(128),
+            created_at TIMESTAMPTZ DEFAULT now()
+        )
+        """
+    )
+    op.execute(
+        f"INSERT INTO audit_logs ({COLUMNS}) SELECT {COLUMNS} FROM audit_logs_partitioned"
+    )
+    op.execute("DROP TABLE audit_logs_partitioned CASCADE")
+    op.create_index("idx_audit_application", "audit_logs", ["application_id"])
+    op.create_index("idx_audit_created", "audit_logs", ["created_at", "id"])
@@ -0,0 +1,41 @@
+"""JSONB for OCR output and audit payloads, with reviewer search indexes."""
+
+from __future__ import annotations
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0005_jsonb_documents"
+down_revision = "0004_partition_audit_logs"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Apply migration."""
+
+    if op.get_bind().dialect.name != "postgresql":
+        return
+
+    op.execute("ALTER TABLE documents ALTER COLUMN ocr_json TYPE JSONB USING ocr_json::jsonb")
+    op.execute("ALTER TABLE audit_logs ALTER COLUMN payload TYPE JSONB USING payload::jsonb")
+    # Must stay identical to the expressions in app.models so the planner matches them.
+    op.execute(
+        "CREATE INDEX ix_documents_ocr_name ON documents (lower((ocr_json ->> 'name')))"
+    )
+    op.execute(
+        "CREATE INDEX ix_documents_ocr_document_number "
+        "ON documents ((ocr_json ->> 'document_number'))"
+    )
+
+
+def downgrade() -> None:
+    """Rollback migration."""
+
+    if op.get_bind().dialect.name != "postgresql":
+        return
+
+    op.drop_index("ix_documents_ocr_document_number", table_name="documents")
+    op.drop_index("ix_documents_ocr_name", table_name="documents")
+    op.execute("ALTER TABLE audit_logs ALTER COLUMN payload TYPE JSON USING payload::json")
+    op.execute("ALTER TABLE documents ALTER COLUMN ocr_json TYPE JSON USING ocr_json::json")
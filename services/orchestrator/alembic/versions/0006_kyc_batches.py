@@ -0,0 +1,53 @@
+"""Batch submissions of KYC applications."""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = "0006_kyc_batches"
+down_revision = "0005_jsonb_documents"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Apply migration."""
+
+    op.create_table(
+        "kyc_batches",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column(
+            "submitted_by",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("users.id"),
+            nullable=False,
+        ),
+        sa.Column("total", sa.Integer(), nullable=False),
+        sa.Column("completed_at", sa.DateTime(timezone=True)),
+    )
+    op.create_index("ix_kyc_batches_submitted_by", "kyc_batches", ["submitted_by"])
+    op.add_column(
+        "kyc_applications",
+        sa.Column(
+            "batch_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("kyc_batches.id"),
+            nullable=True,
+        ),
+    )
+    op.add_column("kyc_applications", sa.Column("external_ref", sa.String(length=128)))
+    op.create_index("ix_kyc_applications_batch_id", "kyc_applications", ["batch_id"])
+
+
+def downgrade() -> None:
+    """Rollback migration."""
+
+    op.drop_index("ix_kyc_applications_batch_id", table_name="kyc_applications")
+    op.drop_column("kyc_applications", "external_ref")
+    op.drop_column("kyc_applications", "batch_id")
+    op.drop_table("kyc_batches")
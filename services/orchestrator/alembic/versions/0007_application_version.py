@@ -0,0 +1,27 @@
+"""Optimistic-concurrency version on KYC applications."""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0007_application_version"
+down_revision = "0006_kyc_batches"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Apply migration."""
+
+    op.add_column(
+        "kyc_applications",
+        sa.Column("version", sa.Integer(), nullable=False, server_default="1"),
+    )
+
+
+def downgrade() -> None:
+    """Rollback migration."""
+
+    op.drop_column("kyc_applications", "version")
@@ -0,0 +1,49 @@
+"""Reviewer leases on flagged applications."""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = "0008_review_claims"
+down_revision = "0007_application_version"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Apply migration."""
+
+    op.add_column(
+        "kyc_applications",
+        sa.Column(
+            "claimed_by",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("users.id"),
+            nullable=True,
+        ),
+    )
+    op.add_column("kyc_applications", sa.Column("claimed_at", sa.DateTime(timezone=True)))
+    op.add_column("kyc_applications", sa.Column("claim_expires_at", sa.DateTime(timezone=True)))
+    op.execute(
+        "CREATE INDEX idx_applications_flagged_risk ON kyc_applications "
+        "(risk_score DESC NULLS LAST, created_at) WHERE status = 'FLAGGED'"
+    )
+    op.create_index(
+        "idx_applications_flagged_age",
+        "kyc_applications",
+        ["created_at"],
+        postgresql_where=sa.text("status = 'FLAGGED'"),
+    )
+
+
+def downgrade() -> None:
+    """Rollback migration."""
+
+    op.drop_index("idx_applications_flagged_age", table_name="kyc_applications")
+    op.drop_index("idx_applications_flagged_risk", table_name="kyc_applications")
+    op.drop_column("kyc_applications", "claim_expires_at")
+    op.drop_column("kyc_applications", "claimed_at")
+    op.drop_column("kyc_applications", "claimed_by")
@@ -0,0 +1,55 @@
+"""Precomputed application counters for dashboard aggregates."""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = "0009_application_counters"
+down_revision = "0008_review_claims"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Apply migration."""
+
+    op.create_table(
+        "application_counters",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("status", sa.String(32), nullable=False),
+        sa.Column("method", sa.String(32), nullable=False),
+        sa.Column("drpa_level", sa.String(16), nullable=False, server_default=""),
+        sa.Column("risk_bucket", sa.Integer(), nullable=False, server_default="-1"),
+        sa.Column("count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.UniqueConstraint(
+            "status", "method", "drpa_level", "risk_bucket", name="uq_application_counter"
+        ),
+    )
+    # Backfill with the same bucketing as app.services.queue_stats.
+    op.execute(
+        """
+        INSERT INTO application_counters (id, status, method, drpa_level, risk_bucket, count)
+        SELECT gen_random_uuid(), status, method, drpa_level, risk_bucket, count(*)
+        FROM (
+            SELECT status, method, coalesce(drpa_level, '') AS drpa_level,
+                   CASE
+                       WHEN risk_score IS NULL THEN -1
+                       WHEN risk_score < 0 THEN 0
+                       WHEN risk_score >= 100 THEN 9
+                       ELSE risk_score / 10
+                   END AS risk_bucket
+            FROM kyc_applications
+        ) AS keyed
+        GROUP BY status, method, drpa_level, risk_bucket
+        """
+    )
+
+
+def downgrade() -> None:
+    """Rollback migration."""
+
+    op.drop_table("application_counters")
@@ -0,0 +1,26 @@
+"""Stored face embeddings for duplicate-identity detection."""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0010_face_embeddings"
+down_revision = "0009_application_counters"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Apply migration."""
+
+    op.add_column("face_match", sa.Column("embedding", sa.LargeBinary(), nullable=True))
+    op.create_index("idx_face_match_created", "face_match", ["created_at", "id"])
+
+
+def downgrade() -> None:
+    """Rollback migration."""
+
+    op.drop_index("idx_face_match_created", table_name="face_match")
+    op.drop_column("face_match", "embedding")
@@ -0,0 +1,41 @@
+"""Perceptual hashes and near-duplicate matches on documents."""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = "0011_document_phash"
+down_revision = "0010_face_embeddings"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Apply migration."""
+
+    op.add_column("documents", sa.Column("phash", sa.BigInteger(), nullable=True))
+    op.add_column(
+        "documents",
+        sa.Column(
+            "near_duplicates",
+            sa.JSON().with_variant(postgresql.JSONB(), "postgresql"),
+            nullable=True,
+        ),
+    )
+    op.create_index(
+        "idx_documents_phash_created",
+        "documents",
+        ["created_at", "id"],
+        postgresql_where=sa.text("phash IS NOT NULL"),
+    )
+
+
+def downgrade() -> None:
+    """Rollback migration."""
+
+    op.drop_index("idx_documents_phash_created", table_name="documents")
+    op.drop_column("documents", "near_duplicates")
+    op.drop_column("documents", "phash")
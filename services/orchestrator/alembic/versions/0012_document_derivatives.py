@@ -0,0 +1,32 @@
+"""Stored reviewer thumbnails and previews of documents."""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = "0012_document_derivatives"
+down_revision = "0011_document_phash"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Apply migration."""
+
+    op.add_column(
+        "documents",
+        sa.Column(
+            "derivatives",
+            sa.JSON().with_variant(postgresql.JSONB(), "postgresql"),
+            nullable=True,
+        ),
+    )
+
+
+def downgrade() -> None:
+    """Rollback migration."""
+
+    op.drop_column("documents", "derivatives")
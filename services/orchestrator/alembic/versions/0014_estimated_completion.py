@@ -0,0 +1,27 @@
+"""Estimated completion time of admitted applications."""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0014_estimated_completion"
+down_revision = "0013_upload_sessions"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Apply migration."""
+
+    op.add_column(
+        "kyc_applications",
+        sa.Column("estimated_completion_at", sa.DateTime(timezone=True), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    """Rollback migration."""
+
+    op.drop_column("kyc_applications", "estimated_completion_at")
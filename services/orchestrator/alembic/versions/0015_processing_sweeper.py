@@ -0,0 +1,34 @@
+"""Partial index and rescue counter for the stuck-application sweeper."""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0015_processing_sweeper"
+down_revision = "0014_estimated_completion"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Apply migration."""
+
+    op.add_column(
+        "kyc_applications",
+        sa.Column("rescue_count", sa.Integer(), nullable=False, server_default="0"),
+    )
+    op.create_index(
+        "idx_applications_processing_updated",
+        "kyc_applications",
+        ["updated_at"],
+        postgresql_where=sa.text("status = 'PROCESSING'"),
+    )
+
+
+def downgrade() -> None:
+    """Rollback migration."""
+
+    op.drop_index("idx_applications_processing_updated", table_name="kyc_applications")
+    op.drop_column("kyc_applications", "rescue_count")
@@ -0,0 +1,36 @@
+"""DEFAULT partition for audit_logs, so writes never fail for a missing month."""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0016_audit_default_partition"
+down_revision = "0015_processing_sweeper"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Apply migration."""
+
+    if op.get_bind().dialect.name != "postgresql":
+        return
+
+    op.execute("CREATE TABLE IF NOT EXISTS audit_logs_default PARTITION OF audit_logs DEFAULT")
+
+
+def downgrade() -> None:
+    """Rollback migration."""
+
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        return
+
+    rows = bind.execute(sa.text("SELECT count(*) FROM audit_logs_default")).scalar()
+    if rows:
+        raise RuntimeError(
+            f"audit_logs_default holds {rows} rows; run maintain_audit_partitions first"
+        )
+    op.execute("DROP TABLE audit_logs_default")
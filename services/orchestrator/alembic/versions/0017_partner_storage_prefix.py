@@ -0,0 +1,24 @@
+"""Storage prefix of partner accounts, which may submit batches."""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0017_partner_storage_prefix"
+down_revision = "0016_audit_default_partition"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Apply migration."""
+
+    op.add_column("users", sa.Column("storage_prefix", sa.String(512), nullable=True))
+
+
+def downgrade() -> None:
+    """Rollback migration."""
+
+    op.drop_column("users", "storage_prefix")
@@ -81,6 +81,18 @@ async def get_current_user(
     return await _get_user_from_token(token, session)
 
 
+async def get_current_partner(
+    current_user: Annotated[User, Depends(get_current_user)],
+) -> User:
+    """Ensure the current user is a partner (has a storage prefix) or staff."""
+
+    if current_user.storage_prefix is None and not current_user.is_staff:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail="Partner access required"
+        )
+    return current_user
+
+
 async def get_current_staff(
     current_user: Annotated[User, Depends(get_current_user)],
 ) -> User:
@@ -5,13 +5,18 @@ from __future__ import annotations
 import base64
 import json
 import logging
+import threading
+import time
+from dataclasses import dataclass
 from pathlib import Path
 from typing import Any
 
 import httpx
 from tenacity import RetryError, retry, retry_if_exception_type, stop_after_attempt, wait_exponential
 
+from . import metrics
 from .config import settings
+from .instrumentation import record_downstream
 
 logger = logging.getLogger(__name__)
 ROOT_DIR = Path(__file__).resolve().parents[1]
@@ -22,6 +27,72 @@ class ClientError(RuntimeError):
     """Custom exception for downstream client failures."""
 
 
+class CircuitOpenError(ClientError):
+    """Raised without calling the service while its circuit is open."""
+
+
+@dataclass
+class _Circuit:
+    """Consecutive-failure circuit breaker state for one service.
+
+    ``probe_at`` is set while a half-open trial call is in flight.
+    """
+
+    failures: int = 0
+    opened_at: float | None = None
+    probe_at: float | None = None
+
+
+_circuits: dict[str, _Circuit] = {}
+_circuits_lock = threading.Lock()
+
+
+def _check_circuit(service: str) -> None:
+    """Fail fast while the service's circuit is open.
+
+    Once ``CIRCUIT_RESET_SECONDS`` have passed, a single trial call goes
+    through and the others keep failing fast until its outcome closes or
+    re-opens the circuit. A trial whose outcome is never recorded is
+    replaced after another reset period.
+    """
+
+    reset = settings.circuit_reset_seconds
+    with _circuits_lock:
+        circuit = _circuits.setdefault(service, _Circuit())
+        if circuit.opened_at is None:
+            return
+        now = time.monotonic()
+        if now - circuit.opened_at >= reset and (
+            circuit.probe_at is None or now - circuit.probe_at >= reset
+        ):
+            circuit.probe_at = now
+            return
+    raise CircuitOpenError(f"Circuit open for {service}")
+
+
+def _record_outcome(service: str, *, ok: bool) -> None:
+    """Update the service's circuit after a call."""
+
+    with _circuits_lock:
+        circuit = _circuits.setdefault(service, _Circuit())
+        if ok:
+            circuit.failures = 0
+            circuit.opened_at = None
+            circuit.probe_at = None
+            return
+        circuit.failures += 1
+        if circuit.probe_at is not None:
+            # The half-open trial failed: stay open for another reset period.
+            circuit.opened_at = time.monotonic()
+            circuit.probe_at = None
+            metrics.CIRCUIT_TRIPS.labels(service).inc()
+            logger.warning("Circuit re-opened for %s after a failed trial call", service)
+        elif circuit.failures >= settings.circuit_failure_threshold and circuit.opened_at is None:
+            circuit.opened_at = time.monotonic()
+            metrics.CIRCUIT_TRIPS.labels(service).inc()
+            logger.warning("Circuit opened for %s after %s failures", service, circuit.failures)
+
+
 def _stub_payload(name: str) -> dict[str, Any]:
     """Load JSON stub payloads when USE_STUBS is enabled."""
 
@@ -44,32 +115,64 @@ def _should_retry(response: httpx.Response) -> bool:
 
 
 def _request_with_retry(
+    service: str,
     method: str,
     url: str,
     **kwargs: Any,
 ) -> httpx.Response:
-    """Perform HTTP request with retry + logging."""
+    """Perform HTTP request with retry + logging.
+
+    The total time including retries is attributed to ``service`` for the
+    current request or task. Calls fail fast with :class:`CircuitOpenError`
+    after repeated failures until ``CIRCUIT_RESET_SECONDS`` have passed.
+    """
+
+    _check_circuit(service)
 
     @retry(
         stop=stop_after_attempt(3),
         wait=wait_exponential(multiplier=1, min=1, max=4),
         retry=retry_if_exception_type((httpx.RequestError, ClientError)),
+        before_sleep=lambda _: metrics.DOWNSTREAM_RETRIES.labels(service).inc(),
         reraise=True,
     )
     def _do_request() -> httpx.Response:
         with _http_client() as client:
             logger.debug("HTTP %s %s", method, url)
-            response = client.request(method, url, **kwargs)
+            attempt_started = time.perf_counter()
+            try:
+                response = client.request(method, url, **kwargs)
+            except httpx.RequestError:
+                metrics.DOWNSTREAM_LATENCY.labels(service, "error").observe(
+                    time.perf_counter() - attempt_started
+                )
+                raise
+            metrics.DOWNSTREAM_LATENCY.labels(service, str(response.status_code)).observe(
+                time.perf_counter() - attempt_started
+            )
             if _should_retry(response):
                 logger.warning("Retryable status %s from %s", response.status_code, url)
                 raise ClientError(f"Retryable status {response.status_code}")
             response.raise_for_status()
             return response
 
+    started = time.perf_counter()
     try:
-        return _do_request()
+        response = _do_request()
     except RetryError as exc:  # pragma: no cover - defensive logging
+        _record_outcome(service, ok=False)
         raise ClientError(f"Failed calling {url}") from exc
+    except httpx.HTTPStatusError as exc:
+        # 4xx responses mean the service is up; only 5xx count against it.
+        _record_outcome(service, ok=exc.response.status_code < 500)
+        raise
+    except (httpx.HTTPError, ClientError):
+        _record_outcome(service, ok=False)
+        raise
+    finally:
+        record_downstream(service, time.perf_counter() - started)
+    _record_outcome(service, ok=True)
+    return response
 
 
 def upload_to_storage(file_bytes: bytes, filename: str) -> dict[str, Any]:
@@ -82,6 +185,7 @@ def upload_to_storage(file_bytes: bytes, filename: str) -> dict[str, Any]:
 
     files = {"file": (filename, file_bytes)}
     response = _request_with_retry(
+        "storage",
         "POST",
         f"{settings.service_urls.storage}/store/upload",
         files=files,
@@ -89,6 +193,22 @@ def upload_to_storage(file_bytes: bytes, filename: str) -> dict[str, Any]:
     return response.json()
 
 
+def download_from_storage(storage_path: str) -> bytes:
+    """Fetch a stored file from Storage service."""
+
+    if settings.use_stubs:
+        # Stub uploads are not kept, so there is nothing real to return.
+        return b"stub"
+
+    response = _request_with_retry(
+        "storage",
+        "GET",
+        f"{settings.service_urls.storage}/store/download",
+        params={"path": storage_path},
+    )
+    return response.content
+
+
 def call_ocr_service(
     application_id: str,
     doc_type: str,
@@ -105,6 +225,7 @@ def call_ocr_service(
 
     encoded = base64.b64encode(image_bytes).decode()
     response = _request_with_retry(
+        "ocr",
         "POST",
         f"{settings.service_urls.ocr}/infer/document",
         json={
@@ -130,6 +251,7 @@ def call_facematch_service(
         return payload
 
     response = _request_with_retry(
+        "facematch",
         "POST",
         f"{settings.service_urls.facematch}/face/match",
         json={
@@ -156,6 +278,7 @@ def call_risk_service(
         return payload
 
     response = _request_with_retry(
+        "risk",
         "POST",
         f"{settings.service_urls.risk}/score",
         json={
@@ -176,6 +299,7 @@ def call_audit_append(payload: dict[str, Any]) -> dict[str, Any]:
         return stub
 
     response = _request_with_retry(
+        "audit",
         "POST",
         f"{settings.service_urls.audit}/audit/append",
         json=payload,
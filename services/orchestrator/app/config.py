@@ -32,6 +32,15 @@ class Settings(BaseSettings):
     """Runtime configuration loaded from environment variables."""
 
     database_url: str = Field(alias="DATABASE_URL")
+    database_replica_url: Optional[str] = Field(None, alias="DATABASE_REPLICA_URL")
+    db_pool_size: PositiveInt = Field(10, alias="DB_POOL_SIZE")
+    db_max_overflow: int = Field(10, alias="DB_MAX_OVERFLOW")
+    db_pool_recycle: int = Field(1800, alias="DB_POOL_RECYCLE")
+    db_pool_timeout: PositiveInt = Field(30, alias="DB_POOL_TIMEOUT")
+    db_pool_pre_ping: bool = Field(False, alias="DB_POOL_PRE_PING")
+    db_statement_cache_size: int = Field(500, alias="DB_STATEMENT_CACHE_SIZE")
+    worker_db_pool_size: PositiveInt = Field(2, alias="WORKER_DB_POOL_SIZE")
+    worker_db_max_overflow: int = Field(2, alias="WORKER_DB_MAX_OVERFLOW")
     redis_url: str = Field(alias="REDIS_URL")
     secret_key: str = Field(alias="SECRET_KEY")
     access_token_expire_minutes: PositiveInt = Field(
@@ -42,6 +51,69 @@ class Settings(BaseSettings):
     orchestrator_port: PositiveInt = Field(8000, alias="ORCHESTRATOR_PORT")
     risk_approve_threshold: int = Field(50, alias="RISK_APPROVE_THRESHOLD")
     process_timeout: int = Field(60, alias="PROCESS_TIMEOUT")
+    pipeline_retry_backoff: PositiveInt = Field(5, alias="PIPELINE_RETRY_BACKOFF")
+    pipeline_retry_backoff_max: PositiveInt = Field(300, alias="PIPELINE_RETRY_BACKOFF_MAX")
+    circuit_failure_threshold: PositiveInt = Field(5, alias="CIRCUIT_FAILURE_THRESHOLD")
+    circuit_reset_seconds: PositiveInt = Field(30, alias="CIRCUIT_RESET_SECONDS")
+    worker_metrics_port: int = Field(9102, alias="WORKER_METRICS_PORT")
+    audit_partition_months_ahead: PositiveInt = Field(3, alias="AUDIT_PARTITION_MONTHS_AHEAD")
+    audit_retention_months: PositiveInt = Field(24, alias="AUDIT_RETENTION_MONTHS")
+    audit_archive_dir: Path = Field(Path("audit_archive"), alias="AUDIT_ARCHIVE_DIR")
+    audit_maintenance_interval: PositiveInt = Field(3600, alias="AUDIT_MAINTENANCE_INTERVAL")
+    counter_reconcile_interval: PositiveInt = Field(900, alias="COUNTER_RECONCILE_INTERVAL")
+    review_lease_seconds: PositiveInt = Field(900, alias="REVIEW_LEASE_SECONDS")
+    review_claim_max: PositiveInt = Field(50, alias="REVIEW_CLAIM_MAX")
+    batch_max_applications: PositiveInt = Field(500, alias="BATCH_MAX_APPLICATIONS")
+    sanctions_list_path: Optional[Path] = Field(None, alias="SANCTIONS_LIST_PATH")
+    sanctions_match_threshold: float = Field(0.85, alias="SANCTIONS_MATCH_THRESHOLD")
+    sanctions_reload_interval: PositiveInt = Field(60, alias="SANCTIONS_RELOAD_INTERVAL")
+    face_duplicate_threshold: float = Field(0.9, alias="FACE_DUPLICATE_THRESHOLD")
+    face_duplicate_top_k: PositiveInt = Field(5, alias="FACE_DUPLICATE_TOP_K")
+    face_index_ivf_threshold: PositiveInt = Field(50_000, alias="FACE_INDEX_IVF_THRESHOLD")
+    face_index_nprobe: PositiveInt = Field(8, alias="FACE_INDEX_NPROBE")
+    face_index_refresh_interval: int = Field(5, alias="FACE_INDEX_REFRESH_INTERVAL")
+    face_index_rebuild_interval: PositiveInt = Field(3600, alias="FACE_INDEX_REBUILD_INTERVAL")
+    document_phash_max_distance: int = Field(8, ge=0, le=32, alias="DOCUMENT_PHASH_MAX_DISTANCE")
+    document_hash_refresh_interval: int = Field(5, alias="DOCUMENT_HASH_REFRESH_INTERVAL")
+    document_hash_rebuild_interval: PositiveInt = Field(
+        3600, alias="DOCUMENT_HASH_REBUILD_INTERVAL"
+    )
+    image_ocr_max_side: PositiveInt = Field(2000, alias="IMAGE_OCR_MAX_SIDE")
+    image_face_max_side: PositiveInt = Field(800, alias="IMAGE_FACE_MAX_SIDE")
+    image_thumbnail_max_side: PositiveInt = Field(320, alias="IMAGE_THUMBNAIL_MAX_SIDE")
+    image_preview_max_side: PositiveInt = Field(1280, alias="IMAGE_PREVIEW_MAX_SIDE")
+    image_jpeg_quality: int = Field(85, ge=1, le=95, alias="IMAGE_JPEG_QUALITY")
+    image_process_workers: int = Field(2, ge=0, alias="IMAGE_PROCESS_WORKERS")
+    image_cache_dir: Path = Field(Path("image_cache"), alias="IMAGE_CACHE_DIR")
+    image_cache_max_mb: PositiveInt = Field(1024, alias="IMAGE_CACHE_MAX_MB")
+    admission_enabled: bool = Field(True, alias="ADMISSION_ENABLED")
+    admission_queue_limits: dict[str, PositiveInt] = Field(
+        default_factory=lambda: {"doc": 5000, "ssi": 5000, "branch": 20000},
+        alias="ADMISSION_QUEUE_LIMITS",
+    )
+    admission_max_wait: dict[str, PositiveInt] = Field(
+        default_factory=lambda: {"doc": 3600, "ssi": 3600, "branch": 14400},
+        alias="ADMISSION_MAX_WAIT",
+    )
+    admission_window_seconds: int = Field(300, ge=10, alias="ADMISSION_WINDOW_SECONDS")
+    admission_probe_interval: float = Field(2.0, ge=0, alias="ADMISSION_PROBE_INTERVAL")
+    admission_retry_after_max: PositiveInt = Field(900, alias="ADMISSION_RETRY_AFTER_MAX")
+    sweeper_interval: PositiveInt = Field(300, alias="SWEEPER_INTERVAL")
+    sweeper_stuck_seconds: PositiveInt = Field(1800, alias="SWEEPER_STUCK_SECONDS")
+    sweeper_batch_size: PositiveInt = Field(100, alias="SWEEPER_BATCH_SIZE")
+    sweeper_max_per_run: PositiveInt = Field(1000, alias="SWEEPER_MAX_PER_RUN")
+    sweeper_max_rescues: PositiveInt = Field(3, alias="SWEEPER_MAX_RESCUES")
+    events_enabled: bool = Field(True, alias="EVENTS_ENABLED")
+    events_stream: str = Field("orchestrator:events", alias="EVENTS_STREAM")
+    events_retention_seconds: PositiveInt = Field(7 * 86_400, alias="EVENTS_RETENTION_SECONDS")
+    events_batch_size: PositiveInt = Field(100, alias="EVENTS_BATCH_SIZE")
+    events_linger_ms: float = Field(20, ge=0, alias="EVENTS_LINGER_MS")
+    events_max_buffer: PositiveInt = Field(10_000, alias="EVENTS_MAX_BUFFER")
+    events_socket_timeout: float = Field(2.0, gt=0, alias="EVENTS_SOCKET_TIMEOUT")
+    upload_temp_dir: Path = Field(Path("upload_tmp"), alias="UPLOAD_TEMP_DIR")
+    upload_max_bytes: PositiveInt = Field(25 * 1024 * 1024, alias="UPLOAD_MAX_BYTES")
+    upload_session_ttl: PositiveInt = Field(86_400, alias="UPLOAD_SESSION_TTL")
+    upload_purge_interval: PositiveInt = Field(3600, alias="UPLOAD_PURGE_INTERVAL")
     use_stubs: bool = Field(False, alias="USE_STUBS")
     service_urls: ServiceURLs
     allowed_origins: list[str] = Field(default_factory=lambda: ["*"])
@@ -4,7 +4,9 @@ from __future__ import annotations
 
 import logging
 from collections.abc import AsyncGenerator
+from typing import Any
 
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.asyncio import (
     AsyncEngine,
     AsyncSession,
@@ -13,26 +15,97 @@ from sqlalchemy.ext.asyncio import (
 )
 
 from .config import settings
+from .instrumentation import instrument_engine
 
 logger = logging.getLogger(__name__)
 
 
-def get_engine() -> AsyncEngine:
+def _engine_options(url: str, *, pool_size: int, max_overflow: int) -> dict[str, Any]:
+    """Pool and driver options for ``url``.
+
+    Pre-ping is off by default: it costs a round-trip per checkout. Stale
+    connections are instead retired by ``pool_recycle``, and a disconnect
+    error invalidates the pool so the next checkout reconnects. LIFO
+    checkout keeps a small hot set of connections, so surplus idle ones age
+    out rather than all being kept barely alive.
+    """
+
+    parsed = make_url(url)
+    options: dict[str, Any] = {"pool_pre_ping": settings.db_pool_pre_ping}
+    if parsed.get_backend_name() != "sqlite":
+        options.update(
+            pool_size=pool_size,
+            max_overflow=max_overflow,
+            pool_recycle=settings.db_pool_recycle,
+            pool_timeout=settings.db_pool_timeout,
+            pool_use_lifo=True,
+        )
+    if parsed.get_driver_name() == "asyncpg":
+        # SQLAlchemy prepares each statement once per connection and reuses
+        # it; set to 0 when connecting through PgBouncer in transaction mode.
+        options["connect_args"] = {
+            "prepared_statement_cache_size": settings.db_statement_cache_size
+        }
+    return options
+
+
+def get_engine(
+    url: str | None = None,
+    *,
+    pool_size: int | None = None,
+    max_overflow: int | None = None,
+) -> AsyncEngine:
     """Create a new SQLAlchemy async engine."""
 
+    url = url or settings.database_url
     engine = create_async_engine(
-        settings.database_url,
-        pool_pre_ping=True,
+        url,
         echo=False,
         future=True,
+        **_engine_options(
+            url,
+            pool_size=pool_size or settings.db_pool_size,
+            max_overflow=settings.db_max_overflow if max_overflow is None else max_overflow,
+        ),
     )
-    logger.info("Async engine created for %s", settings.database_url)
+    instrument_engine(engine)
+    logger.info("Async engine created for %s", make_url(url).render_as_string())
     return engine
 
 
 engine: AsyncEngine = get_engine()
 SessionLocal = async_sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
 
+# Read-only queries go to the replica when one is configured. Replicas lag,
+# so only use this for reads that tolerate slightly stale data.
+read_engine: AsyncEngine = (
+    get_engine(settings.database_replica_url) if settings.database_replica_url else engine
+)
+ReadSessionLocal = async_sessionmaker(read_engine, expire_on_commit=False, class_=AsyncSession)
+
+
+def configure_engines(*, pool_size: int, max_overflow: int) -> None:
+    """Rebind both session factories to new engines with the given pool size.
+
+    Used by worker processes, which size their pools separately from the
+    API and must not share connections inherited across a fork.
+    """
+
+    global engine, read_engine
+    for inherited in {engine, read_engine}:
+        # Drop pooled connections without closing them; they belong to the parent.
+        inherited.sync_engine.dispose(close=False)
+    engine = get_engine(pool_size=pool_size, max_overflow=max_overflow)
+    read_engine = (
+        get_engine(
+            settings.database_replica_url, pool_size=pool_size, max_overflow=max_overflow
+        )
+        if settings.database_replica_url
+        else engine
+    )
+    SessionLocal.configure(bind=engine)
+    ReadSessionLocal.configure(bind=read_engine)
+
 
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
     """FastAPI dependency that yields a database session."""
@@ -43,3 +116,12 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
         finally:
             await session.close()
 
+
+async def get_read_db() -> AsyncGenerator[AsyncSession, None]:
+    """FastAPI dependency that yields a session on the read replica, if any."""
+
+    async with ReadSessionLocal() as session:
+        try:
+            yield session
+        finally:
+            await session.close()
@@ -0,0 +1,177 @@
+"""Query-count and latency accounting for requests and worker tasks."""
+
+from __future__ import annotations
+
+import logging
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class DownstreamStats:
+    """Call count and time spent against one downstream service."""
+
+    calls: int = 0
+    seconds: float = 0.0
+
+
+@dataclass
+class UnitTimings:
+    """Counters accumulated while one request or task runs."""
+
+    kind: str
+    name: str
+    started: float = field(default_factory=time.perf_counter)
+    db_queries: int = 0
+    db_seconds: float = 0.0
+    serialization_seconds: float = 0.0
+    downstream: dict[str, DownstreamStats] = field(default_factory=dict)
+
+    def elapsed(self) -> float:
+        """Return seconds since the unit started."""
+
+        return time.perf_counter() - self.started
+
+    def server_timing(self) -> str:
+        """Render the counters as a ``Server-Timing`` header value."""
+
+        parts = [f'db;dur={self.db_seconds * 1000:.1f};desc="{self.db_queries} queries"']
+        for service, stats in sorted(self.downstream.items()):
+            parts.append(
+                f'{service};dur={stats.seconds * 1000:.1f};desc="{stats.calls} calls"'
+            )
+        parts.append(f"serialize;dur={self.serialization_seconds * 1000:.1f}")
+        parts.append(f"total;dur={self.elapsed() * 1000:.1f}")
+        return ", ".join(parts)
+
+    def observe(self) -> None:
+        """Export the counters to Prometheus."""
+
+        labels = (self.kind, self.name)
+        metrics.UNIT_DURATION.labels(*labels).observe(self.elapsed())
+        metrics.UNIT_DB_QUERIES.labels(*labels).observe(self.db_queries)
+        metrics.UNIT_DB_SECONDS.labels(*labels).observe(self.db_seconds)
+        if self.kind == "request":
+            metrics.UNIT_SERIALIZATION_SECONDS.labels(*labels).observe(
+                self.serialization_seconds
+            )
+        for service, stats in self.downstream.items():
+            metrics.UNIT_DOWNSTREAM_CALLS.labels(*labels, service).observe(stats.calls)
+            metrics.UNIT_DOWNSTREAM_SECONDS.labels(*labels, service).observe(stats.seconds)
+
+
+_current: ContextVar[UnitTimings | None] = ContextVar("orchestrator_timings", default=None)
+
+
+def current_timings() -> UnitTimings | None:
+    """Return the timings of the request or task being executed, if any."""
+
+    return _current.get()
+
+
+@contextmanager
+def track(kind: str, name: str) -> Iterator[UnitTimings]:
+    """Attribute all queries and downstream calls in the block to one unit."""
+
+    timings = UnitTimings(kind=kind, name=name)
+    token = _current.set(timings)
+    try:
+        yield timings
+    finally:
+        _current.reset(token)
+        timings.observe()
+        logger.debug(
+            "%s %s: %s queries, %s",
+            kind,
+            timings.name,
+            timings.db_queries,
+            timings.server_timing(),
+        )
+
+
+def record_downstream(service: str, seconds: float) -> None:
+    """Add one downstream call to the current unit."""
+
+    timings = _current.get()
+    if timings is None:
+        return
+    stats = timings.downstream.setdefault(service, DownstreamStats())
+    stats.calls += 1
+    stats.seconds += seconds
+
+
+def record_serialization(seconds: float) -> None:
+    """Add response rendering time to the current unit."""
+
+    timings = _current.get()
+    if timings is not None:
+        timings.serialization_seconds += seconds
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    if context is not None:
+        context._orchestrator_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    timings = _current.get()
+    if timings is None:
+        return
+    timings.db_queries += 1
+    started = getattr(context, "_orchestrator_started", None)
+    if started is not None:
+        timings.db_seconds += time.perf_counter() - started
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    """Hook statement execution on ``engine`` into the current unit."""
+
+    event.listen(engine.sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine.sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def _route_name(scope: Scope) -> str:
+    """Return a low-cardinality label for the matched route."""
+
+    path = getattr(scope.get("route"), "path", None)
+    if not path:
+        return "unmatched"
+    return f"{scope['method']} {path}"
+
+
+class TimingMiddleware:
+    """ASGI middleware tracking each HTTP request and emitting ``Server-Timing``."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with track("request", "unmatched") as timings:
+
+            async def send_with_timing(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    timings.name = _route_name(scope)
+                    headers = MutableHeaders(scope=message)
+                    headers.append("Server-Timing", timings.server_timing())
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_timing)
+            finally:
+                timings.name = _route_name(scope)
@@ -4,17 +4,24 @@ from __future__ import annotations
 
 import logging
 
-from fastapi import Depends, FastAPI
+from fastapi import Depends, FastAPI, Response
+from starlette.concurrency import run_in_threadpool
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, generate_latest
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from . import db, metrics
 from .config import settings
 from .db import get_db
+from .instrumentation import TimingMiddleware
+from .responses import ORJSONResponse
 from .routers import audit as audit_router
 from .routers import auth as auth_router
+from .routers import export as export_router
 from .routers import kyc as kyc_router
 from .routers import review as review_router
 from .routers import user as user_router
 from .schemas import HealthResponse
+from .services import events
 
 try:
     from redis import asyncio as redis_asyncio
@@ -28,6 +35,14 @@ app = FastAPI(
     title="TrustLock Orchestrator",
     version="1.0.0",
     description="KYC orchestration service",
+    default_response_class=ORJSONResponse,
+)
+app.add_middleware(TimingMiddleware)
+REGISTRY.register(
+    metrics.RuntimeCollector(
+        queue_depths=metrics.redis_queue_depths(settings.celery_broker_url, ["celery"]),
+        pool_stats=metrics.engine_pool_stats(lambda: db.engine),
+    )
 )
 
 redis_client = None
@@ -51,6 +66,7 @@ async def shutdown_event() -> None:
     if redis_client:
         await redis_client.close()
         redis_client = None
+    await run_in_threadpool(events.shutdown_publisher)
 
 
 @app.get("/health", response_model=HealthResponse, tags=["meta"])
@@ -77,9 +93,19 @@ async def health_check(session: AsyncSession = Depends(get_db)) -> HealthRespons
     return HealthResponse(db=db_status, redis=redis_status)
 
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics_endpoint() -> Response:
+    """Prometheus scrape endpoint."""
+
+    # Collectors read Redis synchronously; keep them off the event loop.
+    body = await run_in_threadpool(generate_latest, REGISTRY)
+    return Response(body, media_type=CONTENT_TYPE_LATEST)
+
+
 app.include_router(user_router.router)
 app.include_router(auth_router.router)
 app.include_router(kyc_router.router)
 app.include_router(review_router.router)
 app.include_router(audit_router.router)
+app.include_router(export_router.router)
 
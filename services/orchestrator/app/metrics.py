@@ -0,0 +1,291 @@
+"""Prometheus metric definitions shared by the API and the worker."""
+
+from __future__ import annotations
+
+import logging
+from collections.abc import Callable, Iterator, Sequence
+from typing import Any
+
+from prometheus_client import Counter, Gauge, Histogram
+from prometheus_client.core import GaugeMetricFamily
+from prometheus_client.registry import Collector
+from redis import Redis
+
+logger = logging.getLogger(__name__)
+
+QUERY_BUCKETS = (1, 2, 3, 5, 8, 13, 21, 34, 55, 89, 144)
+
+UNIT_DURATION = Histogram(
+    "orchestrator_unit_duration_seconds",
+    "Wall-clock duration of a request or task.",
+    ["kind", "name"],
+)
+UNIT_DB_QUERIES = Histogram(
+    "orchestrator_unit_db_queries",
+    "SQL statements executed per request or task.",
+    ["kind", "name"],
+    buckets=QUERY_BUCKETS,
+)
+UNIT_DB_SECONDS = Histogram(
+    "orchestrator_unit_db_seconds",
+    "Time spent executing SQL per request or task.",
+    ["kind", "name"],
+)
+UNIT_DOWNSTREAM_CALLS = Histogram(
+    "orchestrator_unit_downstream_calls",
+    "Downstream service calls per request or task.",
+    ["kind", "name", "service"],
+    buckets=QUERY_BUCKETS,
+)
+UNIT_DOWNSTREAM_SECONDS = Histogram(
+    "orchestrator_unit_downstream_seconds",
+    "Time spent in downstream service calls per request or task.",
+    ["kind", "name", "service"],
+)
+UNIT_SERIALIZATION_SECONDS = Histogram(
+    "orchestrator_unit_serialization_seconds",
+    "Time spent rendering response bodies per request.",
+    ["kind", "name"],
+)
+
+STAGE_DURATION = Histogram(
+    "orchestrator_pipeline_stage_seconds",
+    "Duration of process_kyc stages.",
+    ["stage", "result"],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120),
+)
+DOWNSTREAM_LATENCY = Histogram(
+    "orchestrator_downstream_request_seconds",
+    "Latency of individual downstream HTTP attempts.",
+    ["service", "status"],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60),
+)
+DOWNSTREAM_RETRIES = Counter(
+    "orchestrator_downstream_retries_total",
+    "Downstream HTTP attempts that were retried.",
+    ["service"],
+)
+TASK_RETRIES = Counter(
+    "orchestrator_task_retries_total",
+    "Celery task retries by failing pipeline stage.",
+    ["task", "stage"],
+)
+CIRCUIT_TRIPS = Counter(
+    "orchestrator_circuit_trips_total",
+    "Times a downstream circuit breaker opened.",
+    ["service"],
+)
+CACHE_REQUESTS = Counter(
+    "orchestrator_cache_requests_total",
+    "Cache lookups by cache name and result (hit/miss).",
+    ["cache", "result"],
+)
+KYC_OUTCOMES = Counter(
+    "orchestrator_kyc_outcomes_total",
+    "Applications reaching a status, by deciding component.",
+    ["status", "source"],
+)
+SANCTIONS_SCREENS = Counter(
+    "orchestrator_sanctions_screens_total",
+    "Sanctions screenings by result (hit, clear, no_name, unavailable).",
+    ["result"],
+)
+SANCTIONS_RELOADS = Counter(
+    "orchestrator_sanctions_reloads_total",
+    "Sanctions list (re)loads by result.",
+    ["result"],
+)
+DUPLICATE_FACE_CHECKS = Counter(
+    "orchestrator_duplicate_face_checks_total",
+    "Duplicate-identity face checks by result (duplicate, unique, no_embedding).",
+    ["result"],
+)
+FACE_INDEX_SEARCH_SECONDS = Histogram(
+    "orchestrator_face_index_search_seconds",
+    "Nearest-neighbour search time in the face index.",
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5),
+)
+FACE_INDEX_SIZE = Gauge(
+    "orchestrator_face_index_size",
+    "Faces held in the worker's in-memory index.",
+    multiprocess_mode="max",
+)
+NEAR_DUPLICATE_DOCUMENT_CHECKS = Counter(
+    "orchestrator_near_duplicate_document_checks_total",
+    "Perceptual-hash document checks by result (duplicate, unique, no_hash).",
+    ["result"],
+)
+DOCUMENT_HASH_SEARCH_SECONDS = Histogram(
+    "orchestrator_document_hash_search_seconds",
+    "Hamming-radius search time in the document hash index.",
+    buckets=(0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1),
+)
+DOCUMENT_HASH_INDEX_SIZE = Gauge(
+    "orchestrator_document_hash_index_size",
+    "Document hashes held in the worker's in-memory index.",
+    multiprocess_mode="max",
+)
+IMAGE_NORMALIZATIONS = Counter(
+    "orchestrator_image_normalizations_total",
+    "Derived images by profile and result (normalized, passthrough, unreadable).",
+    ["profile", "result"],
+)
+IMAGE_NORMALIZE_SECONDS = Histogram(
+    "orchestrator_image_normalize_seconds",
+    "Time to decode, orient, downscale and re-encode one image, by profile.",
+    ["profile"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+IMAGE_BYTES = Counter(
+    "orchestrator_image_bytes_total",
+    "Bytes of original and derived images, by profile.",
+    ["profile", "kind"],
+)
+STUCK_APPLICATIONS_RESCUED = Counter(
+    "orchestrator_stuck_applications_rescued_total",
+    "Applications stuck in PROCESSING that the sweeper re-enqueued.",
+)
+STUCK_APPLICATIONS_ABANDONED = Gauge(
+    "orchestrator_stuck_applications_abandoned",
+    "Applications stuck in PROCESSING after SWEEPER_MAX_RESCUES re-enqueues.",
+)
+AUDIT_MAINTENANCE_LAST_SUCCESS = Gauge(
+    "orchestrator_audit_maintenance_last_success_timestamp_seconds",
+    "Unix time of the last successful audit partition maintenance run.",
+    multiprocess_mode="max",
+)
+AUDIT_DEFAULT_PARTITION_ROWS = Counter(
+    "orchestrator_audit_default_partition_rows_total",
+    "Audit rows written before their month's partition existed, moved out of the default.",
+)
+EVENTS_PUBLISHED = Counter(
+    "orchestrator_events_published_total",
+    "Application events appended to the event stream, by type.",
+    ["type"],
+)
+EVENT_PUBLISH_ERRORS = Counter(
+    "orchestrator_event_publish_errors_total",
+    "Failed attempts to send a batch of events to the event stream.",
+)
+EVENTS_DROPPED = Counter(
+    "orchestrator_events_dropped_total",
+    "Events discarded because the publisher buffer was full or shutting down.",
+)
+ADMISSION_DECISIONS = Counter(
+    "orchestrator_admission_decisions_total",
+    "Admission decisions on KYC submissions by method (accepted, rejected, unknown).",
+    ["method", "result"],
+)
+ADMISSION_ESTIMATED_WAIT = Gauge(
+    "orchestrator_admission_estimated_wait_seconds",
+    "Estimated time from submission to decision at the last queue probe.",
+)
+RESUMABLE_UPLOADS = Counter(
+    "orchestrator_resumable_uploads_total",
+    "Resumable upload lifecycle events (created, completed, finalized, cancelled, expired, "
+    "checksum_mismatch).",
+    ["event"],
+)
+RESUMABLE_UPLOAD_BYTES = Counter(
+    "orchestrator_resumable_upload_bytes_total",
+    "Bytes appended to resumable uploads.",
+)
+DERIVATIVE_REQUESTS = Counter(
+    "orchestrator_derivative_requests_total",
+    "Reviewer thumbnails and previews served, by variant and source (local, storage, generated).",
+    ["variant", "source"],
+)
+COUNTER_DRIFT = Counter(
+    "orchestrator_counter_drift_total",
+    "Absolute application counter drift corrected by reconciliation.",
+)
+REVIEW_CLAIMS = Counter(
+    "orchestrator_review_claims_total",
+    "Applications leased to reviewers, by queue ordering.",
+    ["order"],
+)
+REVIEW_LEASE_RELEASES = Counter(
+    "orchestrator_review_lease_releases_total",
+    "Review leases ended without a decision.",
+)
+REVIEW_DECISIONS = Counter(
+    "orchestrator_review_decisions_total",
+    "Reviewer decisions by action and mode (claimed, unclaimed or bulk).",
+    ["action", "mode"],
+)
+REVIEW_CLAIM_TO_DECISION = Histogram(
+    "orchestrator_review_claim_to_decision_seconds",
+    "Time from leasing an application to deciding it.",
+    buckets=(10, 30, 60, 120, 300, 600, 900, 1800, 3600),
+)
+
+
+class RuntimeCollector(Collector):
+    """Scrape-time gauges for broker queue depth and DB pool usage."""
+
+    def __init__(
+        self,
+        *,
+        queue_depths: Callable[[], dict[str, int]],
+        pool_stats: Callable[[], dict[str, int]] | None = None,
+    ) -> None:
+        self._queue_depths = queue_depths
+        self._pool_stats = pool_stats
+
+    def collect(self) -> Iterator[GaugeMetricFamily]:
+        queue = GaugeMetricFamily(
+            "orchestrator_queue_depth",
+            "Messages waiting in the Celery broker queue.",
+            labels=["queue"],
+        )
+        try:
+            for name, depth in self._queue_depths().items():
+                queue.add_metric([name], depth)
+        except Exception as exc:  # pragma: no cover - broker unavailable
+            logger.warning("Queue depth collection failed: %s", exc)
+        yield queue
+
+        if self._pool_stats is None:
+            return
+        pool = GaugeMetricFamily(
+            "orchestrator_db_pool_connections",
+            "Database pool connections by state.",
+            labels=["state"],
+        )
+        for state, value in self._pool_stats().items():
+            pool.add_metric([state], value)
+        yield pool
+
+
+def redis_queue_depths(redis_url: str, queues: Sequence[str]) -> Callable[[], dict[str, int]]:
+    """Return a callable reading Celery queue lengths from a Redis broker."""
+
+    client = Redis.from_url(redis_url, socket_timeout=1)
+
+    def _depths() -> dict[str, int]:
+        return {queue: int(client.llen(queue)) for queue in queues}
+
+    return _depths
+
+
+def engine_pool_stats(current_engine: Callable[[], Any]) -> Callable[[], dict[str, int]]:
+    """Return a callable reporting checked-out/idle/overflow pool counts.
+
+    ``current_engine`` is called on every scrape because worker processes
+    replace the engine after startup (see ``app.db.configure_engines``).
+    """
+
+    def _stats() -> dict[str, int]:
+        pool = current_engine().sync_engine.pool
+        stats = {}
+        for state, attr in (
+            ("checked_out", "checkedout"),
+            ("idle", "checkedin"),
+            ("overflow", "overflow"),
+        ):
+            reader = getattr(pool, attr, None)
+            if reader is not None:
+                stats[state] = reader()
+        return stats
+
+    return _stats
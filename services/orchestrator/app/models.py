@@ -9,6 +9,7 @@ from enum import Enum as PyEnum
 
 from sqlalchemy import (
     JSON,
+    BigInteger,
     Boolean,
     Column,
     DateTime,
@@ -16,19 +17,61 @@ from sqlalchemy import (
     ForeignKey,
     Index,
     Integer,
+    LargeBinary,
     String,
     Text,
     UniqueConstraint,
+    Uuid,
+    case,
+    func,
+    text,
 )
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
+from sqlalchemy.sql.expression import FunctionElement, literal_column
+
+from .ids import uuid7
+
+# JSONB on Postgres (binary, indexable); plain JSON elsewhere, e.g. SQLite in tests.
+JSONDocument = JSON().with_variant(JSONB(), "postgresql")
+
+
+class json_text(FunctionElement):
+    """Text value of a top-level JSON key: ``col ->> 'key'`` on Postgres.
+
+    Unlike ``col["key"].as_string()`` the key is rendered inline rather than
+    bound, so queries match the expression indexes below.
+    """
+
+    type = String()
+    inherit_cache = True
+    name = "json_text"
+
+    def __init__(self, column, key: str) -> None:
+        if not key.isidentifier():
+            raise ValueError(f"Unsupported JSON key: {key!r}")
+        super().__init__(column, literal_column(f"'{key}'"))
+
+
+@compiles(json_text, "postgresql")
+def _json_text_postgresql(element, compiler, **kw) -> str:
+    column, key = element.clauses
+    return f"({compiler.process(column, **kw)} ->> {compiler.process(key, **kw)})"
+
+
+@compiles(json_text)
+def _json_text_default(element, compiler, **kw) -> str:
+    column, key = element.clauses
+    return f"json_extract({compiler.process(column, **kw)}, '$.{key.name[1:-1]}')"
 
 
 class Base(DeclarativeBase):
     """Declarative base class for ORM models."""
 
     id: Mapped[uuid.UUID] = mapped_column(
-        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
+        Uuid(as_uuid=True), primary_key=True, default=uuid7
     )
 
 
@@ -52,12 +95,16 @@ class User(Base):
     phone: Mapped[str | None] = mapped_column(String(32), nullable=True)
     password_hash: Mapped[str] = mapped_column(Text, nullable=False)
     is_staff: Mapped[bool] = mapped_column(Boolean, default=False)
+    # Set for partner accounts; their batches may only reference blobs under it.
+    storage_prefix: Mapped[str | None] = mapped_column(String(512), nullable=True)
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), default=datetime.utcnow
     )
 
     applications: Mapped[list["KYCApplication"]] = relationship(
-        back_populates="user", cascade="all, delete-orphan"
+        back_populates="user",
+        cascade="all, delete-orphan",
+        foreign_keys="KYCApplication.user_id",
     )
 
 
@@ -79,20 +126,75 @@ class DRPALevel(str, PyEnum):
     HIGH = "HIGH"
 
 
+class KYCBatch(Base, TimestampMixin):
+    """Applications submitted together through the batch API."""
+
+    __tablename__ = "kyc_batches"
+
+    submitted_by: Mapped[uuid.UUID] = mapped_column(
+        Uuid(as_uuid=True), ForeignKey("users.id"), nullable=False, index=True
+    )
+    total: Mapped[int] = mapped_column(Integer, nullable=False)
+    completed_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+
+
 class KYCApplication(Base, TimestampMixin):
     """KYC application entity."""
 
     __tablename__ = "kyc_applications"
+    __table_args__ = (
+        Index("idx_applications_created", "created_at", "id"),
+    )
 
     user_id: Mapped[uuid.UUID] = mapped_column(
-        UUID(as_uuid=True), ForeignKey("users.id"), nullable=False, index=True
+        Uuid(as_uuid=True), ForeignKey("users.id"), nullable=False, index=True
     )
     method: Mapped[str] = mapped_column(String(32))
     status: Mapped[str] = mapped_column(String(32), default=KYCStatus.PENDING.value)
     risk_score: Mapped[int | None] = mapped_column(Integer, nullable=True)
     drpa_level: Mapped[str | None] = mapped_column(String(16), nullable=True)
+    batch_id: Mapped[uuid.UUID | None] = mapped_column(
+        Uuid(as_uuid=True), ForeignKey("kyc_batches.id"), nullable=True, index=True
+    )
+    external_ref: Mapped[str | None] = mapped_column(String(128), nullable=True)
+    # Bumped on every update; reviewers send the version they saw so a
+    # decision made in the meantime is not overwritten.
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=1)
+    claimed_by: Mapped[uuid.UUID | None] = mapped_column(
+        Uuid(as_uuid=True), ForeignKey("users.id"), nullable=True
+    )
+    claimed_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    claim_expires_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+    # Admission control's estimate when the upload was accepted.
+    estimated_completion_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+    # Times the stuck-application sweeper re-enqueued processing.
+    rescue_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+    __mapper_args__ = {"version_id_col": version}
+
+    @hybrid_property
+    def applicant_id(self) -> uuid.UUID:
+        """Identity of the person being verified, for duplicate checks.
+
+        Self-service applications belong to their user. Batch applications
+        are submitted under the partner's user, so each one stands for its
+        own applicant.
+        """
 
-    user: Mapped[User] = relationship(back_populates="applications")
+        return self.user_id if self.batch_id is None else self.id
+
+    @applicant_id.inplace.expression
+    @classmethod
+    def _applicant_id_expression(cls):
+        return case((cls.batch_id.is_(None), cls.user_id), else_=cls.id)
+
+    user: Mapped[User] = relationship(back_populates="applications", foreign_keys=[user_id])
     documents: Mapped[list["Document"]] = relationship(
         back_populates="application", cascade="all, delete-orphan"
     )
@@ -102,6 +204,9 @@ class KYCApplication(Base, TimestampMixin):
     audits: Mapped[list["AuditLog"]] = relationship(
         back_populates="application", cascade="all, delete-orphan"
     )
+    stages: Mapped[list["PipelineStage"]] = relationship(
+        back_populates="application", cascade="all, delete-orphan"
+    )
 
 
 class Document(Base, TimestampMixin):
@@ -110,17 +215,39 @@ class Document(Base, TimestampMixin):
     __tablename__ = "documents"
 
     application_id: Mapped[uuid.UUID] = mapped_column(
-        UUID(as_uuid=True), ForeignKey("kyc_applications.id"), index=True
+        Uuid(as_uuid=True), ForeignKey("kyc_applications.id"), index=True
     )
     doc_type: Mapped[str] = mapped_column(String(32))
     storage_path: Mapped[str] = mapped_column(String(512))
     doc_hash: Mapped[str] = mapped_column(String(128))
-    ocr_json: Mapped[dict | None] = mapped_column(JSON, nullable=True)
+    # Perceptual hash of ID images (app.services.document_hashes).
+    phash: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
+    near_duplicates: Mapped[list | None] = mapped_column(JSONDocument, nullable=True)
+    # Reviewer viewer images by variant (app.services.derivatives).
+    derivatives: Mapped[dict | None] = mapped_column(JSONDocument, nullable=True)
+    ocr_json: Mapped[dict | None] = mapped_column(JSONDocument, nullable=True)
     doc_confidence: Mapped[float | None] = mapped_column(Float, nullable=True)
 
     application: Mapped[KYCApplication] = relationship(back_populates="documents")
 
 
+class UploadSession(Base, TimestampMixin):
+    """Resumable upload of one document, assembled in ``UPLOAD_TEMP_DIR``."""
+
+    __tablename__ = "upload_sessions"
+
+    application_id: Mapped[uuid.UUID] = mapped_column(
+        Uuid(as_uuid=True), ForeignKey("kyc_applications.id"), index=True
+    )
+    doc_type: Mapped[str] = mapped_column(String(32))
+    filename: Mapped[str] = mapped_column(String(255))
+    length: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    offset: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    # SHA-256 the client declared up front, checked once the upload is complete.
+    checksum: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), index=True)
+
+
 class FaceMatch(Base, TimestampMixin):
     """Face match results for an application."""
 
@@ -128,31 +255,96 @@ class FaceMatch(Base, TimestampMixin):
     __table_args__ = (UniqueConstraint("application_id", name="uq_face_application"),)
 
     application_id: Mapped[uuid.UUID] = mapped_column(
-        UUID(as_uuid=True), ForeignKey("kyc_applications.id"), index=True
+        Uuid(as_uuid=True), ForeignKey("kyc_applications.id"), index=True
     )
     similarity_score: Mapped[float | None] = mapped_column(Float, nullable=True)
     liveness_result: Mapped[str | None] = mapped_column(String(16), nullable=True)
     embedding_hash: Mapped[str | None] = mapped_column(String(128), nullable=True)
+    # L2-normalised float16 vector (app.services.face_index.encode_embedding).
+    embedding: Mapped[bytes | None] = mapped_column(LargeBinary, nullable=True)
 
     application: Mapped[KYCApplication] = relationship(back_populates="face_match")
 
 
+class PipelineStageStatus(str, PyEnum):
+    """Enumeration of processing stage states."""
+
+    PENDING = "PENDING"
+    COMPLETED = "COMPLETED"
+    FAILED = "FAILED"
+
+
+class PipelineStage(Base, TimestampMixin):
+    """Checkpointed state and output of one processing stage."""
+
+    __tablename__ = "pipeline_stages"
+    __table_args__ = (
+        UniqueConstraint("application_id", "stage", name="uq_pipeline_stage"),
+    )
+
+    application_id: Mapped[uuid.UUID] = mapped_column(
+        Uuid(as_uuid=True), ForeignKey("kyc_applications.id"), index=True
+    )
+    stage: Mapped[str] = mapped_column(String(32))
+    status: Mapped[str] = mapped_column(
+        String(16), default=PipelineStageStatus.PENDING.value
+    )
+    attempts: Mapped[int] = mapped_column(Integer, default=0)
+    output: Mapped[dict | None] = mapped_column(JSON, nullable=True)
+    error: Mapped[str | None] = mapped_column(Text, nullable=True)
+
+    application: Mapped[KYCApplication] = relationship(back_populates="stages")
+
+
+class ApplicationCounter(Base):
+    """Number of applications per status, method, DRPA level and risk bucket.
+
+    Maintained incrementally by app.services.queue_stats in the same
+    transaction as every status change, and periodically reconciled against
+    ``kyc_applications``. Missing DRPA levels are stored as ``""`` and
+    unscored applications in bucket ``-1`` so the key can be unique.
+    """
+
+    __tablename__ = "application_counters"
+    __table_args__ = (
+        UniqueConstraint(
+            "status", "method", "drpa_level", "risk_bucket", name="uq_application_counter"
+        ),
+    )
+
+    status: Mapped[str] = mapped_column(String(32))
+    method: Mapped[str] = mapped_column(String(32))
+    drpa_level: Mapped[str] = mapped_column(String(16), default="")
+    risk_bucket: Mapped[int] = mapped_column(Integer, default=-1)
+    count: Mapped[int] = mapped_column(Integer, default=0)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=datetime.utcnow, onupdate=datetime.utcnow
+    )
+
+
 class AuditLog(Base):
-    """Audit trail entries linked to applications."""
+    """Audit trail entries linked to applications.
+
+    On Postgres the table is range-partitioned by month of ``created_at``,
+    which is therefore part of the primary key.
+    """
 
     __tablename__ = "audit_logs"
-    __table_args__ = (Index("idx_audit_application", "application_id"),)
+    __table_args__ = (
+        Index("idx_audit_application", "application_id", "created_at"),
+        Index("idx_audit_created", "created_at", "id"),
+    )
 
     application_id: Mapped[uuid.UUID | None] = mapped_column(
-        UUID(as_uuid=True), ForeignKey("kyc_applications.id"), index=True, nullable=True
+        Uuid(as_uuid=True), ForeignKey("kyc_applications.id"), index=True, nullable=True
     )
     actor: Mapped[str] = mapped_column(String(128))
     action: Mapped[str] = mapped_column(String(128))
-    payload: Mapped[dict | None] = mapped_column(JSON, nullable=True)
+    payload: Mapped[dict | None] = mapped_column(JSONDocument, nullable=True)
     log_hash: Mapped[str | None] = mapped_column(String(256), nullable=True)
     external_audit_id: Mapped[str | None] = mapped_column(String(128), nullable=True)
     created_at: Mapped[datetime] = mapped_column(
-        DateTime(timezone=True), default=datetime.utcnow
+        DateTime(timezone=True), primary_key=True, default=datetime.utcnow
     )
 
     application: Mapped[KYCApplication | None] = relationship(back_populates="audits")
@@ -160,4 +352,37 @@ class AuditLog(Base):
 
 Index("idx_documents_app", Document.application_id)
 Index("idx_face_match_app", FaceMatch.application_id)
-
+# Incremental face index refreshes read new embeddings in this order.
+Index("idx_face_match_created", FaceMatch.created_at, FaceMatch.id)
+# Same for document hash index refreshes; most documents (selfies) have no hash.
+Index(
+    "idx_documents_phash_created",
+    Document.created_at,
+    Document.id,
+    postgresql_where=text("phash IS NOT NULL"),
+    sqlite_where=text("phash IS NOT NULL"),
+)
+# Reviewer search (orchestrator_service.search_documents) filters on these.
+Index("ix_documents_ocr_name", func.lower(json_text(Document.ocr_json, "name")))
+Index("ix_documents_ocr_document_number", json_text(Document.ocr_json, "document_number"))
+# Claimable review work in the orders app.services.review_claims leases it.
+# SQLite cannot declare NULLS LAST on an index column, so that one is Postgres-only.
+Index(
+    "idx_applications_flagged_risk",
+    KYCApplication.risk_score.desc().nulls_last(),
+    KYCApplication.created_at,
+    postgresql_where=text("status = 'FLAGGED'"),
+).ddl_if(dialect="postgresql")
+Index(
+    "idx_applications_flagged_age",
+    KYCApplication.created_at,
+    postgresql_where=text("status = 'FLAGGED'"),
+    sqlite_where=text("status = 'FLAGGED'"),
+)
+# In-flight applications, oldest first, for app.services.sweeper.
+Index(
+    "idx_applications_processing_updated",
+    KYCApplication.updated_at,
+    postgresql_where=text("status = 'PROCESSING'"),
+    sqlite_where=text("status = 'PROCESSING'"),
+)
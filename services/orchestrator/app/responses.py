@@ -0,0 +1,170 @@
+"""Response classes used by the orchestrator API."""
+
+from __future__ import annotations
+
+import csv
+import io
+import time
+import zlib
+from collections.abc import AsyncIterable, AsyncIterator, Sequence
+from typing import Any
+
+import orjson
+from fastapi import Response
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from .instrumentation import record_serialization
+
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+
+class ORJSONResponse(JSONResponse):
+    """orjson-encoded JSON response that reports its rendering time.
+
+    Endpoints that already hold plain dicts (e.g. built from row tuples) can
+    return this directly so FastAPI skips response-model validation.
+    """
+
+    def render(self, content: Any) -> bytes:
+        started = time.perf_counter()
+        body = orjson.dumps(content, option=ORJSON_OPTIONS)
+        record_serialization(time.perf_counter() - started)
+        return body
+
+
+async def _json_array_chunks(items: AsyncIterable[dict[str, Any]]) -> AsyncIterator[bytes]:
+    """Encode items one by one as the elements of a JSON array."""
+
+    separator = b"["
+    async for item in items:
+        yield separator + orjson.dumps(item, option=ORJSON_OPTIONS)
+        separator = b","
+    yield b"[]" if separator == b"[" else b"]"
+
+
+def stream_json_array(items: AsyncIterable[dict[str, Any]]) -> StreamingResponse:
+    """Stream ``items`` as a JSON array without materialising the list."""
+
+    return StreamingResponse(_json_array_chunks(items), media_type="application/json")
+
+
+async def _ndjson_lines(items: AsyncIterable[dict[str, Any]]) -> AsyncIterator[bytes]:
+    async for item in items:
+        yield orjson.dumps(item, option=ORJSON_OPTIONS | orjson.OPT_APPEND_NEWLINE)
+
+
+def stream_ndjson(items: AsyncIterable[dict[str, Any]], filename: str) -> StreamingResponse:
+    """Stream ``items`` as newline-delimited JSON, one object per line."""
+
+    return StreamingResponse(
+        _ndjson_lines(items),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+def _csv_value(value: Any) -> Any:
+    if isinstance(value, (dict, list)):
+        return orjson.dumps(value, option=ORJSON_OPTIONS).decode()
+    return value
+
+
+async def _csv_gzip_chunks(
+    items: AsyncIterable[dict[str, Any]], fieldnames: Sequence[str], batch_size: int
+) -> AsyncIterator[bytes]:
+    """Encode items as CSV rows and gzip them, flushing every ``batch_size`` rows."""
+
+    compressor = zlib.compressobj(wbits=31)
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=fieldnames, extrasaction="ignore")
+    writer.writeheader()
+    pending = 0
+    async for item in items:
+        writer.writerow({key: _csv_value(value) for key, value in item.items()})
+        pending += 1
+        if pending >= batch_size:
+            chunk = compressor.compress(buffer.getvalue().encode())
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+            if chunk:
+                yield chunk
+    yield compressor.compress(buffer.getvalue().encode()) + compressor.flush()
+
+
+def stream_csv_gzip(
+    items: AsyncIterable[dict[str, Any]],
+    fieldnames: Sequence[str],
+    filename: str,
+    *,
+    batch_size: int = 500,
+) -> StreamingResponse:
+    """Stream ``items`` as a gzip-compressed CSV download with a header row."""
+
+    return StreamingResponse(
+        _csv_gzip_chunks(items, fieldnames, batch_size),
+        media_type="application/gzip",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+def _byte_range(range_header: str, size: int) -> tuple[int, int] | None:
+    """Inclusive ``(start, end)`` of a single ``bytes=`` range, or ``None`` to ignore it.
+
+    Raises ``ValueError`` when the range cannot be satisfied.
+    """
+
+    unit, _, spec = range_header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        # Other units and multipart ranges are answered with the whole body.
+        return None
+    first, _, last = spec.strip().partition("-")
+    try:
+        if not first:
+            start, end = max(size - int(last), 0), size - 1
+        else:
+            start, end = int(first), min(int(last), size - 1) if last else size - 1
+    except ValueError:
+        return None
+    if start >= size or start > end:
+        raise ValueError(range_header)
+    return start, end
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Whether an ``If-None-Match`` header covers ``etag``."""
+
+    if not if_none_match:
+        return False
+    tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in tags or etag in tags
+
+
+def bytes_response(
+    data: bytes,
+    *,
+    media_type: str,
+    etag: str,
+    range_header: str | None = None,
+    if_none_match: str | None = None,
+    cache_control: str = "private, max-age=3600",
+) -> Response:
+    """Serve ``data`` with conditional (``If-None-Match``) and single-range support."""
+
+    headers = {"ETag": etag, "Cache-Control": cache_control, "Accept-Ranges": "bytes"}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    if range_header:
+        try:
+            byte_range = _byte_range(range_header, len(data))
+        except ValueError:
+            return Response(
+                status_code=416, headers={**headers, "Content-Range": f"bytes */{len(data)}"}
+            )
+        if byte_range is not None:
+            start, end = byte_range
+            headers["Content-Range"] = f"bytes {start}-{end}/{len(data)}"
+            return Response(
+                data[start : end + 1], status_code=206, media_type=media_type, headers=headers
+            )
+    return Response(data, media_type=media_type, headers=headers)
@@ -5,10 +5,10 @@ from __future__ import annotations
 from uuid import UUID
 
 from fastapi import APIRouter, Depends
-from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi.responses import StreamingResponse
 
 from ..auth import get_current_staff
-from ..db import get_db
+from ..responses import stream_json_array
 from ..schemas import AuditLogResponse
 from ..services import orchestrator_service
 
@@ -19,19 +19,8 @@ router = APIRouter(prefix="/audit", tags=["audit"])
 async def get_audit_entries(
     application_id: UUID,
     _staff=Depends(get_current_staff),
-    session: AsyncSession = Depends(get_db),
-) -> list[AuditLogResponse]:
-    """Return audit logs for an application."""
-
-    audits = await orchestrator_service.fetch_audit_logs(session, application_id)
-    return [
-        AuditLogResponse(
-            actor=a.actor,
-            action=a.action,
-            payload=a.payload,
-            log_hash=a.log_hash,
-            created_at=a.created_at,
-        )
-        for a in audits
-    ]
+) -> StreamingResponse:
+    """Stream audit logs for an application as a JSON array."""
+
+    return stream_json_array(orchestrator_service.stream_audit_rows(application_id))
 
@@ -0,0 +1,80 @@
+"""Staff export endpoints for compliance pulls."""
+
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Literal
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+
+from ..auth import get_current_staff
+from ..models import KYCStatus, User
+from ..responses import stream_csv_gzip, stream_ndjson
+from ..services import export_service
+
+router = APIRouter(prefix="/export", tags=["export"])
+
+ExportFormat = Literal["ndjson", "csv"]
+
+
+def _parse_cursor(after: str | None) -> tuple[datetime, UUID] | None:
+    if after is None:
+        return None
+    try:
+        return export_service.decode_cursor(after)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+
+
+def _export_response(items, fields: tuple[str, ...], name: str, fmt: ExportFormat):
+    if fmt == "csv":
+        return stream_csv_gzip(items, (*fields, "cursor"), f"{name}.csv.gz")
+    return stream_ndjson(items, f"{name}.ndjson")
+
+
+@router.get("/audit-logs", response_class=StreamingResponse)
+async def export_audit_logs(
+    since: datetime | None = None,
+    until: datetime | None = None,
+    application_id: UUID | None = None,
+    after: str | None = Query(None, description="Resume after this row's cursor"),
+    format: ExportFormat = "ndjson",
+    _: User = Depends(get_current_staff),
+) -> StreamingResponse:
+    """Stream audit log entries created in ``[since, until)``.
+
+    Every row carries a ``cursor``; pass the last one received as ``after``
+    to resume an interrupted download.
+    """
+
+    items = export_service.stream_audit_export(
+        since=since,
+        until=until,
+        application_id=application_id,
+        after=_parse_cursor(after),
+    )
+    return _export_response(items, export_service.AUDIT_EXPORT_FIELDS, "audit-logs", format)
+
+
+@router.get("/applications", response_class=StreamingResponse)
+async def export_applications(
+    since: datetime | None = None,
+    until: datetime | None = None,
+    status_filter: list[KYCStatus] | None = Query(None, alias="status"),
+    after: str | None = Query(None, description="Resume after this row's cursor"),
+    format: ExportFormat = "ndjson",
+    _: User = Depends(get_current_staff),
+) -> StreamingResponse:
+    """Stream KYC applications created in ``[since, until)``, optionally by status."""
+
+    items = export_service.stream_application_export(
+        since=since,
+        until=until,
+        statuses=[s.value for s in status_filter] if status_filter else None,
+        after=_parse_cursor(after),
+    )
+    return _export_response(
+        items, export_service.APPLICATION_EXPORT_FIELDS, "applications", format
+    )
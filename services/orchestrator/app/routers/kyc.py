@@ -2,22 +2,43 @@
 
 from __future__ import annotations
 
+import zipfile
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, File, Form, UploadFile, status
+from fastapi import (
+    APIRouter,
+    Depends,
+    File,
+    Form,
+    Header,
+    HTTPException,
+    Request,
+    Response,
+    UploadFile,
+    status,
+)
+from fastapi.exceptions import RequestValidationError
+from pydantic import ValidationError
 from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
 
-from ..auth import get_current_user
-from ..db import get_db
+from ..auth import get_current_partner, get_current_user
+from ..db import get_db, get_read_db
 from ..models import User
 from ..schemas import (
+    KYCBatchRequest,
+    KYCBatchResponse,
+    KYCBatchStatusResponse,
     KYCResultResponse,
     KYCStartRequest,
     KYCStartResponse,
     KYCStatusResponse,
     KYCUploadResponse,
+    ResumableUploadFinalizeRequest,
+    ResumableUploadRequest,
+    ResumableUploadResponse,
 )
-from ..services import orchestrator_service
+from ..services import batch_service, orchestrator_service, resumable_uploads
 
 router = APIRouter(prefix="/kyc", tags=["kyc"])
 
@@ -58,14 +79,115 @@ async def upload_documents(
     return KYCUploadResponse(
         message="Upload received, processing started",
         application_id=application.id,
+        estimated_completion_at=application.estimated_completion_at,
+    )
+
+
+def _upload_state(upload, response: Response) -> ResumableUploadResponse:
+    response.headers["Upload-Offset"] = str(upload.offset)
+    response.headers["Upload-Length"] = str(upload.length)
+    response.headers["Cache-Control"] = "no-store"
+    return ResumableUploadResponse(**resumable_uploads.describe(upload))
+
+
+@router.post(
+    "/uploads", response_model=ResumableUploadResponse, status_code=status.HTTP_201_CREATED
+)
+async def create_resumable_upload(
+    payload: ResumableUploadRequest,
+    response: Response,
+    user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_db),
+) -> ResumableUploadResponse:
+    """Open a resumable upload of one document."""
+
+    application = await orchestrator_service.get_application_or_404(
+        session, payload.application_id, owner_id=user.id
+    )
+    upload = await resumable_uploads.create_upload(
+        session,
+        application,
+        doc_type=payload.doc_type,
+        length=payload.length,
+        filename=payload.filename,
+        checksum=payload.sha256,
+    )
+    response.headers["Location"] = f"/kyc/uploads/{upload.id}"
+    return _upload_state(upload, response)
+
+
+@router.post("/uploads/finalize", response_model=KYCUploadResponse)
+async def finalize_resumable_uploads(
+    payload: ResumableUploadFinalizeRequest,
+    user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_db),
+) -> KYCUploadResponse:
+    """Submit an application whose documents were sent as resumable uploads."""
+
+    application = await orchestrator_service.finalize_uploads(
+        session,
+        user,
+        application_id=payload.application_id,
+        device_info=payload.device_info,
+    )
+    return KYCUploadResponse(
+        message="Upload received, processing started",
+        application_id=application.id,
+        estimated_completion_at=application.estimated_completion_at,
     )
 
 
+@router.api_route(
+    "/uploads/{upload_id}", methods=["GET", "HEAD"], response_model=ResumableUploadResponse
+)
+async def get_resumable_upload(
+    upload_id: UUID,
+    response: Response,
+    user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_db),
+) -> ResumableUploadResponse:
+    """Return the offset to resume an upload from."""
+
+    upload = await resumable_uploads.get_upload_or_404(session, upload_id, user)
+    return _upload_state(upload, response)
+
+
+@router.patch("/uploads/{upload_id}", response_model=ResumableUploadResponse)
+async def append_resumable_upload(
+    upload_id: UUID,
+    request: Request,
+    response: Response,
+    upload_offset: int = Header(..., ge=0, alias="Upload-Offset"),
+    user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_db),
+) -> ResumableUploadResponse:
+    """Append the raw request body to an upload at ``Upload-Offset``."""
+
+    upload = await resumable_uploads.get_upload_or_404(session, upload_id, user)
+    upload = await resumable_uploads.append_chunk(
+        session, upload, offset=upload_offset, chunk=request.stream()
+    )
+    return _upload_state(upload, response)
+
+
+@router.delete("/uploads/{upload_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def cancel_resumable_upload(
+    upload_id: UUID,
+    user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_db),
+) -> Response:
+    """Abandon an upload and delete its data."""
+
+    upload = await resumable_uploads.get_upload_or_404(session, upload_id, user)
+    await resumable_uploads.cancel_upload(session, upload)
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+
 @router.get("/status/{application_id}", response_model=KYCStatusResponse)
 async def get_status(
     application_id: UUID,
     user: User = Depends(get_current_user),
-    session: AsyncSession = Depends(get_db),
+    session: AsyncSession = Depends(get_read_db),
 ) -> KYCStatusResponse:
     """Return current application status."""
 
@@ -79,18 +201,17 @@ async def get_status(
 async def get_result(
     application_id: UUID,
     user: User = Depends(get_current_user),
-    session: AsyncSession = Depends(get_db),
+    session: AsyncSession = Depends(get_read_db),
 ) -> KYCResultResponse:
     """Return final result with audit data."""
 
     application = await orchestrator_service.get_application_or_404(
         session, application_id, owner_id=user.id
     )
-    audits = await orchestrator_service.fetch_audit_logs(session, application_id)
+    last = await orchestrator_service.fetch_latest_audit_log(session, application_id)
     explanations = []
     audit_id = None
-    if audits:
-        last = audits[-1]
+    if last:
         risk_payload = (last.payload or {}).get("risk_response", {})
         explanations = risk_payload.get("explanations", [])
         audit_id = risk_payload.get("audit_id") or last.external_audit_id
@@ -100,3 +221,51 @@ async def get_result(
         audit_id=audit_id,
     )
 
+
+@router.post(
+    "/batch", response_model=KYCBatchResponse, status_code=status.HTTP_202_ACCEPTED
+)
+async def submit_batch(
+    payload: KYCBatchRequest,
+    user: User = Depends(get_current_partner),
+    session: AsyncSession = Depends(get_db),
+) -> KYCBatchResponse:
+    """Create many applications whose documents are already in Storage."""
+
+    return await batch_service.submit_batch(session, user, payload)
+
+
+@router.post(
+    "/batch/archive", response_model=KYCBatchResponse, status_code=status.HTTP_202_ACCEPTED
+)
+async def submit_batch_archive(
+    manifest: str = Form(..., description="KYCBatchRequest JSON; documents name archive files"),
+    archive: UploadFile = File(..., description="Zip archive with the document images"),
+    user: User = Depends(get_current_partner),
+    session: AsyncSession = Depends(get_db),
+) -> KYCBatchResponse:
+    """Create many applications from a manifest and a zip of their documents."""
+
+    try:
+        payload = KYCBatchRequest.model_validate_json(manifest)
+    except ValidationError as exc:
+        raise RequestValidationError(exc.errors()) from exc
+    try:
+        bundle = await run_in_threadpool(zipfile.ZipFile, archive.file)
+    except zipfile.BadZipFile as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid zip archive"
+        ) from exc
+    with bundle:
+        return await batch_service.submit_batch(session, user, payload, archive=bundle)
+
+
+@router.get("/batch/{batch_id}", response_model=KYCBatchStatusResponse)
+async def get_batch_status(
+    batch_id: UUID,
+    user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_read_db),
+) -> KYCBatchStatusResponse:
+    """Return aggregate progress of a batch."""
+
+    return await batch_service.get_batch_status(session, batch_id, user)
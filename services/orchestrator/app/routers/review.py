@@ -4,14 +4,37 @@ from __future__ import annotations
 
 from uuid import UUID
 
-from fastapi import APIRouter, Depends
+import httpx
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..auth import get_current_staff
-from ..db import get_db
-from ..models import User
-from ..schemas import AuditLogResponse, ReviewActionRequest, ReviewQueueItem
-from ..services import orchestrator_service
+from ..config import settings
+from ..db import get_db, get_read_db
+from ..models import KYCStatus, User
+from ..clients import ClientError
+from ..responses import ORJSONResponse, bytes_response, etag_matches, stream_json_array
+from ..schemas import (
+    BulkReviewActionRequest,
+    BulkReviewResult,
+    ReviewActionRequest,
+    ReviewClaimItem,
+    ReviewClaimRequest,
+    ReviewLeaseItem,
+    ReviewLeaseRequest,
+    ReviewQueueItem,
+    ReviewSearchResult,
+    ReviewStatsResponse,
+)
+from ..services import (
+    derivatives,
+    document_hashes,
+    orchestrator_service,
+    queue_stats,
+    review_claims,
+)
+from ..workers.tasks import prefetch_review_derivatives
 
 router = APIRouter(prefix="/review", tags=["review"])
 
@@ -19,11 +42,92 @@ router = APIRouter(prefix="/review", tags=["review"])
 @router.get("/queue", response_model=list[ReviewQueueItem])
 async def review_queue(
     _: User = Depends(get_current_staff),
+) -> StreamingResponse:
+    """Stream the queue of flagged applications as a JSON array."""
+
+    return stream_json_array(orchestrator_service.stream_flagged_applications())
+
+
+@router.get("/stats", response_model=ReviewStatsResponse)
+async def review_stats(
+    status_filter: list[KYCStatus] | None = Query(None, alias="status"),
+    _: User = Depends(get_current_staff),
+    session: AsyncSession = Depends(get_read_db),
+) -> ReviewStatsResponse:
+    """Application counts by status, method and DRPA level plus a risk histogram.
+
+    Served from counters maintained on every status change, so the cost
+    does not grow with the number of applications.
+    """
+
+    return await queue_stats.get_queue_stats(
+        session, [s.value for s in status_filter] if status_filter else None
+    )
+
+
+@router.post("/claim", response_model=list[ReviewClaimItem])
+async def claim_reviews(
+    payload: ReviewClaimRequest,
+    reviewer: User = Depends(get_current_staff),
+    session: AsyncSession = Depends(get_db),
+) -> list[dict]:
+    """Lease the next flagged applications to the calling reviewer.
+
+    Viewer thumbnails and previews of the claimed cases are generated in
+    the background so they are ready when the reviewer opens them.
+    """
+
+    claimed = await review_claims.claim_applications(
+        session,
+        reviewer,
+        limit=min(payload.limit, settings.review_claim_max),
+        order=payload.order,
+    )
+    if claimed:
+        prefetch_review_derivatives.delay([str(item["application_id"]) for item in claimed])
+    return claimed
+
+
+@router.post("/claims/heartbeat", response_model=list[ReviewLeaseItem])
+async def renew_review_claims(
+    payload: ReviewLeaseRequest,
+    reviewer: User = Depends(get_current_staff),
+    session: AsyncSession = Depends(get_db),
+) -> list[dict]:
+    """Extend the caller's leases; applications missing from the reply were lost."""
+
+    return await review_claims.renew_leases(session, reviewer, payload.application_ids)
+
+
+@router.post("/claims/release", response_model=list[UUID])
+async def release_review_claims(
+    payload: ReviewLeaseRequest,
+    reviewer: User = Depends(get_current_staff),
     session: AsyncSession = Depends(get_db),
-) -> list[ReviewQueueItem]:
-    """Return queue of flagged applications."""
+) -> list[UUID]:
+    """Return the caller's leases to the queue without a decision."""
 
-    return await orchestrator_service.list_flagged_applications(session)
+    return await review_claims.release_leases(session, reviewer, payload.application_ids)
+
+
+@router.get("/search", response_model=list[ReviewSearchResult])
+async def review_search(
+    name: str | None = Query(None, min_length=1),
+    document_number: str | None = Query(None, min_length=1),
+    limit: int = Query(50, ge=1, le=200),
+    _: User = Depends(get_current_staff),
+    session: AsyncSession = Depends(get_read_db),
+) -> list[dict]:
+    """Search documents by OCR'd name or document number."""
+
+    if name is None and document_number is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Provide name or document_number",
+        )
+    return await orchestrator_service.search_documents(
+        session, name=name, document_number=document_number, limit=limit
+    )
 
 
 @router.get("/{application_id}")
@@ -31,33 +135,76 @@ async def review_detail(
     application_id: UUID,
     _: User = Depends(get_current_staff),
     session: AsyncSession = Depends(get_db),
-) -> dict:
+) -> ORJSONResponse:
     """Return detail for a KYC application."""
 
     application = await orchestrator_service.get_application_or_404(session, application_id)
     documents = [
         {
+            "document_id": doc.id,
+            **{
+                f"{variant}_url": f"/review/{application_id}/documents/{doc.id}/{variant}"
+                for variant in derivatives.VARIANTS
+            },
             "doc_type": doc.doc_type,
             "storage_path": doc.storage_path,
             "doc_confidence": doc.doc_confidence,
+            "phash": document_hashes.format_hash(doc.phash),
+            "near_duplicates": doc.near_duplicates or [],
         }
         for doc in application.documents
     ]
-    audits = await orchestrator_service.fetch_audit_logs(session, application_id)
-    return {
-        "application": orchestrator_service.build_result_response(application).model_dump(),
-        "documents": documents,
-        "audits": [
-            AuditLogResponse(
-                actor=a.actor,
-                action=a.action,
-                payload=a.payload,
-                log_hash=a.log_hash,
-                created_at=a.created_at,
-            ).model_dump()
-            for a in audits
-        ],
-    }
+    return ORJSONResponse(
+        {
+            "application": {
+                **orchestrator_service.build_result_response(application).model_dump(),
+                "version": application.version,
+            },
+            "documents": documents,
+            "audits": await orchestrator_service.fetch_audit_rows(session, application_id),
+        }
+    )
+
+
+@router.get("/{application_id}/documents/{document_id}/{variant}")
+async def document_derivative(
+    request: Request,
+    application_id: UUID,
+    document_id: UUID,
+    variant: str = Path(pattern="^(thumbnail|preview)$"),
+    _: User = Depends(get_current_staff),
+    session: AsyncSession = Depends(get_db),
+) -> Response:
+    """Serve a thumbnail or preview of a document, generating it on first use.
+
+    Supports ``If-None-Match`` and single byte ranges.
+    """
+
+    document = await orchestrator_service.get_document_or_404(
+        session, application_id, document_id
+    )
+    if_none_match = request.headers.get("if-none-match")
+    etag = derivatives.etag_for(document, variant)
+    if etag and etag_matches(if_none_match, etag):
+        return bytes_response(b"", media_type="image/jpeg", etag=etag, if_none_match=if_none_match)
+    try:
+        derivative = await derivatives.get_derivative(session, document, variant)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="Document is not an image",
+        )
+    except (ClientError, httpx.HTTPError):
+        raise HTTPException(
+            status_code=status.HTTP_502_BAD_GATEWAY, detail="Document unavailable in storage"
+        )
+    return bytes_response(
+        derivative.data,
+        media_type="image/jpeg",
+        etag=derivative.etag,
+        range_header=request.headers.get("range"),
+        if_none_match=if_none_match,
+    )
 
 
 @router.post("/{application_id}/action")
@@ -76,4 +223,14 @@ async def review_action(
     return {"status": application.status}
 
 
+@router.post("/bulk-action", response_model=list[BulkReviewResult])
+async def bulk_review_action(
+    payload: BulkReviewActionRequest,
+    reviewer: User = Depends(get_current_staff),
+    session: AsyncSession = Depends(get_db),
+) -> list[BulkReviewResult]:
+    """Apply one action to many flagged applications at the versions given."""
 
+    return await orchestrator_service.apply_bulk_review_action(
+        session, reviewer=reviewer, payload=payload
+    )
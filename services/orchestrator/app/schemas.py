@@ -2,11 +2,19 @@
 
 from __future__ import annotations
 
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import Any
 from uuid import UUID
 
-from pydantic import BaseModel, EmailStr, Field
+from pydantic import BaseModel, EmailStr, Field, field_validator
+
+
+def _as_utc(value: datetime | None) -> datetime | None:
+    """Mark naive timestamps (stored as UTC) as UTC so JSON carries an offset."""
+
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
 
 
 class UserRegisterRequest(BaseModel):
@@ -55,6 +63,44 @@ class KYCUploadResponse(BaseModel):
 
     message: str
     application_id: UUID
+    estimated_completion_at: datetime | None = None
+
+    @field_validator("estimated_completion_at")
+    @classmethod
+    def _utc_estimate(cls, value: datetime | None) -> datetime | None:
+        return _as_utc(value)
+
+
+class ResumableUploadRequest(BaseModel):
+    """Request opening a resumable upload of one document."""
+
+    application_id: UUID
+    doc_type: str = Field(pattern="^(id_card|address_proof|selfie)$")
+    length: int = Field(gt=0, description="Total size of the document in bytes")
+    filename: str | None = Field(default=None, max_length=255)
+    sha256: str | None = Field(
+        default=None,
+        pattern="^[0-9a-fA-F]{64}$",
+        description="Checksum verified once the last byte has arrived",
+    )
+
+
+class ResumableUploadResponse(BaseModel):
+    """State of a resumable upload; resume by sending bytes from ``offset``."""
+
+    upload_id: UUID
+    doc_type: str
+    offset: int
+    length: int
+    complete: bool
+    expires_at: datetime
+
+
+class ResumableUploadFinalizeRequest(BaseModel):
+    """Request submitting the completed uploads of an application."""
+
+    application_id: UUID
+    device_info: str | None = None
 
 
 class KYCStatusResponse(BaseModel):
@@ -64,6 +110,74 @@ class KYCStatusResponse(BaseModel):
     status: str
     risk_score: int | None = None
     drpa_level: str | None = None
+    estimated_completion_at: datetime | None = None
+
+    @field_validator("estimated_completion_at")
+    @classmethod
+    def _utc_estimate(cls, value: datetime | None) -> datetime | None:
+        return _as_utc(value)
+
+
+class BatchDocument(BaseModel):
+    """Document of a batch application.
+
+    JSON batches reference blobs already in Storage via ``storage_path``;
+    archive batches name a member of the uploaded zip via ``filename``.
+    """
+
+    doc_type: str = Field(pattern="^(id_card|address_proof|selfie)$")
+    storage_path: str | None = None
+    doc_hash: str | None = None
+    filename: str | None = None
+
+
+class BatchApplication(BaseModel):
+    """One application within a batch submission."""
+
+    external_ref: str | None = Field(default=None, max_length=128)
+    method: str = Field(pattern="^(doc|ssi|branch)$", default="doc")
+    documents: list[BatchDocument]
+    device_info: dict[str, Any] | None = None
+
+    @field_validator("documents")
+    @classmethod
+    def _require_id_and_selfie(cls, documents: list[BatchDocument]) -> list[BatchDocument]:
+        doc_types = {doc.doc_type for doc in documents}
+        if not {"id_card", "selfie"} <= doc_types:
+            raise ValueError("id_card and selfie documents are required")
+        return documents
+
+
+class KYCBatchRequest(BaseModel):
+    """Batch submission of KYC applications."""
+
+    applications: list[BatchApplication] = Field(min_length=1)
+
+
+class KYCBatchItem(BaseModel):
+    """Application created for a batch entry."""
+
+    external_ref: str | None = None
+    application_id: UUID
+
+
+class KYCBatchResponse(BaseModel):
+    """Response after a batch submission."""
+
+    batch_id: UUID
+    total: int
+    applications: list[KYCBatchItem]
+
+
+class KYCBatchStatusResponse(BaseModel):
+    """Aggregate progress of a batch."""
+
+    batch_id: UUID
+    total: int
+    completed: int
+    status_counts: dict[str, int]
+    created_at: datetime
+    completed_at: datetime | None = None
 
 
 class KYCResultResponse(KYCStatusResponse):
@@ -81,6 +195,65 @@ class ReviewQueueItem(BaseModel):
     risk_score: int | None = None
     status: str
     updated_at: datetime
+    version: int
+
+
+class RiskBucket(BaseModel):
+    """Applications whose risk score lies in ``[min_score, max_score)``."""
+
+    min_score: int
+    max_score: int
+    count: int
+
+
+class ReviewStatsResponse(BaseModel):
+    """Dashboard aggregates served from the precomputed counters."""
+
+    total: int
+    by_status: dict[str, int]
+    by_method: dict[str, int]
+    by_drpa_level: dict[str, int]
+    unscored: int
+    risk_histogram: list[RiskBucket]
+
+
+class ReviewClaimRequest(BaseModel):
+    """Lease the next flagged applications."""
+
+    limit: int = Field(default=10, ge=1)
+    order: str = Field(default="risk", pattern="^(risk|age)$")
+
+
+class ReviewClaimItem(ReviewQueueItem):
+    """Application leased to the requesting reviewer."""
+
+    claim_expires_at: datetime
+
+
+class ReviewLeaseRequest(BaseModel):
+    """Applications whose leases to renew or release."""
+
+    application_ids: list[UUID] = Field(min_length=1, max_length=500)
+
+
+class ReviewLeaseItem(BaseModel):
+    """Renewed lease."""
+
+    application_id: UUID
+    claim_expires_at: datetime
+
+
+class ReviewSearchResult(BaseModel):
+    """Document matching a reviewer search."""
+
+    application_id: UUID
+    user_email: EmailStr
+    status: str
+    risk_score: int | None = None
+    doc_type: str
+    name: str | None = None
+    document_number: str | None = None
+    updated_at: datetime
 
 
 class ReviewActionRequest(BaseModel):
@@ -88,6 +261,33 @@ class ReviewActionRequest(BaseModel):
 
     action: str = Field(pattern="^(approve|reject|request_info)$")
     notes: str | None = None
+    version: int | None = Field(
+        default=None, description="Application version the reviewer saw; 409 if it changed"
+    )
+
+
+class BulkReviewItem(BaseModel):
+    """Application targeted by a bulk review action."""
+
+    application_id: UUID
+    version: int
+
+
+class BulkReviewActionRequest(BaseModel):
+    """Apply one reviewer action to many flagged applications."""
+
+    action: str = Field(pattern="^(approve|reject|request_info)$")
+    notes: str | None = None
+    items: list[BulkReviewItem] = Field(min_length=1, max_length=500)
+
+
+class BulkReviewResult(BaseModel):
+    """Outcome for one application of a bulk review action."""
+
+    application_id: UUID
+    result: str = Field(description="updated, conflict or not_found")
+    status: str | None = None
+    version: int | None = None
 
 
 class AuditLogResponse(BaseModel):
@@ -0,0 +1,203 @@
+"""Admission control for new KYC submissions.
+
+Before an upload is accepted, the backlog of ``process_kyc`` messages in
+the broker is compared with per-method limits. The controller reads two
+signals from Redis:
+
+* the length of the Celery queue, and
+* pipeline completions and their run time over the last
+  ``ADMISSION_WINDOW_SECONDS``, which workers record in ten-second buckets
+  (:func:`record_completion`).
+
+From these it estimates how long a new application will wait. A
+submission is rejected with 503 and ``Retry-After`` when the queue is
+longer than the method's ``ADMISSION_QUEUE_LIMITS`` entry or the wait
+exceeds its ``ADMISSION_MAX_WAIT`` entry. Otherwise it is accepted and
+the estimate becomes the application's ``estimated_completion_at``.
+Branch traffic gets larger limits, so it is still admitted when
+self-service uploads are being shed. Partner batches are checked as a
+whole, per method, against the wait of their last application. If Redis
+cannot be read, submissions are admitted without an estimate.
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+import time
+from dataclasses import dataclass, replace
+from datetime import datetime, timedelta, timezone
+
+from redis import Redis, RedisError
+from starlette.concurrency import run_in_threadpool
+
+from .. import metrics
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+BUCKET_SECONDS = 10
+QUEUE_NAME = "celery"
+MIN_RETRY_AFTER = 30
+_DONE_KEY = "orchestrator:admission:done:{}"
+_BUSY_KEY = "orchestrator:admission:busy:{}"
+
+_client: Redis | None = None
+
+
+@dataclass(frozen=True)
+class QueueState:
+    """Backlog and recent throughput of the KYC pipeline."""
+
+    depth: int
+    completed: int
+    busy_seconds: float
+    window: float
+
+    @property
+    def throughput(self) -> float:
+        """Applications completed per second over the window."""
+
+        return self.completed / self.window if self.window else 0.0
+
+    def estimated_wait(self) -> float | None:
+        """Seconds until a newly queued application is decided, if known."""
+
+        if not self.completed:
+            return None
+        return (self.depth + 1) / self.throughput + self.busy_seconds / self.completed
+
+
+@dataclass(frozen=True)
+class Admission:
+    """Outcome of an admission check."""
+
+    accepted: bool
+    estimated_wait: float | None = None
+    retry_after: int | None = None
+
+    @property
+    def estimated_completion_at(self) -> datetime | None:
+        """When an application admitted now should be decided (aware UTC), if known."""
+
+        if self.estimated_wait is None:
+            return None
+        return datetime.now(timezone.utc) + timedelta(seconds=self.estimated_wait)
+
+
+def _redis() -> Redis:
+    global _client
+    if _client is None:
+        _client = Redis.from_url(settings.redis_url, socket_timeout=0.5)
+    return _client
+
+
+def record_completion(seconds: float) -> None:
+    """Count one finished application and its pipeline run time (worker side)."""
+
+    bucket = int(time.time() // BUCKET_SECONDS)
+    ttl = settings.admission_window_seconds + 2 * BUCKET_SECONDS
+    try:
+        pipe = _redis().pipeline(transaction=False)
+        pipe.incr(_DONE_KEY.format(bucket))
+        pipe.expire(_DONE_KEY.format(bucket), ttl)
+        pipe.incrbyfloat(_BUSY_KEY.format(bucket), seconds)
+        pipe.expire(_BUSY_KEY.format(bucket), ttl)
+        pipe.execute()
+    except RedisError as exc:
+        logger.debug("Could not record pipeline completion: %s", exc)
+
+
+def read_queue_state() -> QueueState:
+    """Current backlog and the completions of the last full buckets."""
+
+    current = int(time.time() // BUCKET_SECONDS)
+    buckets = range(current - settings.admission_window_seconds // BUCKET_SECONDS, current)
+    pipe = _redis().pipeline(transaction=False)
+    pipe.llen(QUEUE_NAME)
+    pipe.mget([_DONE_KEY.format(bucket) for bucket in buckets])
+    pipe.mget([_BUSY_KEY.format(bucket) for bucket in buckets])
+    depth, done, busy = pipe.execute()
+    return QueueState(
+        depth=int(depth),
+        completed=sum(int(value) for value in done if value),
+        busy_seconds=sum(float(value) for value in busy if value),
+        window=len(buckets) * BUCKET_SECONDS,
+    )
+
+
+def decide(state: QueueState, method: str, count: int = 1) -> Admission:
+    """Apply the method's limits to ``state`` for ``count`` new applications.
+
+    A batch is judged by its last application, which waits behind the rest.
+    """
+
+    state = replace(state, depth=state.depth + count - 1)
+    limits = settings.admission_queue_limits
+    waits = settings.admission_max_wait
+    max_depth = limits.get(method, min(limits.values()))
+    max_wait = waits.get(method, min(waits.values()))
+    wait = state.estimated_wait()
+    if state.depth < max_depth and (wait is None or wait <= max_wait):
+        return Admission(accepted=True, estimated_wait=wait)
+
+    if state.throughput:
+        # Time for the backlog to drain back under both limits.
+        excess = max(
+            state.depth - max_depth + 1,
+            (wait - max_wait) * state.throughput if wait is not None else 0,
+        )
+        retry_after = excess / state.throughput
+    else:
+        retry_after = MIN_RETRY_AFTER
+    retry_after = min(max(retry_after, MIN_RETRY_AFTER), settings.admission_retry_after_max)
+    return Admission(accepted=False, estimated_wait=wait, retry_after=math.ceil(retry_after))
+
+
+class AdmissionController:
+    """Per-process admission checks over a briefly cached queue state."""
+
+    def __init__(self) -> None:
+        self._state: QueueState | None = None
+        self._read_at = float("-inf")
+
+    async def _current_state(self) -> QueueState | None:
+        now = time.monotonic()
+        if now - self._read_at >= settings.admission_probe_interval:
+            self._read_at = now
+            try:
+                self._state = await run_in_threadpool(read_queue_state)
+            except RedisError as exc:
+                logger.warning("Admission control cannot read the queue: %s", exc)
+                self._state = None
+            wait = self._state.estimated_wait() if self._state is not None else None
+            if wait is not None:
+                metrics.ADMISSION_ESTIMATED_WAIT.set(wait)
+        return self._state
+
+    async def admit(self, method: str, count: int = 1) -> Admission:
+        """Decide whether ``count`` submissions of ``method`` are accepted now."""
+
+        if not settings.admission_enabled:
+            return Admission(accepted=True)
+        state = await self._current_state()
+        if state is None:
+            metrics.ADMISSION_DECISIONS.labels(method, "unknown").inc()
+            return Admission(accepted=True)
+        admission = decide(state, method, count)
+        metrics.ADMISSION_DECISIONS.labels(
+            method, "accepted" if admission.accepted else "rejected"
+        ).inc()
+        return admission
+
+
+_controller: AdmissionController | None = None
+
+
+def get_controller() -> AdmissionController:
+    """This process's admission controller."""
+
+    global _controller
+    if _controller is None:
+        _controller = AdmissionController()
+    return _controller
@@ -21,8 +21,13 @@ async def create_audit_log(
     actor: str,
     action: str,
     payload: dict[str, Any] | None = None,
+    commit: bool = True,
 ) -> AuditLog:
-    """Persist an audit log locally and via external service."""
+    """Persist an audit log locally and via external service.
+
+    With ``commit=False`` the entry is only flushed so callers can commit it
+    together with their own changes.
+    """
 
     audit_payload = {
         "application_id": str(application_id) if application_id else None,
@@ -41,8 +46,11 @@ async def create_audit_log(
         external_audit_id=external_response.get("audit_id"),
     )
     session.add(audit_log)
-    await session.commit()
-    await session.refresh(audit_log)
+    if commit:
+        await session.commit()
+        await session.refresh(audit_log)
+    else:
+        await session.flush()
     logger.info(
         "Audit log created action=%s app=%s hash=%s",
         action,
@@ -0,0 +1,259 @@
+"""Monthly range partitions for ``audit_logs`` with retention and archival.
+
+On Postgres ``audit_logs`` is partitioned by ``created_at`` (see migration
+``0004_partition_audit_logs``), one partition per calendar month named
+``audit_logs_yYYYYmMM``. :func:`ensure_partitions` creates the partitions
+for the coming months ahead of time; :func:`archive_expired_partitions`
+writes partitions older than the retention window to gzip NDJSON files and
+then detaches and drops them. Both are no-ops on other databases.
+
+Rows for a month without a partition go to ``audit_logs_default``
+(migration ``0016_audit_default_partition``) instead of failing the write.
+That happens only when maintenance has lapsed, and the next
+:func:`ensure_partitions` moves them into their month's partition.
+"""
+
+from __future__ import annotations
+
+import gzip
+import logging
+import os
+import re
+from dataclasses import dataclass
+from datetime import date, datetime
+from pathlib import Path
+
+import orjson
+from sqlalchemy import JSON, text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from .. import metrics
+
+logger = logging.getLogger(__name__)
+
+PARENT_TABLE = "audit_logs"
+DEFAULT_PARTITION = f"{PARENT_TABLE}_default"
+PARTITION_NAME = re.compile(r"^audit_logs_y(\d{4})m(\d{2})$")
+ARCHIVE_BATCH_SIZE = 5000
+
+
+@dataclass(frozen=True)
+class Partition:
+    """One monthly partition covering ``[start, end)``."""
+
+    start: date
+
+    @property
+    def end(self) -> date:
+        return add_months(self.start, 1)
+
+    @property
+    def name(self) -> str:
+        return f"{PARENT_TABLE}_y{self.start.year:04d}m{self.start.month:02d}"
+
+    @classmethod
+    def from_name(cls, name: str) -> Partition | None:
+        match = PARTITION_NAME.match(name)
+        if not match:
+            return None
+        return cls(date(int(match.group(1)), int(match.group(2)), 1))
+
+    @property
+    def bounds_sql(self) -> str:
+        return f"FOR VALUES FROM ('{self.start.isoformat()}') TO ('{self.end.isoformat()}')"
+
+    def create_sql(self) -> str:
+        return (
+            f"CREATE TABLE IF NOT EXISTS {self.name} PARTITION OF {PARENT_TABLE} "
+            f"{self.bounds_sql}"
+        )
+
+
+def month_start(value: date | datetime) -> date:
+    """Return the first day of the month containing ``value``."""
+
+    return date(value.year, value.month, 1)
+
+
+def add_months(value: date, months: int) -> date:
+    """Return the first day of the month ``months`` after ``value``'s month."""
+
+    index = value.year * 12 + value.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partitions_between(start: date, end: date) -> list[Partition]:
+    """Return the monthly partitions covering ``[start, end]``."""
+
+    first, last = month_start(start), month_start(end)
+    result = []
+    while first <= last:
+        result.append(Partition(first))
+        first = add_months(first, 1)
+    return result
+
+
+async def _is_partitioned(conn: AsyncConnection) -> bool:
+    if conn.dialect.name != "postgresql":
+        return False
+    relkind = await conn.scalar(
+        text("SELECT relkind FROM pg_class WHERE oid = to_regclass(:name)"),
+        {"name": PARENT_TABLE},
+    )
+    return relkind == "p"
+
+
+async def existing_partitions(conn: AsyncConnection) -> list[Partition]:
+    """Return the attached monthly partitions of ``audit_logs``, oldest first."""
+
+    result = await conn.execute(
+        text(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = to_regclass(:name)"
+        ),
+        {"name": PARENT_TABLE},
+    )
+    partitions = (Partition.from_name(name) for name in result.scalars())
+    return sorted((p for p in partitions if p), key=lambda p: p.start)
+
+
+async def _default_months(conn: AsyncConnection) -> set[date]:
+    """Months with rows in the default partition (none if it does not exist)."""
+
+    if await conn.scalar(text("SELECT to_regclass(:name)"), {"name": DEFAULT_PARTITION}) is None:
+        return set()
+    result = await conn.execute(
+        text(
+            "SELECT DISTINCT CAST(date_trunc('month', created_at) AS date) "
+            f"FROM {DEFAULT_PARTITION}"
+        )
+    )
+    return set(result.scalars())
+
+
+async def _move_from_default(conn: AsyncConnection, partition: Partition) -> int:
+    """Create ``partition`` from its month's rows in the default partition.
+
+    Postgres refuses to add a partition while the default one holds rows for
+    its range, so the rows are moved into a plain table that is then
+    attached. Returns the number of rows moved.
+    """
+
+    await conn.execute(
+        text(
+            f"CREATE TABLE {partition.name} "
+            f"(LIKE {PARENT_TABLE} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+        )
+    )
+    result = await conn.execute(
+        text(
+            f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} "
+            f"WHERE created_at >= '{partition.start.isoformat()}' "
+            f"AND created_at < '{partition.end.isoformat()}' RETURNING *) "
+            f"INSERT INTO {partition.name} SELECT * FROM moved"
+        )
+    )
+    await conn.execute(
+        text(
+            f"ALTER TABLE {PARENT_TABLE} ATTACH PARTITION {partition.name} "
+            f"{partition.bounds_sql}"
+        )
+    )
+    return result.rowcount
+
+
+async def ensure_partitions(
+    engine: AsyncEngine, *, months_ahead: int, now: datetime | None = None
+) -> list[str]:
+    """Create partitions from the current month to ``months_ahead`` months out.
+
+    Months that already have rows in the default partition get their
+    partition too, and the rows are moved into it. Returns the names of the
+    partitions that did not exist before.
+    """
+
+    today = month_start(now or datetime.utcnow())
+    async with engine.begin() as conn:
+        if not await _is_partitioned(conn):
+            return []
+        existing = {p.name for p in await existing_partitions(conn)}
+        stranded = await _default_months(conn)
+        wanted = set(partitions_between(today, add_months(today, months_ahead)))
+        wanted.update(Partition(month) for month in stranded)
+        created = []
+        for partition in sorted(wanted, key=lambda p: p.start):
+            if partition.name in existing:
+                continue
+            if partition.start in stranded:
+                moved = await _move_from_default(conn, partition)
+                metrics.AUDIT_DEFAULT_PARTITION_ROWS.inc(moved)
+                logger.warning(
+                    "Moved %s audit rows from %s into %s; partition maintenance had lapsed",
+                    moved,
+                    DEFAULT_PARTITION,
+                    partition.name,
+                )
+            else:
+                await conn.execute(text(partition.create_sql()))
+            created.append(partition.name)
+    if created:
+        logger.info("Created audit partitions %s", ", ".join(created))
+    return created
+
+
+async def _write_archive(conn: AsyncConnection, partition: Partition, path: Path) -> int:
+    """Dump one partition to ``path`` as gzip NDJSON; return the row count."""
+
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    rows = 0
+    result = await conn.stream(
+        text(f"SELECT * FROM {partition.name} ORDER BY created_at, id").columns(
+            payload=JSON
+        ),
+        execution_options={"yield_per": ARCHIVE_BATCH_SIZE},
+    )
+    with gzip.open(tmp_path, "wb") as fh:
+        async for row in result:
+            fh.write(orjson.dumps(dict(row._mapping), option=orjson.OPT_APPEND_NEWLINE))
+            rows += 1
+        fh.flush()
+        os.fsync(fh.fileno())
+    tmp_path.replace(path)
+    return rows
+
+
+async def archive_expired_partitions(
+    engine: AsyncEngine,
+    *,
+    retention_months: int,
+    archive_dir: Path,
+    now: datetime | None = None,
+) -> list[Path]:
+    """Archive and drop partitions that ended before the retention window.
+
+    Each partition is written to ``<archive_dir>/<partition>.ndjson.gz``
+    before it is detached and dropped, so an interrupted run leaves the data
+    in place and is simply repeated next time.
+    """
+
+    cutoff = add_months(month_start(now or datetime.utcnow()), -retention_months)
+    async with engine.connect() as conn:
+        if not await _is_partitioned(conn):
+            return []
+        expired = [p for p in await existing_partitions(conn) if p.end <= cutoff]
+        await conn.rollback()
+
+    archive_dir.mkdir(parents=True, exist_ok=True)
+    archived = []
+    for partition in expired:
+        path = archive_dir / f"{partition.name}.ndjson.gz"
+        async with engine.begin() as conn:
+            rows = await _write_archive(conn, partition, path)
+            await conn.execute(
+                text(f"ALTER TABLE {PARENT_TABLE} DETACH PARTITION {partition.name}")
+            )
+            await conn.execute(text(f"DROP TABLE {partition.name}"))
+        logger.info("Archived %s rows of %s to %s", rows, partition.name, path)
+        archived.append(path)
+    return archived
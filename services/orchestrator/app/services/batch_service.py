@@ -0,0 +1,282 @@
+"""Batch submission of KYC applications for partner integrations."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import zipfile
+from collections import Counter
+from datetime import datetime
+from typing import Any
+from uuid import UUID
+
+from fastapi import HTTPException, status
+from sqlalchemy import func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+
+from .. import schemas
+from ..clients import call_audit_append, upload_to_storage
+from ..config import settings
+from ..ids import uuid7
+from ..models import AuditLog, Document, KYCApplication, KYCBatch, KYCStatus, User
+from ..services import admission, document_hashes, events, queue_stats
+from ..workers.tasks import enqueue_batch
+
+logger = logging.getLogger(__name__)
+
+MAX_ARCHIVE_MEMBER_BYTES = 20 * 1024 * 1024
+UPLOAD_CONCURRENCY = 8
+TERMINAL_STATUSES = {
+    KYCStatus.APPROVED.value,
+    KYCStatus.REJECTED.value,
+    KYCStatus.FLAGGED.value,
+}
+
+
+def _unprocessable(index: int, message: str) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+        detail=f"applications[{index}]: {message}",
+    )
+
+
+def _check_storage_paths(user: User, payload: schemas.KYCBatchRequest) -> None:
+    """Require every referenced blob to lie under the caller's storage prefix.
+
+    Workers fetch these paths, so a caller must not point them at other
+    partners' or internal objects.
+    """
+
+    prefix = user.storage_prefix
+    if not prefix:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="No storage prefix configured; submit an archive instead",
+        )
+    for index, entry in enumerate(payload.applications):
+        for doc in entry.documents:
+            path = doc.storage_path
+            if path is None:
+                raise _unprocessable(index, "storage_path is required for every document")
+            if not path.startswith(prefix) or ".." in path[len(prefix) :].split("/"):
+                raise _unprocessable(index, f"{path!r} is outside {prefix!r}")
+
+
+async def _store_archive_documents(
+    payload: schemas.KYCBatchRequest, archive: zipfile.ZipFile
+) -> dict[str, int | None]:
+    """Upload the archive members referenced by ``payload`` to Storage.
+
+    Fills in ``storage_path``/``doc_hash`` on each document in place and
+    returns the perceptual hash of each document image by archive member.
+    """
+
+    members = {info.filename: info for info in archive.infolist() if not info.is_dir()}
+    for index, entry in enumerate(payload.applications):
+        for doc in entry.documents:
+            info = members.get(doc.filename or "")
+            if info is None:
+                raise _unprocessable(index, f"{doc.filename!r} not found in archive")
+            if info.file_size > MAX_ARCHIVE_MEMBER_BYTES:
+                raise _unprocessable(index, f"{doc.filename!r} is too large")
+
+    limiter = asyncio.Semaphore(UPLOAD_CONCURRENCY)
+    phashes: dict[str, int | None] = {}
+
+    async def _upload(doc: schemas.BatchDocument) -> None:
+        async with limiter:
+            # Decompression is CPU-bound; ZipFile reads are safe across threads.
+            data = await run_in_threadpool(archive.read, doc.filename)
+            stored = await run_in_threadpool(upload_to_storage, data, doc.filename)
+            if doc.doc_type in document_hashes.HASHED_DOC_TYPES:
+                phashes[doc.filename] = await run_in_threadpool(
+                    document_hashes.perceptual_hash, data
+                )
+        doc.storage_path = stored["storage_path"]
+        doc.doc_hash = stored.get("hash", "na")
+
+    await asyncio.gather(
+        *(_upload(doc) for entry in payload.applications for doc in entry.documents)
+    )
+    return phashes
+
+
+async def _admit(payload: schemas.KYCBatchRequest) -> dict[str, datetime | None]:
+    """Apply admission control to the whole batch; return estimates by method.
+
+    Partners go through the same backlog limits as uploads, or a large batch
+    could fill the queue the controller protects. Nothing is stored when
+    any method is over its limit.
+    """
+
+    counts = Counter(entry.method for entry in payload.applications)
+    controller = admission.get_controller()
+    decisions = {method: await controller.admit(method, count) for method, count in counts.items()}
+    rejected = [decision for decision in decisions.values() if not decision.accepted]
+    if rejected:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Verification queue is full, retry later",
+            headers={"Retry-After": str(max(decision.retry_after for decision in rejected))},
+        )
+    return {method: decision.estimated_completion_at for method, decision in decisions.items()}
+
+
+async def submit_batch(
+    session: AsyncSession,
+    user: User,
+    payload: schemas.KYCBatchRequest,
+    *,
+    archive: zipfile.ZipFile | None = None,
+) -> schemas.KYCBatchResponse:
+    """Create all applications of a batch and enqueue their processing.
+
+    Applications, documents and audit entries are written with one bulk
+    insert each and a single commit. The Audit service is called once for
+    the whole batch and its receipt is recorded on every entry.
+    """
+
+    if len(payload.applications) > settings.batch_max_applications:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"At most {settings.batch_max_applications} applications per batch",
+        )
+    if archive is None:
+        _check_storage_paths(user, payload)
+    estimates = await _admit(payload)
+    # Only archive uploads give us the image bytes to hash.
+    phashes: dict[str, int | None] = {}
+    if archive is not None:
+        phashes = await _store_archive_documents(payload, archive)
+
+    now = datetime.utcnow()
+    batch = KYCBatch(submitted_by=user.id, total=len(payload.applications))
+    session.add(batch)
+    await session.flush()
+
+    application_rows: list[dict[str, Any]] = []
+    document_rows: list[dict[str, Any]] = []
+    for entry in payload.applications:
+        app_id = uuid7()
+        application_rows.append(
+            {
+                "id": app_id,
+                "user_id": user.id,
+                "method": entry.method,
+                "status": KYCStatus.PROCESSING.value,
+                "batch_id": batch.id,
+                "external_ref": entry.external_ref,
+                "estimated_completion_at": estimates.get(entry.method),
+                "created_at": now,
+                "updated_at": now,
+            }
+        )
+        document_rows.extend(
+            {
+                "id": uuid7(),
+                "application_id": app_id,
+                "doc_type": doc.doc_type,
+                "storage_path": doc.storage_path,
+                "doc_hash": doc.doc_hash or "na",
+                "phash": phashes.get(doc.filename or ""),
+                "created_at": now,
+                "updated_at": now,
+            }
+            for doc in entry.documents
+        )
+
+    application_ids = [row["id"] for row in application_rows]
+    receipt = call_audit_append(
+        {
+            "application_id": None,
+            "actor": str(user.id),
+            "action": "kyc_batch_submit",
+            "payload": {
+                "batch_id": str(batch.id),
+                "application_ids": [str(app_id) for app_id in application_ids],
+            },
+        }
+    )
+    audit_rows = [
+        {
+            "id": uuid7(),
+            "application_id": row["id"],
+            "actor": str(user.id),
+            "action": "kyc_batch_submit",
+            "payload": {
+                "batch_id": str(batch.id),
+                "method": row["method"],
+                "external_ref": row["external_ref"],
+                "device_info": entry.device_info or {},
+            },
+            "log_hash": receipt.get("log_hash"),
+            "external_audit_id": receipt.get("audit_id"),
+            "created_at": now,
+        }
+        for row, entry in zip(application_rows, payload.applications)
+    ]
+
+    await session.execute(insert(KYCApplication), application_rows)
+    await session.execute(insert(Document), document_rows)
+    await session.execute(insert(AuditLog), audit_rows)
+    await queue_stats.record_transitions(
+        session,
+        (
+            (None, queue_stats.counter_key(KYCStatus.PROCESSING.value, row["method"]))
+            for row in application_rows
+        ),
+    )
+    events.record(
+        session,
+        *(
+            events.StatusChanged(
+                application_id=row["id"],
+                method=row["method"],
+                from_status=None,
+                to_status=KYCStatus.PROCESSING.value,
+                actor=str(user.id),
+                occurred_at=now,
+            )
+            for row in application_rows
+        ),
+    )
+    await session.commit()
+
+    enqueue_batch(batch.id, application_ids)
+    logger.info("Enqueued batch %s with %s applications", batch.id, len(application_ids))
+    return schemas.KYCBatchResponse(
+        batch_id=batch.id,
+        total=batch.total,
+        applications=[
+            schemas.KYCBatchItem(external_ref=row["external_ref"], application_id=row["id"])
+            for row in application_rows
+        ],
+    )
+
+
+async def get_batch_status(
+    session: AsyncSession, batch_id: UUID, user: User
+) -> schemas.KYCBatchStatusResponse:
+    """Return aggregate progress of a batch for its submitter or staff."""
+
+    batch = await session.get(KYCBatch, batch_id)
+    if batch is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not found")
+    if batch.submitted_by != user.id and not user.is_staff:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden")
+
+    result = await session.execute(
+        select(KYCApplication.status, func.count())
+        .where(KYCApplication.batch_id == batch_id)
+        .group_by(KYCApplication.status)
+    )
+    counts = {row_status: count for row_status, count in result}
+    return schemas.KYCBatchStatusResponse(
+        batch_id=batch.id,
+        total=batch.total,
+        completed=sum(counts.get(s, 0) for s in TERMINAL_STATUSES),
+        status_counts=counts,
+        created_at=batch.created_at,
+        completed_at=batch.completed_at,
+    )
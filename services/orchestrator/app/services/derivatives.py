@@ -0,0 +1,133 @@
+"""Thumbnails and previews of documents for the reviewer viewer.
+
+Variants are generated lazily from the original in storage on first request
+(or ahead of time for freshly claimed cases, see :func:`prefetch`). Each
+derivative is kept in two tiers: the host-local image cache from
+:mod:`app.services.image_normalizer` and storage, whose path is recorded on
+``documents.derivatives`` together with the derivative's SHA-256. The hash
+doubles as the ETag and guards both tiers against stale or foreign bytes.
+"""
+
+from __future__ import annotations
+
+import logging
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import Any
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+
+from .. import metrics
+from ..clients import download_from_storage, upload_to_storage
+from ..models import Document
+from . import image_normalizer
+
+logger = logging.getLogger(__name__)
+
+VARIANTS = ("thumbnail", "preview")
+
+
+@dataclass(frozen=True)
+class Derivative:
+    """Encoded derivative image and its entity tag."""
+
+    data: bytes
+    etag: str
+
+
+def etag_for(document: Document, variant: str) -> str | None:
+    """ETag of an already generated derivative, without loading it."""
+
+    record = (document.derivatives or {}).get(variant)
+    return f'"{record["sha256"][:32]}"' if record else None
+
+
+async def _load_recorded(record: dict[str, Any], variant: str) -> bytes | None:
+    """Recorded derivative from the local cache, else from storage."""
+
+    cache = image_normalizer.get_cache()
+    data = cache.get(record["source"], variant)
+    if data is not None and image_normalizer.content_digest(data) == record["sha256"]:
+        metrics.DERIVATIVE_REQUESTS.labels(variant, "local").inc()
+        return data
+    try:
+        data = await run_in_threadpool(download_from_storage, record["storage_path"])
+    except Exception as exc:
+        logger.warning("Derivative %s unavailable in storage: %s", record["storage_path"], exc)
+        return None
+    if image_normalizer.content_digest(data) != record["sha256"]:
+        return None
+    cache.put(record["source"], variant, data)
+    metrics.DERIVATIVE_REQUESTS.labels(variant, "storage").inc()
+    return data
+
+
+async def _generate(session: AsyncSession, document: Document, variant: str) -> Derivative:
+    """Derive ``variant`` from the original, store it and record it on ``document``.
+
+    Raises ``ValueError`` if the original is not an image.
+    """
+
+    original = await run_in_threadpool(download_from_storage, document.storage_path)
+    source = image_normalizer.content_digest(original)
+    data = await image_normalizer.derive(original, variant, digest=source, passthrough=False)
+    record = {
+        "source": source,
+        "sha256": image_normalizer.content_digest(data),
+        "bytes": len(data),
+    }
+    metrics.DERIVATIVE_REQUESTS.labels(variant, "generated").inc()
+    try:
+        stored = await run_in_threadpool(
+            upload_to_storage, data, f"derivatives/{source}-{variant}.jpg"
+        )
+    except Exception as exc:
+        # Still served from the local cache; the next host to miss regenerates.
+        logger.warning("Could not store %s of document %s: %s", variant, document.id, exc)
+    else:
+        record["storage_path"] = stored["storage_path"]
+        document.derivatives = {**(document.derivatives or {}), variant: record}
+        await session.commit()
+    return Derivative(data, f'"{record["sha256"][:32]}"')
+
+
+async def get_derivative(session: AsyncSession, document: Document, variant: str) -> Derivative:
+    """``variant`` of ``document``, generating it on first use.
+
+    Raises ``ValueError`` if the document is not an image and lets storage
+    client errors for the original propagate.
+    """
+
+    record = (document.derivatives or {}).get(variant)
+    if record:
+        data = await _load_recorded(record, variant)
+        if data is not None:
+            return Derivative(data, f'"{record["sha256"][:32]}"')
+    return await _generate(session, document, variant)
+
+
+async def prefetch(session: AsyncSession, application_ids: Sequence[UUID]) -> int:
+    """Generate the missing derivatives of every document of ``application_ids``.
+
+    Returns the number generated. Failures are logged and skipped: the
+    viewer generates on demand anyway.
+    """
+
+    documents = await session.scalars(
+        select(Document).where(Document.application_id.in_(application_ids))
+    )
+    generated = 0
+    for document in documents.all():
+        for variant in VARIANTS:
+            if (document.derivatives or {}).get(variant):
+                continue
+            try:
+                await _generate(session, document, variant)
+            except Exception as exc:
+                logger.info("Skipped %s of document %s: %s", variant, document.id, exc)
+                continue
+            generated += 1
+    return generated
@@ -0,0 +1,313 @@
+"""Perceptual hashes of ID images and a Hamming-distance index over them.
+
+:func:`perceptual_hash` is a 64-bit DCT hash (pHash): the image is reduced
+to 32x32 greyscale, and each bit records whether one of the 8x8 lowest
+frequency coefficients is above their median. Re-photographed, rescaled or
+lightly edited copies of a document land within a few bits of each other,
+where ``doc_hash`` only matches byte-identical files. Hashes are stored as
+signed ``BIGINT`` and handled here as ``uint64``.
+
+:class:`HammingIndex` finds hashes within a radius with multi-index hashing:
+each hash is split into ``m`` chunks with one lookup table per chunk. By
+pigeonhole, a hash within distance ``r`` matches the query to within
+``r // m`` bits on at least one chunk, so only those table buckets are
+verified. Four 16-bit chunks suit small indexes; from about a million
+hashes three ~21-bit chunks keep buckets small enough that a radius-8
+query verifies a few thousand candidates instead of tens of thousands.
+
+:class:`DocumentHashIndex` keeps one in step with ``documents`` per worker
+process.
+"""
+
+from __future__ import annotations
+
+import io
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from functools import lru_cache
+from uuid import UUID
+
+import numpy as np
+from PIL import Image
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .. import metrics
+from ..config import settings
+from ..models import Document
+
+logger = logging.getLogger(__name__)
+
+# Selfies are covered by the face index; only document images are hashed.
+HASHED_DOC_TYPES = frozenset({"id_card", "address_proof"})
+HASH_BITS = 64
+# Index size from which hashes are split into three chunks instead of four.
+WIDE_CHUNKS_FROM = 1 << 20
+_SAMPLE_SIZE = 32
+_LOW_FREQUENCIES = 8
+# Rows committed out of created_at order are re-read within this window.
+REFRESH_LOOKBACK = timedelta(minutes=5)
+
+_POPCOUNT = np.array([bin(value).count("1") for value in range(256)], dtype=np.uint8)
+_DCT = np.cos(
+    np.pi
+    * np.arange(_SAMPLE_SIZE)[:, None]
+    * (2 * np.arange(_SAMPLE_SIZE)[None, :] + 1)
+    / (2 * _SAMPLE_SIZE)
+).astype(np.float32)
+
+
+@dataclass(frozen=True)
+class HashMatch:
+    """An indexed document whose hash is close to the query."""
+
+    document_id: UUID
+    distance: int
+
+
+def perceptual_hash(data: bytes) -> int | None:
+    """Signed 64-bit pHash of an image, or ``None`` if ``data`` is not one."""
+
+    try:
+        with Image.open(io.BytesIO(data)) as image:
+            # JPEGs decode straight to a reduced size, which dominates the cost.
+            image.draft("L", (_SAMPLE_SIZE * 4, _SAMPLE_SIZE * 4))
+            sample = image.convert("L").resize(
+                (_SAMPLE_SIZE, _SAMPLE_SIZE), Image.Resampling.LANCZOS
+            )
+            pixels = np.asarray(sample, dtype=np.float32)
+    except (OSError, ValueError, Image.DecompressionBombError):
+        return None
+    low = (_DCT @ pixels @ _DCT.T)[:_LOW_FREQUENCIES, :_LOW_FREQUENCIES].ravel()
+    bits = low > np.median(low[1:])
+    return to_signed(int.from_bytes(np.packbits(bits).tobytes(), "big"))
+
+
+def to_signed(value: int) -> int:
+    """Map an unsigned 64-bit hash onto the ``BIGINT`` range."""
+
+    return value - (1 << HASH_BITS) if value >= 1 << (HASH_BITS - 1) else value
+
+
+def to_unsigned(value: int) -> int:
+    """Inverse of :func:`to_signed`."""
+
+    return value & ((1 << HASH_BITS) - 1)
+
+
+def format_hash(value: int | None) -> str | None:
+    """Hex form of a stored hash for display."""
+
+    return None if value is None else f"{to_unsigned(value):016x}"
+
+
+def hamming_distances(hashes: np.ndarray, query: int) -> np.ndarray:
+    """Bit differences between every ``uint64`` in ``hashes`` and ``query``."""
+
+    differing = np.ascontiguousarray(hashes ^ np.uint64(to_unsigned(query)))
+    return _POPCOUNT[differing.view(np.uint8)].reshape(-1, 8).sum(axis=1, dtype=np.int32)
+
+
+@lru_cache(maxsize=None)
+def _flip_masks(width: int, radius: int) -> np.ndarray:
+    """Every ``width``-bit value with at most ``radius`` bits set."""
+
+    values = np.arange(1 << width, dtype=np.uint32)
+    weights = _POPCOUNT[values.view(np.uint8)].reshape(-1, 4).sum(axis=1)
+    return values[weights <= radius].astype(np.int64)
+
+
+def chunk_widths(size: int) -> tuple[int, ...]:
+    """Bit widths the hashes of an index of ``size`` are split into."""
+
+    chunks = 3 if size >= WIDE_CHUNKS_FROM else 4
+    return tuple(HASH_BITS // chunks + (i < HASH_BITS % chunks) for i in range(chunks))
+
+
+class HammingIndex:
+    """Immutable multi-index hash table over ``uint64`` hashes."""
+
+    def __init__(self, hashes: np.ndarray) -> None:
+        self.hashes = np.ascontiguousarray(hashes, dtype=np.uint64)
+        widths = chunk_widths(len(self.hashes))
+        shifts = np.cumsum((0,) + widths[:-1])
+        self._chunks = [(int(shift), width) for shift, width in zip(shifts, widths)]
+        self._tables = [self._build_table(shift, width) for shift, width in self._chunks]
+
+    def __len__(self) -> int:
+        return len(self.hashes)
+
+    @staticmethod
+    def _keys(hashes: np.ndarray, shift: int, width: int) -> np.ndarray:
+        mask = np.uint64((1 << width) - 1)
+        return ((hashes >> np.uint64(shift)) & mask).astype(np.int64)
+
+    def _build_table(self, shift: int, width: int) -> tuple[np.ndarray, np.ndarray]:
+        """Rows sorted by chunk value, with bucket offsets (a CSR layout)."""
+
+        keys = self._keys(self.hashes, shift, width)
+        offsets = np.zeros((1 << width) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(keys, minlength=1 << width), out=offsets[1:])
+        return offsets, np.argsort(keys, kind="stable").astype(np.uint32)
+
+    def search(self, query: int, radius: int) -> tuple[np.ndarray, np.ndarray]:
+        """Rows within ``radius`` bits of ``query`` and their distances."""
+
+        query_array = np.array([to_unsigned(query)], dtype=np.uint64)
+        chunk_radius = radius // len(self._chunks)
+        buckets = []
+        for (shift, width), (offsets, rows) in zip(self._chunks, self._tables):
+            key = int(self._keys(query_array, shift, width)[0])
+            probes = key ^ _flip_masks(width, chunk_radius)
+            starts = offsets[probes]
+            lengths = offsets[probes + 1] - starts
+            total = int(lengths.sum())
+            if total:
+                # Concatenated bucket ranges without a Python loop over probes.
+                positions = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+                buckets.append(rows[positions + np.arange(total)])
+        if not buckets:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int32)
+        candidates = np.unique(np.concatenate(buckets)).astype(np.int64)
+        distances = hamming_distances(self.hashes[candidates], query)
+        keep = distances <= radius
+        return candidates[keep], distances[keep]
+
+
+class DocumentHashIndex:
+    """Process-wide hash index kept in step with ``documents``.
+
+    New hashes go to a small tail that is scanned linearly and merged into
+    the multi-index tables once it outgrows ``max(4096, size / 16)``.
+    Document ids are held as a ``(n, 16)`` byte array rather than ``UUID``
+    objects so millions of them fit in tens of megabytes.
+    """
+
+    def __init__(self) -> None:
+        self._index = HammingIndex(np.empty(0, dtype=np.uint64))
+        self._document_ids = np.empty((0, 16), dtype=np.uint8)
+        self._tail_hashes: list[int] = []
+        self._tail_ids: list[bytes] = []
+        # Documents read within the lookback window, so re-reads are skipped.
+        self._recent: dict[UUID, datetime] = {}
+        self._watermark: datetime | None = None
+        self._built_at = float("-inf")
+        self._refreshed_at = float("-inf")
+
+    def __len__(self) -> int:
+        return len(self._index) + len(self._tail_hashes)
+
+    def add(self, document_id: UUID, phash: int, created_at: datetime) -> None:
+        """Index one document hash; documents seen recently are ignored."""
+
+        if document_id in self._recent:
+            return
+        self._recent[document_id] = created_at
+        self._tail_hashes.append(to_unsigned(phash))
+        self._tail_ids.append(document_id.bytes)
+        if len(self._tail_hashes) > max(4096, len(self._index) // 16):
+            self._merge_tail()
+
+    def search(self, phash: int, radius: int, *, limit: int) -> list[HashMatch]:
+        """Up to ``limit`` indexed documents within ``radius`` bits of ``phash``, closest first."""
+
+        started = time.perf_counter()
+        rows, distances = self._index.search(phash, radius)
+        matches = [
+            (distance, self._document_ids[row].tobytes())
+            for row, distance in zip(rows.tolist(), distances.tolist())
+        ]
+        if self._tail_hashes:
+            tail = hamming_distances(np.array(self._tail_hashes, dtype=np.uint64), phash)
+            matches.extend(
+                (int(tail[i]), self._tail_ids[i]) for i in np.flatnonzero(tail <= radius)
+            )
+        metrics.DOCUMENT_HASH_SEARCH_SECONDS.observe(time.perf_counter() - started)
+        matches.sort()
+        return [HashMatch(UUID(bytes=raw), distance) for distance, raw in matches[:limit]]
+
+    def _merge_tail(self) -> None:
+        hashes = np.concatenate([self._index.hashes, np.array(self._tail_hashes, dtype=np.uint64)])
+        tail_ids = np.frombuffer(b"".join(self._tail_ids), dtype=np.uint8).reshape(-1, 16)
+        self._document_ids = np.concatenate([self._document_ids, tail_ids])
+        self._index = HammingIndex(hashes)
+        self._tail_hashes, self._tail_ids = [], []
+        metrics.DOCUMENT_HASH_INDEX_SIZE.set(len(self))
+
+    async def refresh(self, session: AsyncSession) -> None:
+        """Rebuild from the database or pull documents added since the last refresh.
+
+        Same cadence as the face index: a full rebuild every
+        ``DOCUMENT_HASH_REBUILD_INTERVAL`` seconds, otherwise new rows at
+        most every ``DOCUMENT_HASH_REFRESH_INTERVAL`` seconds.
+        """
+
+        now = time.monotonic()
+        if now - self._built_at >= settings.document_hash_rebuild_interval:
+            await self._rebuild(session)
+            self._built_at = self._refreshed_at = now
+        elif now - self._refreshed_at >= settings.document_hash_refresh_interval:
+            await self._load_since_watermark(session)
+            self._refreshed_at = now
+
+    def _query(self):
+        return (
+            select(Document.id, Document.phash, Document.created_at)
+            .where(Document.phash.is_not(None))
+            .order_by(Document.created_at, Document.id)
+        )
+
+    async def _rebuild(self, session: AsyncSession) -> None:
+        started = time.perf_counter()
+        hashes: list[int] = []
+        ids: list[bytes] = []
+        recent: dict[UUID, datetime] = {}
+        rows = await session.stream(self._query().execution_options(yield_per=50_000))
+        async for document_id, phash, created_at in rows:
+            hashes.append(to_unsigned(phash))
+            ids.append(document_id.bytes)
+            recent[document_id] = created_at
+            self._watermark = created_at
+
+        self._index = HammingIndex(np.array(hashes, dtype=np.uint64))
+        self._document_ids = np.frombuffer(b"".join(ids), dtype=np.uint8).reshape(-1, 16)
+        self._tail_hashes, self._tail_ids = [], []
+        self._recent = recent
+        self._prune_recent()
+        metrics.DOCUMENT_HASH_INDEX_SIZE.set(len(self))
+        logger.info(
+            "Document hash index rebuilt with %s hashes in %.1fs",
+            len(hashes),
+            time.perf_counter() - started,
+        )
+
+    async def _load_since_watermark(self, session: AsyncSession) -> None:
+        query = self._query()
+        if self._watermark is not None:
+            query = query.where(Document.created_at >= self._watermark - REFRESH_LOOKBACK)
+        for document_id, phash, created_at in await session.execute(query):
+            self.add(document_id, phash, created_at)
+            if self._watermark is None or created_at > self._watermark:
+                self._watermark = created_at
+        self._prune_recent()
+        metrics.DOCUMENT_HASH_INDEX_SIZE.set(len(self))
+
+    def _prune_recent(self) -> None:
+        if self._watermark is None:
+            return
+        cutoff = self._watermark - REFRESH_LOOKBACK
+        self._recent = {key: at for key, at in self._recent.items() if at >= cutoff}
+
+
+_document_hash_index: DocumentHashIndex | None = None
+
+
+def get_document_hash_index() -> DocumentHashIndex:
+    """This process's document hash index."""
+
+    global _document_hash_index
+    if _document_hash_index is None:
+        _document_hash_index = DocumentHashIndex()
+    return _document_hash_index
@@ -0,0 +1,402 @@
+"""Application events on a Redis stream.
+
+Every status transition is recorded as a typed event on the database
+session that makes it (:func:`record`) and published only once that
+transaction commits, so consumers never see a change that was rolled
+back. Publishing hands events to a per-process :class:`EventPublisher`,
+which sends them from a background thread in pipelined ``XADD`` batches
+over a pooled connection. The request or task that committed does not
+wait for Redis. Each ``XADD`` trims entries older than
+``EVENTS_RETENTION_SECONDS`` from the stream (``MINID ~``).
+
+Unlike pub/sub, the stream keeps events for consumers that are offline.
+Downstream services read it through consumer groups
+(:class:`EventConsumer`). Each group gets every event; its consumers share
+them and acknowledge what they handled. After downtime a group resumes
+from its last acknowledged entry, and entries a crashed consumer left
+pending are claimed by the others.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import socket
+import threading
+import time
+from collections import deque
+from collections.abc import Callable, Iterable, Sequence
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from typing import Any, ClassVar
+from uuid import UUID
+
+import orjson
+from redis import ConnectionPool, Redis, RedisError, ResponseError
+from sqlalchemy import event as sa_event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from .. import metrics
+from ..config import settings
+from ..models import KYCApplication
+
+logger = logging.getLogger(__name__)
+
+# Pause after a failed send, doubled per consecutive failure up to the max.
+RETRY_BACKOFF = 0.1
+RETRY_BACKOFF_MAX = 5.0
+_PENDING_KEY = "pending_events"
+
+
+@dataclass(frozen=True, kw_only=True)
+class Event:
+    """Base of all events; ``type`` names the event on the stream."""
+
+    type: ClassVar[str]
+    application_id: UUID
+    occurred_at: datetime = field(default_factory=datetime.utcnow)
+
+    def to_fields(self) -> dict[str, bytes | str]:
+        """Stream entry fields."""
+
+        return {
+            "type": self.type,
+            "application_id": str(self.application_id),
+            "data": orjson.dumps(asdict(self)),
+        }
+
+
+@dataclass(frozen=True, kw_only=True)
+class StatusChanged(Event):
+    """An application moved between statuses; ``from_status`` is None on creation."""
+
+    type: ClassVar[str] = "application.status_changed"
+    method: str
+    from_status: str | None
+    to_status: str
+    actor: str
+    risk_score: int | None = None
+    drpa_level: str | None = None
+
+
+@dataclass(frozen=True, kw_only=True)
+class RiskScored(Event):
+    """The pipeline finished scoring an application."""
+
+    type: ClassVar[str] = "application.risk_scored"
+    risk_score: int | None
+    drpa_level: str | None
+
+
+def status_changed(
+    application: KYCApplication, from_status: str | None, *, actor: str
+) -> StatusChanged:
+    """Event for ``application`` having just left ``from_status``."""
+
+    return StatusChanged(
+        application_id=application.id,
+        method=application.method,
+        from_status=from_status,
+        to_status=application.status,
+        actor=actor,
+        risk_score=application.risk_score,
+        drpa_level=application.drpa_level,
+    )
+
+
+EVENT_TYPES: dict[str, type[Event]] = {cls.type: cls for cls in (StatusChanged, RiskScored)}
+
+
+def decode(fields: dict[bytes, bytes]) -> Event:
+    """Inverse of :meth:`Event.to_fields`."""
+
+    data = orjson.loads(fields[b"data"])
+    data["application_id"] = UUID(data["application_id"])
+    data["occurred_at"] = datetime.fromisoformat(data["occurred_at"])
+    return EVENT_TYPES[fields[b"type"].decode()](**data)
+
+
+def record(session: AsyncSession | Session, *events: Event) -> None:
+    """Publish ``events`` when ``session``'s transaction commits."""
+
+    if settings.events_enabled:
+        session.info.setdefault(_PENDING_KEY, []).extend(events)
+
+
+@sa_event.listens_for(Session, "after_commit")
+def _publish_committed(session: Session) -> None:
+    pending = session.info.pop(_PENDING_KEY, None)
+    if pending:
+        get_publisher().publish(pending)
+
+
+@sa_event.listens_for(Session, "after_soft_rollback")
+def _discard_rolled_back(session: Session, previous_transaction) -> None:
+    session.info.pop(_PENDING_KEY, None)
+
+
+class EventPublisher:
+    """Buffers events and sends them to the stream in batches.
+
+    :meth:`publish` only appends to an in-memory buffer. A daemon thread
+    waits up to ``linger`` seconds for a batch to fill, then sends up to
+    ``batch_size`` events in one pipeline. Batches failing on Redis are
+    retried with backoff; a batch failing otherwise (e.g. it cannot be
+    encoded) is dropped. Beyond ``max_buffer`` events, the oldest are
+    dropped so a Redis outage cannot exhaust memory.
+    """
+
+    def __init__(
+        self,
+        client: Redis,
+        *,
+        stream: str,
+        retention: float,
+        batch_size: int = 100,
+        linger: float = 0.02,
+        max_buffer: int = 10_000,
+    ) -> None:
+        self.client = client
+        self.stream = stream
+        self.retention = retention
+        self.batch_size = batch_size
+        self.linger = linger
+        self.max_buffer = max_buffer
+        self._buffer: deque[Event] = deque()
+        self._sending = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        self._thread: threading.Thread | None = None
+
+    def publish(self, events: Iterable[Event]) -> None:
+        """Queue ``events`` for sending; never blocks on Redis."""
+
+        with self._cond:
+            for item in events:
+                if len(self._buffer) >= self.max_buffer:
+                    self._buffer.popleft()
+                    metrics.EVENTS_DROPPED.inc()
+                self._buffer.append(item)
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="event-publisher", daemon=True
+                )
+                self._thread.start()
+            self._cond.notify_all()
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Wait until everything queued so far was sent; False on timeout."""
+
+        with self._cond:
+            return self._cond.wait_for(lambda: not self._buffer and not self._sending, timeout)
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Send what is buffered (within ``timeout``) and stop the thread."""
+
+        self.flush(timeout)
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def send(self, batch: Sequence[Event]) -> None:
+        """``XADD`` ``batch`` in one round trip, trimming entries past retention."""
+
+        min_id = f"{int((time.time() - self.retention) * 1000)}-0"
+        pipe = self.client.pipeline(transaction=False)
+        for item in batch:
+            pipe.xadd(self.stream, item.to_fields(), minid=min_id, approximate=True)
+        pipe.execute()
+        for item in batch:
+            metrics.EVENTS_PUBLISHED.labels(item.type).inc()
+
+    def _next_batch(self) -> list[Event] | None:
+        with self._cond:
+            self._cond.wait_for(lambda: self._buffer or self._closed)
+            if not self._buffer:
+                return None
+            if len(self._buffer) < self.batch_size and not self._closed:
+                self._cond.wait_for(
+                    lambda: len(self._buffer) >= self.batch_size or self._closed, self.linger
+                )
+            count = min(self.batch_size, len(self._buffer))
+            batch = [self._buffer.popleft() for _ in range(count)]
+            self._sending = len(batch)
+            return batch
+
+    def _run(self) -> None:
+        try:
+            self._send_batches()
+        finally:
+            # Let publish() start a new thread should this one ever die.
+            with self._cond:
+                self._thread = None
+                self._sending = 0
+                self._cond.notify_all()
+
+    def _send_batches(self) -> None:
+        failures = 0
+        while (batch := self._next_batch()) is not None:
+            try:
+                self.send(batch)
+            except RedisError as exc:
+                metrics.EVENT_PUBLISH_ERRORS.inc()
+                failures += 1
+                if failures == 1:
+                    logger.warning("Publishing %s events failed: %s", len(batch), exc)
+                with self._cond:
+                    self._buffer.extendleft(reversed(batch))
+                    self._sending = 0
+                    if self._closed:
+                        metrics.EVENTS_DROPPED.inc(len(self._buffer))
+                        self._buffer.clear()
+                    self._cond.notify_all()
+                time.sleep(min(RETRY_BACKOFF * 2 ** (failures - 1), RETRY_BACKOFF_MAX))
+                continue
+            except Exception:
+                # Retrying would fail the same way; drop the batch, keep the thread.
+                logger.exception("Dropping %s events that could not be published", len(batch))
+                metrics.EVENT_PUBLISH_ERRORS.inc()
+                metrics.EVENTS_DROPPED.inc(len(batch))
+            failures = 0
+            with self._cond:
+                self._sending = 0
+                self._cond.notify_all()
+
+
+class EventConsumer:
+    """Member ``consumer`` of consumer group ``group`` on the event stream.
+
+    :meth:`run` first re-reads this consumer's own unacknowledged entries
+    (it may have crashed while handling them). It then claims entries
+    other consumers left pending for ``claim_idle`` seconds, and reads new
+    ones. The handler gets a batch of ``(entry_id, event)`` pairs, and the
+    batch is acknowledged once the handler returns, so delivery is
+    at-least-once.
+    """
+
+    def __init__(
+        self,
+        client: Redis,
+        *,
+        group: str,
+        consumer: str | None = None,
+        stream: str | None = None,
+        batch_size: int = 100,
+        block: float = 5.0,
+        claim_idle: float = 60.0,
+    ) -> None:
+        self.client = client
+        self.group = group
+        self.consumer = consumer or f"{socket.gethostname()}-{os.getpid()}"
+        self.stream = stream or settings.events_stream
+        self.batch_size = batch_size
+        self.block = block
+        self.claim_idle = claim_idle
+        self._backlog = True
+
+    def ensure_group(self, start: str = "0") -> None:
+        """Create the group if missing; ``start="0"`` replays retained history."""
+
+        try:
+            self.client.xgroup_create(self.stream, self.group, id=start, mkstream=True)
+        except ResponseError as exc:
+            if "BUSYGROUP" not in str(exc):
+                raise
+
+    def _decode(self, entries) -> list[tuple[bytes, Event]]:
+        decoded = []
+        for entry_id, fields in entries:
+            if not fields:
+                # Pending entry that has been trimmed from the stream.
+                self.ack([entry_id])
+                continue
+            try:
+                decoded.append((entry_id, decode(fields)))
+            except (KeyError, ValueError, TypeError) as exc:
+                logger.error("Dropping undecodable event %s: %s", entry_id, exc)
+                self.ack([entry_id])
+        return decoded
+
+    def poll(self) -> list[tuple[bytes, Event]]:
+        """Next batch: own pending entries, then stale ones of others, then new ones."""
+
+        if self._backlog:
+            response = self.client.xreadgroup(
+                self.group, self.consumer, {self.stream: "0"}, count=self.batch_size
+            )
+            entries = response[0][1] if response else []
+            if entries:
+                return self._decode(entries)
+            self._backlog = False
+        _, claimed, *_ = self.client.xautoclaim(
+            self.stream,
+            self.group,
+            self.consumer,
+            min_idle_time=int(self.claim_idle * 1000),
+            count=self.batch_size,
+        )
+        if claimed:
+            return self._decode(claimed)
+        response = self.client.xreadgroup(
+            self.group,
+            self.consumer,
+            {self.stream: ">"},
+            count=self.batch_size,
+            block=int(self.block * 1000),
+        )
+        return self._decode(response[0][1]) if response else []
+
+    def ack(self, entry_ids: Sequence[bytes]) -> None:
+        if entry_ids:
+            self.client.xack(self.stream, self.group, *entry_ids)
+
+    def run(
+        self,
+        handler: Callable[[list[tuple[bytes, Event]]], Any],
+        *,
+        stop: threading.Event | None = None,
+    ) -> None:
+        """Feed batches to ``handler`` and acknowledge them until ``stop`` is set."""
+
+        self.ensure_group()
+        while stop is None or not stop.is_set():
+            batch = self.poll()
+            if batch:
+                handler(batch)
+                self.ack([entry_id for entry_id, _ in batch])
+
+
+_publisher: EventPublisher | None = None
+_publisher_pid: int | None = None
+
+
+def get_publisher() -> EventPublisher:
+    """This process's publisher; forked children get their own."""
+
+    global _publisher, _publisher_pid
+    if _publisher is None or _publisher_pid != os.getpid():
+        pool = ConnectionPool.from_url(
+            settings.redis_url, max_connections=2, socket_timeout=settings.events_socket_timeout
+        )
+        _publisher = EventPublisher(
+            Redis(connection_pool=pool),
+            stream=settings.events_stream,
+            retention=settings.events_retention_seconds,
+            batch_size=settings.events_batch_size,
+            linger=settings.events_linger_ms / 1000,
+            max_buffer=settings.events_max_buffer,
+        )
+        _publisher_pid = os.getpid()
+    return _publisher
+
+
+def shutdown_publisher(timeout: float = 5.0) -> None:
+    """Flush and stop this process's publisher, e.g. on shutdown."""
+
+    global _publisher
+    if _publisher is not None and _publisher_pid == os.getpid():
+        _publisher.close(timeout)
+    _publisher = None
@@ -0,0 +1,320 @@
+"""In-memory nearest-neighbour index over stored face embeddings.
+
+Embeddings are L2-normalised, so cosine similarity is a dot product. They
+are stored as float16 (1 KiB per 512-d face) but searched as float32:
+upcasting float16 on every scan costs far more than the matmul itself, so
+the in-memory index spends 2 KiB per face instead. Below
+``FACE_INDEX_IVF_THRESHOLD`` faces the index is a brute-force matrix scan;
+above it, an IVF index (spherical k-means coarse quantiser with one
+inverted list per centroid) scans only the ``FACE_INDEX_NPROBE`` closest
+lists.
+
+:class:`FaceIndex` is the per-process entry point used by the worker. It
+is (re)built from ``face_match`` rows, picks up rows written by other
+workers incrementally, and takes local additions immediately.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .. import metrics
+from ..config import settings
+from ..models import FaceMatch, KYCApplication
+
+logger = logging.getLogger(__name__)
+
+# Rows per matmul; bounds the scratch memory of a scan.
+SCAN_CHUNK_ROWS = 16_384
+KMEANS_ITERATIONS = 8
+KMEANS_SAMPLE_PER_LIST = 64
+# Rows committed out of created_at order are re-read within this window.
+REFRESH_LOOKBACK = timedelta(minutes=5)
+
+
+@dataclass(frozen=True)
+class FaceNeighbour:
+    """A stored face close to the query."""
+
+    application_id: UUID
+    applicant_id: UUID
+    similarity: float
+
+
+def to_embedding(values) -> np.ndarray:
+    """L2-normalised float32 vector for ``values``."""
+
+    vector = np.asarray(values, dtype=np.float32).ravel()
+    norm = float(np.linalg.norm(vector))
+    return vector / norm if norm else vector
+
+
+def encode_embedding(values) -> bytes:
+    """Compact float16 storage form of an embedding."""
+
+    return to_embedding(values).astype(np.float16).tobytes()
+
+
+def decode_embedding(blob: bytes) -> np.ndarray:
+    """Inverse of :func:`encode_embedding`."""
+
+    return np.frombuffer(blob, dtype=np.float16).astype(np.float32)
+
+
+def _top_k(similarities: np.ndarray, rows: np.ndarray, k: int) -> list[tuple[int, float]]:
+    if len(similarities) > k:
+        keep = np.argpartition(-similarities, k - 1)[:k]
+        similarities, rows = similarities[keep], rows[keep]
+    order = np.argsort(-similarities)
+    return [(int(rows[i]), float(similarities[i])) for i in order]
+
+
+class BruteForceIndex:
+    """Exact search over a growable float32 matrix."""
+
+    def __init__(self, dim: int, vectors: np.ndarray | None = None) -> None:
+        self.dim = dim
+        self._vectors = np.empty((0, dim), dtype=np.float32)
+        self._size = 0
+        if vectors is not None and len(vectors):
+            self.extend(vectors)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def extend(self, vectors: np.ndarray) -> None:
+        needed = self._size + len(vectors)
+        if needed > len(self._vectors):
+            grown = np.empty((max(needed, 2 * len(self._vectors)), self.dim), dtype=np.float32)
+            grown[: self._size] = self._vectors[: self._size]
+            self._vectors = grown
+        self._vectors[self._size : needed] = vectors
+        self._size = needed
+
+    def search(self, query: np.ndarray, k: int) -> list[tuple[int, float]]:
+        """Top ``k`` ``(row, similarity)`` pairs; rows number vectors in insertion order."""
+
+        best: list[tuple[int, float]] = []
+        for start in range(0, self._size, SCAN_CHUNK_ROWS):
+            chunk = self._vectors[start : min(start + SCAN_CHUNK_ROWS, self._size)]
+            similarities = chunk @ query
+            best.extend(_top_k(similarities, np.arange(start, start + len(chunk)), k))
+        best.sort(key=lambda item: -item[1])
+        return best[:k]
+
+
+class IVFIndex:
+    """Inverted-file index: vectors are bucketed by their closest centroid."""
+
+    def __init__(self, dim: int, vectors: np.ndarray, *, n_lists: int, seed: int = 0) -> None:
+        self.dim = dim
+        self.centroids = self._train(vectors, n_lists, np.random.default_rng(seed))
+        self._lists: list[BruteForceIndex] = [BruteForceIndex(dim) for _ in self.centroids]
+        self._rows: list[list[int]] = [[] for _ in self.centroids]
+        self._size = 0
+        self.extend(vectors)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _assign(self, vectors: np.ndarray) -> np.ndarray:
+        assignment = np.empty(len(vectors), dtype=np.int64)
+        for start in range(0, len(vectors), SCAN_CHUNK_ROWS):
+            chunk = vectors[start : start + SCAN_CHUNK_ROWS]
+            assignment[start : start + len(chunk)] = np.argmax(chunk @ self.centroids.T, axis=1)
+        return assignment
+
+    @staticmethod
+    def _train(vectors: np.ndarray, n_lists: int, rng: np.random.Generator) -> np.ndarray:
+        """Spherical k-means on a sample of ``vectors``."""
+
+        sample_size = min(len(vectors), n_lists * KMEANS_SAMPLE_PER_LIST)
+        sample = vectors[rng.choice(len(vectors), sample_size, replace=False)].astype(np.float32)
+        centroids = sample[rng.choice(sample_size, n_lists, replace=False)].copy()
+        for _ in range(KMEANS_ITERATIONS):
+            assignment = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignment, sample)
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            empty = norms[:, 0] == 0
+            # Re-seed empty lists with random sample points.
+            sums[empty] = sample[rng.choice(sample_size, int(empty.sum()))]
+            norms[empty] = 1
+            centroids = sums / norms
+        return centroids
+
+    def extend(self, vectors: np.ndarray) -> None:
+        assignment = self._assign(vectors)
+        for list_no in np.unique(assignment):
+            members = np.flatnonzero(assignment == list_no)
+            self._lists[list_no].extend(vectors[members])
+            self._rows[list_no].extend((members + self._size).tolist())
+        self._size += len(vectors)
+
+    def search(self, query: np.ndarray, k: int, *, nprobe: int) -> list[tuple[int, float]]:
+        probes = np.argsort(-(self.centroids @ query))[:nprobe]
+        best: list[tuple[int, float]] = []
+        for list_no in probes:
+            rows = self._rows[list_no]
+            best.extend((rows[i], sim) for i, sim in self._lists[list_no].search(query, k))
+        best.sort(key=lambda item: -item[1])
+        return best[:k]
+
+
+class FaceIndex:
+    """Process-wide face index kept in step with ``face_match``."""
+
+    def __init__(self) -> None:
+        self._index: BruteForceIndex | IVFIndex | None = None
+        self._application_ids: list[UUID] = []
+        self._applicant_ids: list[UUID] = []
+        self._known: set[UUID] = set()
+        self._pending: list[np.ndarray] = []
+        self._watermark: tuple[datetime, UUID] | None = None
+        self._built_at = float("-inf")
+        self._refreshed_at = float("-inf")
+
+    def __len__(self) -> int:
+        return len(self._application_ids)
+
+    def add(self, application_id: UUID, applicant_id: UUID, embedding) -> None:
+        """Index one face; already indexed applications are ignored."""
+
+        vector = to_embedding(embedding)
+        if application_id in self._known or not self._accepts(vector):
+            return
+        self._known.add(application_id)
+        self._application_ids.append(application_id)
+        self._applicant_ids.append(applicant_id)
+        if self._index is None:
+            self._pending.append(vector)
+        else:
+            self._index.extend(vector[None, :])
+
+    def search(self, embedding, k: int) -> list[FaceNeighbour]:
+        """The ``k`` most similar indexed faces."""
+
+        if self._index is None:
+            self._build(np.array(self._pending) if self._pending else None)
+        query = to_embedding(embedding)
+        if self._index is None or not self._accepts(query):
+            return []
+        started = time.perf_counter()
+        if isinstance(self._index, IVFIndex):
+            hits = self._index.search(query, k, nprobe=settings.face_index_nprobe)
+        else:
+            hits = self._index.search(query, k)
+        metrics.FACE_INDEX_SEARCH_SECONDS.observe(time.perf_counter() - started)
+        return [
+            FaceNeighbour(self._application_ids[row], self._applicant_ids[row], similarity)
+            for row, similarity in hits
+        ]
+
+    def _accepts(self, vector: np.ndarray) -> bool:
+        dim = self._index.dim if self._index is not None else (
+            len(self._pending[0]) if self._pending else len(vector)
+        )
+        if len(vector) != dim:
+            logger.warning("Ignoring %s-d face embedding; index is %s-d", len(vector), dim)
+            return False
+        return True
+
+    def _build(self, vectors: np.ndarray | None) -> None:
+        self._pending = []
+        if vectors is None or not len(vectors):
+            self._index = None
+            return
+        if len(vectors) >= settings.face_index_ivf_threshold:
+            n_lists = int(np.clip(np.sqrt(len(vectors)), 16, 4096))
+            self._index = IVFIndex(vectors.shape[1], vectors, n_lists=n_lists)
+        else:
+            self._index = BruteForceIndex(vectors.shape[1], vectors)
+        metrics.FACE_INDEX_SIZE.set(len(vectors))
+
+    async def refresh(self, session: AsyncSession) -> None:
+        """Rebuild from the database or pull rows added since the last refresh.
+
+        A full rebuild happens on first use and every
+        ``FACE_INDEX_REBUILD_INTERVAL`` seconds (switching to IVF once the
+        index has grown past the threshold); otherwise at most every
+        ``FACE_INDEX_REFRESH_INTERVAL`` seconds new rows are appended.
+        """
+
+        now = time.monotonic()
+        if now - self._built_at >= settings.face_index_rebuild_interval:
+            await self._rebuild(session)
+            self._built_at = self._refreshed_at = now
+        elif now - self._refreshed_at >= settings.face_index_refresh_interval:
+            await self._load_since_watermark(session)
+            self._refreshed_at = now
+
+    def _query(self):
+        return (
+            select(
+                FaceMatch.application_id,
+                KYCApplication.applicant_id,
+                FaceMatch.embedding,
+                FaceMatch.created_at,
+                FaceMatch.id,
+            )
+            .join(KYCApplication, FaceMatch.application_id == KYCApplication.id)
+            .where(FaceMatch.embedding.is_not(None))
+            .order_by(FaceMatch.created_at, FaceMatch.id)
+        )
+
+    async def _rebuild(self, session: AsyncSession) -> None:
+        started = time.perf_counter()
+        application_ids: list[UUID] = []
+        applicant_ids: list[UUID] = []
+        vectors: list[np.ndarray] = []
+        watermark = None
+        rows = await session.stream(self._query().execution_options(yield_per=10_000))
+        async for application_id, applicant_id, blob, created_at, row_id in rows:
+            vector = decode_embedding(blob)
+            if vectors and len(vector) != len(vectors[0]):
+                continue
+            application_ids.append(application_id)
+            applicant_ids.append(applicant_id)
+            vectors.append(vector)
+            watermark = (created_at, row_id)
+
+        self._application_ids, self._applicant_ids = application_ids, applicant_ids
+        self._known = set(application_ids)
+        self._watermark = watermark
+        self._build(np.array(vectors) if vectors else None)
+        logger.info(
+            "Face index rebuilt with %s faces in %.1fs",
+            len(application_ids),
+            time.perf_counter() - started,
+        )
+
+    async def _load_since_watermark(self, session: AsyncSession) -> None:
+        query = self._query()
+        if self._watermark is not None:
+            created_at, row_id = self._watermark
+            query = query.where(FaceMatch.created_at >= created_at - REFRESH_LOOKBACK)
+        for application_id, applicant_id, blob, created_at, row_id in await session.execute(query):
+            self.add(application_id, applicant_id, decode_embedding(blob))
+            if self._watermark is None or (created_at, row_id) > self._watermark:
+                self._watermark = (created_at, row_id)
+        metrics.FACE_INDEX_SIZE.set(len(self))
+
+
+_face_index: FaceIndex | None = None
+
+
+def get_face_index() -> FaceIndex:
+    """This process's face index."""
+
+    global _face_index
+    if _face_index is None:
+        _face_index = FaceIndex()
+    return _face_index
@@ -0,0 +1,231 @@
+"""Downscaled, re-encoded copies of uploaded images for downstream services.
+
+Camera uploads are often several megabytes, far more than OCR or face
+matching need. :func:`normalize_image` applies the EXIF orientation, shrinks
+the image to fit a per-service bounding box and re-encodes it as JPEG.
+Decoding and resampling are CPU-bound, so :func:`derive` runs them in a
+process pool, and results are cached on disk under the SHA-256 of the
+original plus the profile, where every worker process on the host can reuse
+them. Originals in storage are never modified.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import io
+import logging
+import os
+import tempfile
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+from PIL import Image, ImageOps
+
+from .. import metrics
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+# Prune the cache directory after this many writes by one process.
+PRUNE_EVERY = 100
+# Pruning frees space down to this fraction of IMAGE_CACHE_MAX_MB.
+PRUNE_TARGET = 0.9
+_EXIF_ORIENTATION = 0x0112
+
+
+@dataclass(frozen=True)
+class Profile:
+    """Target size and quality of the images sent to one service."""
+
+    max_side: int
+    quality: int
+
+
+@dataclass(frozen=True)
+class NormalizedImage:
+    """A derived image and its dimensions."""
+
+    data: bytes
+    width: int
+    height: int
+
+
+def profiles() -> dict[str, Profile]:
+    """Configured profiles by downstream service."""
+
+    return {
+        "ocr": Profile(settings.image_ocr_max_side, settings.image_jpeg_quality),
+        "face": Profile(settings.image_face_max_side, settings.image_jpeg_quality),
+        "thumbnail": Profile(settings.image_thumbnail_max_side, settings.image_jpeg_quality),
+        "preview": Profile(settings.image_preview_max_side, settings.image_jpeg_quality),
+    }
+
+
+def content_digest(data: bytes) -> str:
+    """Cache key component identifying an original image."""
+
+    return hashlib.sha256(data).hexdigest()
+
+
+def normalize_image(data: bytes, max_side: int, quality: int) -> NormalizedImage:
+    """Upright JPEG of ``data`` fitting in ``max_side`` x ``max_side``.
+
+    Images are never upscaled. An upright JPEG that re-encoding would not
+    make smaller is returned unchanged. Raises ``ValueError`` if ``data`` is
+    not a readable image.
+    """
+
+    try:
+        with Image.open(io.BytesIO(data)) as image:
+            upright = image.getexif().get(_EXIF_ORIENTATION, 1) in (None, 1)
+            if upright and image.format == "JPEG" and max(image.size) <= max_side:
+                return NormalizedImage(data, *image.size)
+            # JPEGs decode at a reduced scale when that still covers the target.
+            image.draft("RGB", (max_side, max_side))
+            image = ImageOps.exif_transpose(image)
+            image = image.convert("RGB")
+            image.thumbnail((max_side, max_side), Image.Resampling.LANCZOS)
+            buffer = io.BytesIO()
+            image.save(buffer, format="JPEG", quality=quality)
+            return NormalizedImage(buffer.getvalue(), *image.size)
+    except (OSError, Image.DecompressionBombError) as exc:
+        raise ValueError(f"Unreadable image: {exc}") from exc
+
+
+class ImageCache:
+    """Directory of derived images keyed by original digest and profile.
+
+    Writes are atomic renames, so concurrent workers never read a partial
+    file. Reads refresh the file's mtime, and pruning deletes the least
+    recently used files once the directory exceeds ``max_bytes``.
+    """
+
+    def __init__(self, directory: Path, max_bytes: int) -> None:
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._writes = 0
+
+    def _path(self, digest: str, profile: str) -> Path:
+        return self.directory / digest[:2] / f"{digest}-{profile}.img"
+
+    def get(self, digest: str, profile: str) -> bytes | None:
+        path = self._path(digest, profile)
+        try:
+            data = path.read_bytes()
+            os.utime(path)
+        except OSError:
+            metrics.CACHE_REQUESTS.labels("image", "miss").inc()
+            return None
+        metrics.CACHE_REQUESTS.labels("image", "hit").inc()
+        return data
+
+    def put(self, digest: str, profile: str, data: bytes) -> None:
+        path = self._path(digest, profile)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+            with os.fdopen(fd, "wb") as handle:
+                handle.write(data)
+            os.replace(tmp, path)
+        except OSError as exc:
+            logger.warning("Could not cache derived image %s: %s", path.name, exc)
+            return
+        self._writes += 1
+        if self._writes % PRUNE_EVERY == 0:
+            self.prune()
+
+    def prune(self) -> int:
+        """Delete least recently used files until under the size limit."""
+
+        entries = []
+        for path in self.directory.glob("*/*.img"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        if total <= self.max_bytes:
+            return removed
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes * PRUNE_TARGET:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            removed += 1
+        return removed
+
+
+_cache: ImageCache | None = None
+_executor: Executor | None = None
+
+
+def get_cache() -> ImageCache:
+    """Process-wide cache in ``IMAGE_CACHE_DIR``."""
+
+    global _cache
+    if _cache is None:
+        _cache = ImageCache(settings.image_cache_dir, settings.image_cache_max_mb * 1024 * 1024)
+    return _cache
+
+
+def _get_executor() -> Executor | None:
+    """Process pool for image work; ``None`` runs it on a thread instead."""
+
+    global _executor
+    if _executor is None and settings.image_process_workers > 0:
+        _executor = ProcessPoolExecutor(max_workers=settings.image_process_workers)
+    return _executor
+
+
+def shutdown_executor() -> None:
+    """Stop the process pool, e.g. before a worker process exits."""
+
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+async def derive(
+    original: bytes, profile: str, *, digest: str | None = None, passthrough: bool = True
+) -> bytes:
+    """Normalised ``original`` for ``profile``, from the cache when possible.
+
+    Unreadable images are passed through unchanged so the downstream
+    service can report on them; they are cached too, which spares later
+    stages another download. With ``passthrough=False`` they raise
+    ``ValueError`` instead.
+    """
+
+    digest = digest or content_digest(original)
+    cache = get_cache()
+    cached = cache.get(digest, profile)
+    if cached is not None:
+        return cached
+
+    target = profiles()[profile]
+    started = time.perf_counter()
+    loop = asyncio.get_running_loop()
+    try:
+        image = await loop.run_in_executor(
+            _get_executor(), normalize_image, original, target.max_side, target.quality
+        )
+    except ValueError as exc:
+        if not passthrough:
+            metrics.IMAGE_NORMALIZATIONS.labels(profile, "unreadable").inc()
+            raise
+        metrics.IMAGE_NORMALIZATIONS.labels(profile, "passthrough").inc()
+        logger.info("Sending %s image unchanged: %s", profile, exc)
+        cache.put(digest, profile, original)
+        return original
+    metrics.IMAGE_NORMALIZATIONS.labels(profile, "normalized").inc()
+    metrics.IMAGE_NORMALIZE_SECONDS.labels(profile).observe(time.perf_counter() - started)
+    metrics.IMAGE_BYTES.labels(profile, "original").inc(len(original))
+    metrics.IMAGE_BYTES.labels(profile, "derived").inc(len(image.data))
+    cache.put(digest, profile, image.data)
+    return image.data
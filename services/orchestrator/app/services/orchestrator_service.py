@@ -4,18 +4,32 @@ from __future__ import annotations
 
 import json
 import logging
-from typing import Iterable
+from collections.abc import AsyncIterator
+from datetime import datetime
+from typing import Any, Iterable
 from uuid import UUID
 
 from fastapi import HTTPException, UploadFile, status
-from sqlalchemy import select
+from sqlalchemy import ColumnElement, func, insert, select, tuple_, update
 from sqlalchemy.orm import selectinload
+from sqlalchemy.orm.exc import StaleDataError
 from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
 
-from .. import schemas
-from ..clients import upload_to_storage
+from .. import metrics, schemas
+from ..clients import call_audit_append, upload_to_storage
 from ..config import settings
-from ..models import AuditLog, Document, KYCApplication, KYCStatus, User
+from ..ids import uuid7
+from ..db import ReadSessionLocal
+from ..models import AuditLog, Document, KYCApplication, KYCStatus, User, json_text
+from ..services import (
+    admission,
+    document_hashes,
+    events,
+    queue_stats,
+    resumable_uploads,
+    review_claims,
+)
 from ..services.audit_helper import create_audit_log
 from ..workers.tasks import process_kyc
 
@@ -52,16 +66,19 @@ async def get_application_or_404(
     application_id: UUID,
     *,
     owner_id: UUID | None = None,
+    with_audits: bool = False,
 ) -> KYCApplication:
-    """Fetch application ensuring ownership when provided."""
+    """Fetch application ensuring ownership when provided.
 
+    Documents are always loaded. The audit trail can be long, so it is loaded
+    only with ``with_audits``; handlers that show it use :func:`fetch_audit_rows`.
+    """
+
+    options = [selectinload(KYCApplication.documents)]
+    if with_audits:
+        options.append(selectinload(KYCApplication.audits))
     result = await session.execute(
-        select(KYCApplication)
-        .options(
-            selectinload(KYCApplication.documents),
-            selectinload(KYCApplication.audits),
-        )
-        .where(KYCApplication.id == application_id)
+        select(KYCApplication).options(*options).where(KYCApplication.id == application_id)
     )
     application = result.scalar_one_or_none()
     if not application:
@@ -71,6 +88,23 @@ async def get_application_or_404(
     return application
 
 
+async def get_document_or_404(
+    session: AsyncSession,
+    application_id: UUID,
+    document_id: UUID,
+) -> Document:
+    """Fetch a document of the given application."""
+
+    document = await session.scalar(
+        select(Document).where(
+            Document.id == document_id, Document.application_id == application_id
+        )
+    )
+    if not document:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not found")
+    return document
+
+
 async def start_kyc_application(
     session: AsyncSession,
     user: User,
@@ -80,6 +114,11 @@ async def start_kyc_application(
 
     application = KYCApplication(user_id=user.id, method=payload.method)
     session.add(application)
+    await queue_stats.record_transition(
+        session, None, queue_stats.counter_key(KYCStatus.PENDING.value, payload.method)
+    )
+    await session.flush()
+    events.record(session, events.status_changed(application, None, actor=str(user.id)))
     await session.commit()
     await session.refresh(application)
     await create_audit_log(
@@ -103,11 +142,15 @@ async def _persist_document(
 
     file_bytes = await file.read()
     storage_response = upload_to_storage(file_bytes, file.filename or doc_type)
+    phash = None
+    if doc_type in document_hashes.HASHED_DOC_TYPES:
+        phash = await run_in_threadpool(document_hashes.perceptual_hash, file_bytes)
     document = Document(
         application_id=application.id,
         doc_type=doc_type,
         storage_path=storage_response["storage_path"],
         doc_hash=storage_response.get("hash", "na"),
+        phash=phash,
     )
     session.add(document)
     await session.flush()
@@ -140,14 +183,31 @@ async def handle_upload(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Application already processed",
         )
+    decision = await admission.get_controller().admit(application.method)
+    if not decision.accepted:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Verification queue is full, retry later",
+            headers={"Retry-After": str(decision.retry_after)},
+        )
 
     await _persist_document(session, application, file=id_front, doc_type="id_card")
     if id_back:
         await _persist_document(session, application, file=id_back, doc_type="address_proof")
     await _persist_document(session, application, file=selfie, doc_type="selfie")
 
+    before = queue_stats.application_key(application)
+    previous_status = application.status
     application.status = KYCStatus.PROCESSING.value
+    application.estimated_completion_at = decision.estimated_completion_at
     session.add(application)
+    await queue_stats.record_transition(
+        session, before, queue_stats.application_key(application)
+    )
+    if previous_status != application.status:
+        events.record(
+            session, events.status_changed(application, previous_status, actor=str(user.id))
+        )
     await session.commit()
 
     meta = {}
@@ -169,6 +229,47 @@ async def handle_upload(
     return application
 
 
+async def finalize_uploads(
+    session: AsyncSession,
+    user: User,
+    *,
+    application_id: UUID,
+    device_info: str | None = None,
+) -> KYCApplication:
+    """Submit an application whose documents arrived as resumable uploads.
+
+    The latest complete upload of each document type is used; an ID card
+    and a selfie are required, as for the multipart upload.
+    """
+
+    application = await get_application_or_404(session, application_id, owner_id=user.id)
+    uploads = await resumable_uploads.completed_uploads(session, application.id)
+    if not {"id_card", "selfie"} <= uploads.keys():
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Complete id_card and selfie uploads are required",
+        )
+    files = {
+        doc_type: resumable_uploads.open_upload(upload) for doc_type, upload in uploads.items()
+    }
+    try:
+        application = await handle_upload(
+            session,
+            user,
+            application_id=application.id,
+            id_front=files["id_card"],
+            selfie=files["selfie"],
+            id_back=files.get("address_proof"),
+            device_info=device_info,
+        )
+    finally:
+        for file in files.values():
+            await file.close()
+    await resumable_uploads.discard_uploads(session, application.id)
+    metrics.RESUMABLE_UPLOADS.labels("finalized").inc()
+    return application
+
+
 async def get_status_response(
     application: KYCApplication,
 ) -> schemas.KYCStatusResponse:
@@ -179,40 +280,172 @@ async def get_status_response(
         status=application.status,
         risk_score=application.risk_score,
         drpa_level=application.drpa_level,
+        estimated_completion_at=(
+            application.estimated_completion_at
+            if application.status == KYCStatus.PROCESSING.value
+            else None
+        ),
     )
 
 
-async def list_flagged_applications(session: AsyncSession) -> list[schemas.ReviewQueueItem]:
-    """Return all flagged applications."""
+# Columns selected so each row maps 1:1 onto schemas.ReviewQueueItem.
+REVIEW_QUEUE_COLUMNS = (
+    KYCApplication.id.label("application_id"),
+    User.email.label("user_email"),
+    KYCApplication.risk_score,
+    KYCApplication.status,
+    KYCApplication.updated_at,
+    KYCApplication.version,
+)
+
+# Columns selected so each row maps 1:1 onto schemas.AuditLogResponse.
+AUDIT_RESPONSE_COLUMNS = (
+    AuditLog.actor,
+    AuditLog.action,
+    AuditLog.payload,
+    AuditLog.log_hash,
+    AuditLog.created_at,
+)
+
+STREAM_BATCH_SIZE = 500
+
+REVIEW_STATUS = {
+    "approve": KYCStatus.APPROVED.value,
+    "reject": KYCStatus.REJECTED.value,
+    "request_info": KYCStatus.FLAGGED.value,
+}
+
+
+async def stream_flagged_applications() -> AsyncIterator[dict[str, Any]]:
+    """Yield flagged applications as ReviewQueueItem-shaped dicts.
+
+    Uses its own read session so the stream can outlive the request dependencies.
+    """
+
+    async with ReadSessionLocal() as session:
+        result = await session.stream(
+            select(*REVIEW_QUEUE_COLUMNS)
+            .join(User, KYCApplication.user_id == User.id)
+            .where(KYCApplication.status == KYCStatus.FLAGGED.value)
+            .execution_options(yield_per=STREAM_BATCH_SIZE)
+        )
+        async for row in result:
+            yield dict(row._mapping)
+
 
-    result = await session.execute(
-        select(KYCApplication, User)
+async def search_documents(
+    session: AsyncSession,
+    *,
+    name: str | None = None,
+    document_number: str | None = None,
+    limit: int = 50,
+) -> list[dict[str, Any]]:
+    """Find documents by OCR'd name (case-insensitive) and/or document number.
+
+    The filters match the ``ix_documents_ocr_*`` expression indexes.
+    """
+
+    ocr_name = json_text(Document.ocr_json, "name")
+    ocr_number = json_text(Document.ocr_json, "document_number")
+    query = (
+        select(
+            KYCApplication.id.label("application_id"),
+            User.email.label("user_email"),
+            KYCApplication.status,
+            KYCApplication.risk_score,
+            Document.doc_type,
+            ocr_name.label("name"),
+            ocr_number.label("document_number"),
+            KYCApplication.updated_at,
+        )
+        .join(KYCApplication, Document.application_id == KYCApplication.id)
         .join(User, KYCApplication.user_id == User.id)
-        .where(KYCApplication.status == KYCStatus.FLAGGED.value)
     )
-    items: list[schemas.ReviewQueueItem] = []
-    for app, user in result.all():
-        items.append(
-            schemas.ReviewQueueItem(
-                application_id=app.id,
-                user_email=user.email,
-                risk_score=app.risk_score,
-                status=app.status,
-                updated_at=app.updated_at,
-            )
-        )
-    return items
+    if name is not None:
+        query = query.where(func.lower(ocr_name) == " ".join(name.split()).lower())
+    if document_number is not None:
+        query = query.where(ocr_number == document_number.strip())
+    result = await session.execute(
+        query.order_by(KYCApplication.updated_at.desc()).limit(limit)
+    )
+    return [dict(row._mapping) for row in result]
 
 
-async def fetch_audit_logs(session: AsyncSession, application_id: UUID) -> list[AuditLog]:
-    """Fetch audit logs for an application."""
+def _audits_of(application_id: UUID) -> tuple[ColumnElement[bool], ...]:
+    """Filter audit logs of an application.
+
+    Entries never predate their application, so bounding ``created_at`` by
+    the application's creation time lets Postgres prune older partitions.
+    """
+
+    created_at = (
+        select(KYCApplication.created_at)
+        .where(KYCApplication.id == application_id)
+        .scalar_subquery()
+    )
+    return (AuditLog.application_id == application_id, AuditLog.created_at >= created_at)
+
+
+async def fetch_audit_logs(
+    session: AsyncSession,
+    application_id: UUID,
+    *,
+    since: datetime | None = None,
+    until: datetime | None = None,
+) -> list[AuditLog]:
+    """Fetch audit logs for an application, optionally within ``[since, until)``."""
+
+    query = select(AuditLog).where(*_audits_of(application_id))
+    if since is not None:
+        query = query.where(AuditLog.created_at >= since)
+    if until is not None:
+        query = query.where(AuditLog.created_at < until)
+    result = await session.execute(query.order_by(AuditLog.created_at.asc()))
+    return list(result.scalars().all())
+
+
+async def fetch_latest_audit_log(
+    session: AsyncSession, application_id: UUID
+) -> AuditLog | None:
+    """Return the most recent audit log of an application."""
 
     result = await session.execute(
         select(AuditLog)
-        .where(AuditLog.application_id == application_id)
+        .where(*_audits_of(application_id))
+        .order_by(AuditLog.created_at.desc())
+        .limit(1)
+    )
+    return result.scalar_one_or_none()
+
+
+async def fetch_audit_rows(
+    session: AsyncSession, application_id: UUID
+) -> list[dict[str, Any]]:
+    """Return audit entries as AuditLogResponse-shaped dicts, oldest first."""
+
+    result = await session.execute(
+        select(*AUDIT_RESPONSE_COLUMNS)
+        .where(*_audits_of(application_id))
         .order_by(AuditLog.created_at.asc())
     )
-    return list(result.scalars().all())
+    return [dict(row._mapping) for row in result]
+
+
+async def stream_audit_rows(application_id: UUID) -> AsyncIterator[dict[str, Any]]:
+    """Yield audit entries as AuditLogResponse-shaped dicts, oldest first.
+
+    Uses its own read session so the stream can outlive the request dependencies.
+    """
+
+    async with ReadSessionLocal() as session:
+        result = await session.stream(
+            select(*AUDIT_RESPONSE_COLUMNS)
+            .where(*_audits_of(application_id))
+            .order_by(AuditLog.created_at.asc())
+            .execution_options(yield_per=STREAM_BATCH_SIZE)
+        )
+        async for row in result:
+            yield dict(row._mapping)
 
 
 async def apply_review_action(
@@ -222,26 +455,198 @@ async def apply_review_action(
     reviewer: User,
     payload: schemas.ReviewActionRequest,
 ) -> KYCApplication:
-    """Apply reviewer decision."""
+    """Apply reviewer decision and its audit entry in one transaction."""
 
-    status_mapping = {
-        "approve": KYCStatus.APPROVED.value,
-        "reject": KYCStatus.REJECTED.value,
-        "request_info": KYCStatus.FLAGGED.value,
-    }
-    application.status = status_mapping[payload.action]
+    if payload.version is not None and payload.version != application.version:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Application changed since it was loaded",
+        )
+    now = datetime.utcnow()
+    if review_claims.held_by_other(application, reviewer.id, now):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Application is claimed by another reviewer",
+        )
+    review_claims.end_lease(application, reviewer.id, payload.action, now)
+    before = queue_stats.application_key(application)
+    previous_status = application.status
+    application.status = REVIEW_STATUS[payload.action]
     session.add(application)
-    await session.commit()
-    await create_audit_log(
-        session,
-        application_id=application.id,
-        actor=str(reviewer.id),
-        action=f"review_{payload.action}",
-        payload={"notes": payload.notes},
-    )
+    if application.status != previous_status:
+        events.record(
+            session, events.status_changed(application, previous_status, actor=str(reviewer.id))
+        )
+    try:
+        await create_audit_log(
+            session,
+            application_id=application.id,
+            actor=str(reviewer.id),
+            action=f"review_{payload.action}",
+            payload={"notes": payload.notes},
+            commit=False,
+        )
+        await queue_stats.record_transition(
+            session, before, queue_stats.application_key(application)
+        )
+        await session.commit()
+    except StaleDataError as exc:
+        # Another writer committed between our load and flush (version_id_col).
+        await session.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Application changed since it was loaded",
+        ) from exc
+    metrics.KYC_OUTCOMES.labels(application.status, "review").inc()
     return application
 
 
+async def apply_bulk_review_action(
+    session: AsyncSession,
+    *,
+    reviewer: User,
+    payload: schemas.BulkReviewActionRequest,
+) -> list[schemas.BulkReviewResult]:
+    """Apply one decision to many flagged applications.
+
+    A single ``UPDATE ... WHERE (id, version) IN (...) RETURNING`` changes
+    only applications that are still flagged at the version the reviewer
+    saw and not leased to another reviewer; the rest are reported as
+    conflicts (or not found). Audit entries
+    for the updated applications are bulk-inserted in the same transaction.
+    """
+
+    new_status = REVIEW_STATUS[payload.action]
+    # request_info leaves applications FLAGGED: only the lease is released.
+    status_changes = new_status != KYCStatus.FLAGGED.value
+    now = datetime.utcnow()
+    requested = {item.application_id: item.version for item in payload.items}
+    values: dict[str, Any] = {
+        "status": new_status,
+        "updated_at": now,
+        "claimed_by": None,
+        "claimed_at": None,
+        "claim_expires_at": None,
+    }
+    if status_changes:
+        values["version"] = KYCApplication.version + 1
+    result = await session.execute(
+        update(KYCApplication)
+        .where(
+            tuple_(KYCApplication.id, KYCApplication.version).in_(list(requested.items())),
+            KYCApplication.status == KYCStatus.FLAGGED.value,
+            review_claims.claimable_by(reviewer.id, now),
+        )
+        .values(**values)
+        .returning(
+            KYCApplication.id,
+            KYCApplication.version,
+            KYCApplication.method,
+            KYCApplication.drpa_level,
+            KYCApplication.risk_score,
+        )
+        .execution_options(synchronize_session=False)
+    )
+    updated_rows = result.all()
+    updated = {row.id: row.version for row in updated_rows}
+
+    current: dict[UUID, tuple[str, int]] = {}
+    missing = [app_id for app_id in requested if app_id not in updated]
+    if missing:
+        rows = await session.execute(
+            select(KYCApplication.id, KYCApplication.status, KYCApplication.version).where(
+                KYCApplication.id.in_(missing)
+            )
+        )
+        current = {app_id: (row_status, version) for app_id, row_status, version in rows}
+
+    if updated:
+        action = f"review_{payload.action}"
+        receipt = call_audit_append(
+            {
+                "application_id": None,
+                "actor": str(reviewer.id),
+                "action": action,
+                "payload": {
+                    "notes": payload.notes,
+                    "application_ids": [str(app_id) for app_id in updated],
+                },
+            }
+        )
+        await session.execute(
+            insert(AuditLog),
+            [
+                {
+                    "id": uuid7(),
+                    "application_id": app_id,
+                    "actor": str(reviewer.id),
+                    "action": action,
+                    "payload": {"notes": payload.notes, "bulk": True},
+                    "log_hash": receipt.get("log_hash"),
+                    "external_audit_id": receipt.get("audit_id"),
+                    "created_at": now,
+                }
+                for app_id in updated
+            ],
+        )
+        await queue_stats.record_transitions(
+            session,
+            (
+                (
+                    queue_stats.counter_key(
+                        KYCStatus.FLAGGED.value, row.method, row.drpa_level, row.risk_score
+                    ),
+                    queue_stats.counter_key(
+                        new_status, row.method, row.drpa_level, row.risk_score
+                    ),
+                )
+                for row in updated_rows
+            ),
+        )
+    if updated and status_changes:
+        events.record(
+            session,
+            *(
+                events.StatusChanged(
+                    application_id=row.id,
+                    method=row.method,
+                    from_status=KYCStatus.FLAGGED.value,
+                    to_status=new_status,
+                    actor=str(reviewer.id),
+                    risk_score=row.risk_score,
+                    drpa_level=row.drpa_level,
+                    occurred_at=now,
+                )
+                for row in updated_rows
+            ),
+        )
+    await session.commit()
+    metrics.KYC_OUTCOMES.labels(new_status, "review").inc(len(updated))
+    metrics.REVIEW_DECISIONS.labels(payload.action, "bulk").inc(len(updated))
+
+    results = []
+    for app_id in requested:
+        if app_id in updated:
+            results.append(
+                schemas.BulkReviewResult(
+                    application_id=app_id,
+                    result="updated",
+                    status=new_status,
+                    version=updated[app_id],
+                )
+            )
+        elif app_id in current:
+            row_status, version = current[app_id]
+            results.append(
+                schemas.BulkReviewResult(
+                    application_id=app_id, result="conflict", status=row_status, version=version
+                )
+            )
+        else:
+            results.append(schemas.BulkReviewResult(application_id=app_id, result="not_found"))
+    return results
+
+
 def build_result_response(
     application: KYCApplication,
     *,
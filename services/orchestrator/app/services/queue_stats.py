@@ -0,0 +1,218 @@
+"""Precomputed application counters for the reviewer dashboard.
+
+Every code path that creates an application or changes its status, DRPA
+level or risk score calls :func:`record_transitions` before committing, so
+``application_counters`` moves in the same transaction as the application
+rows. Reading the aggregates is then a scan of a few hundred counter rows
+instead of the applications table. :func:`reconcile_counters` recomputes
+them from ``kyc_applications`` and fixes any drift.
+"""
+
+from __future__ import annotations
+
+import logging
+from collections import Counter
+from collections.abc import Iterable, Mapping
+from datetime import datetime
+from typing import NamedTuple
+
+from sqlalchemy import case, delete, func, select, text
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .. import metrics, schemas
+from ..models import ApplicationCounter, KYCApplication, KYCStatus
+
+logger = logging.getLogger(__name__)
+
+RISK_BUCKET_WIDTH = 10
+RISK_BUCKETS = 10
+UNSCORED_BUCKET = -1
+
+
+class CounterKey(NamedTuple):
+    """Dimensions an application is counted under."""
+
+    status: str
+    method: str
+    drpa_level: str
+    risk_bucket: int
+
+
+def risk_bucket(risk_score: int | None) -> int:
+    """Histogram bucket of ``risk_score``; scores of 100 fall in the top bucket."""
+
+    if risk_score is None:
+        return UNSCORED_BUCKET
+    return max(0, min(risk_score // RISK_BUCKET_WIDTH, RISK_BUCKETS - 1))
+
+
+def counter_key(
+    status: str, method: str, drpa_level: str | None = None, risk_score: int | None = None
+) -> CounterKey:
+    """Build the key an application with these attributes is counted under."""
+
+    return CounterKey(status, method, drpa_level or "", risk_bucket(risk_score))
+
+
+def application_key(application: KYCApplication) -> CounterKey:
+    """Key ``application`` is currently counted under."""
+
+    return counter_key(
+        application.status or KYCStatus.PENDING.value,
+        application.method,
+        application.drpa_level,
+        application.risk_score,
+    )
+
+
+def _upsert(session: AsyncSession):
+    dialect = session.get_bind().dialect.name
+    insert = postgresql_insert if dialect == "postgresql" else sqlite_insert
+    stmt = insert(ApplicationCounter)
+    return stmt.on_conflict_do_update(
+        index_elements=list(CounterKey._fields),
+        set_={
+            "count": ApplicationCounter.count + stmt.excluded["count"],
+            "updated_at": stmt.excluded.updated_at,
+        },
+    )
+
+
+async def apply_deltas(session: AsyncSession, deltas: Mapping[CounterKey, int]) -> None:
+    """Add ``deltas`` to the counters in one upsert, without committing.
+
+    Keys are written in sorted order so concurrent transactions lock the
+    counter rows in the same order and cannot deadlock each other.
+    """
+
+    now = datetime.utcnow()
+    rows = [
+        {**key._asdict(), "count": delta, "updated_at": now}
+        for key, delta in sorted(deltas.items())
+        if delta
+    ]
+    if rows:
+        await session.execute(_upsert(session), rows)
+
+
+async def record_transitions(
+    session: AsyncSession, changes: Iterable[tuple[CounterKey | None, CounterKey | None]]
+) -> None:
+    """Move applications between counters; ``None`` means created or removed."""
+
+    deltas: Counter[CounterKey] = Counter()
+    for before, after in changes:
+        if before == after:
+            continue
+        if before is not None:
+            deltas[before] -= 1
+        if after is not None:
+            deltas[after] += 1
+    await apply_deltas(session, deltas)
+
+
+async def record_transition(
+    session: AsyncSession, before: CounterKey | None, after: CounterKey | None
+) -> None:
+    """Move one application between counters."""
+
+    await record_transitions(session, [(before, after)])
+
+
+def _bucket_column():
+    score = KYCApplication.risk_score
+    return case(
+        (score.is_(None), UNSCORED_BUCKET),
+        (score < 0, 0),
+        (score >= RISK_BUCKET_WIDTH * RISK_BUCKETS, RISK_BUCKETS - 1),
+        else_=score // RISK_BUCKET_WIDTH,
+    )
+
+
+async def reconcile_counters(session: AsyncSession) -> int:
+    """Recompute the counters from ``kyc_applications`` and correct drift.
+
+    On Postgres the counter table is locked first, which waits for
+    in-flight transitions to commit and holds new ones until the corrections
+    are written, so the recount and the counters describe the same state.
+    Returns the total absolute drift that was corrected.
+    """
+
+    if session.get_bind().dialect.name == "postgresql":
+        await session.execute(text("LOCK TABLE application_counters IN EXCLUSIVE MODE"))
+
+    bucket = _bucket_column()
+    drpa = func.coalesce(KYCApplication.drpa_level, "")
+    actual = await session.execute(
+        select(KYCApplication.status, KYCApplication.method, drpa, bucket, func.count())
+        .group_by(KYCApplication.status, KYCApplication.method, drpa, bucket)
+    )
+    expected = {CounterKey(*row[:4]): row[4] for row in actual}
+    stored = await session.execute(
+        select(
+            ApplicationCounter.status,
+            ApplicationCounter.method,
+            ApplicationCounter.drpa_level,
+            ApplicationCounter.risk_bucket,
+            ApplicationCounter.count,
+        )
+    )
+    current = {CounterKey(*row[:4]): row[4] for row in stored}
+
+    deltas = {
+        key: expected.get(key, 0) - current.get(key, 0) for key in expected.keys() | current.keys()
+    }
+    drift = sum(abs(delta) for delta in deltas.values())
+    await apply_deltas(session, deltas)
+    await session.execute(delete(ApplicationCounter).where(ApplicationCounter.count == 0))
+    await session.commit()
+
+    metrics.COUNTER_DRIFT.inc(drift)
+    if drift:
+        logger.warning("Corrected application counter drift of %s", drift)
+    return drift
+
+
+async def get_queue_stats(
+    session: AsyncSession, statuses: Iterable[str] | None = None
+) -> schemas.ReviewStatsResponse:
+    """Aggregate the counters, optionally restricted to ``statuses``."""
+
+    query = select(
+        ApplicationCounter.status,
+        ApplicationCounter.method,
+        ApplicationCounter.drpa_level,
+        ApplicationCounter.risk_bucket,
+        ApplicationCounter.count,
+    ).where(ApplicationCounter.count != 0)
+    statuses = list(statuses or [])
+    if statuses:
+        query = query.where(ApplicationCounter.status.in_(statuses))
+
+    by_status: Counter[str] = Counter()
+    by_method: Counter[str] = Counter()
+    by_drpa_level: Counter[str] = Counter()
+    by_bucket: Counter[int] = Counter()
+    for status, method, drpa_level, bucket, count in await session.execute(query):
+        by_status[status] += count
+        by_method[method] += count
+        by_drpa_level[drpa_level or "none"] += count
+        by_bucket[bucket] += count
+
+    return schemas.ReviewStatsResponse(
+        total=sum(by_status.values()),
+        by_status=dict(by_status),
+        by_method=dict(by_method),
+        by_drpa_level=dict(by_drpa_level),
+        unscored=by_bucket[UNSCORED_BUCKET],
+        risk_histogram=[
+            schemas.RiskBucket(
+                min_score=bucket * RISK_BUCKET_WIDTH,
+                max_score=(bucket + 1) * RISK_BUCKET_WIDTH,
+                count=by_bucket[bucket],
+            )
+            for bucket in range(RISK_BUCKETS)
+        ],
+    )
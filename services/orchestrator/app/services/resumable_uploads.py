@@ -0,0 +1,323 @@
+"""Resumable, chunked document uploads.
+
+A tus-like protocol for clients on unreliable networks: the client creates
+one upload per document with its total length, appends chunks with
+``PATCH`` at the offset the server reports, and after an interruption asks
+for the offset and resumes from there. Bytes received before a dropped
+connection are kept. Once every required document is complete, the
+application is finalised by ``orchestrator_service.finalize_uploads``
+exactly as if the files had arrived in one multipart request.
+
+Chunks are appended to ``{UPLOAD_TEMP_DIR}/{upload_id}.part`` and fed to a
+SHA-256 kept per process, so a declared checksum is verified without
+re-reading the file. A process that did not see the earlier chunks (a
+restart, or another replica sharing the directory) rebuilds the hash from
+the file once. Writers are serialised per upload with ``flock``; the
+database row is only touched before and after a chunk, never while one is
+streaming.
+"""
+
+from __future__ import annotations
+
+import fcntl
+import hashlib
+import logging
+from collections import OrderedDict
+from collections.abc import AsyncIterator
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import IO, Any
+from uuid import UUID
+
+from fastapi import HTTPException, UploadFile, status
+from sqlalchemy import delete, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import ClientDisconnect
+
+from .. import metrics
+from ..config import settings
+from ..models import KYCApplication, KYCStatus, UploadSession, User
+
+logger = logging.getLogger(__name__)
+
+# Running hashes kept per process, most recently used last.
+HASHER_CACHE_SIZE = 256
+_READ_BLOCK = 1 << 20
+
+_hashers: OrderedDict[UUID, tuple[int, Any]] = OrderedDict()
+
+
+def part_path(upload_id: UUID) -> Path:
+    """Temp file assembling ``upload_id``."""
+
+    return settings.upload_temp_dir / f"{upload_id}.part"
+
+
+def _remember_hasher(upload_id: UUID, offset: int, hasher) -> None:
+    _hashers[upload_id] = (offset, hasher)
+    _hashers.move_to_end(upload_id)
+    while len(_hashers) > HASHER_CACHE_SIZE:
+        _hashers.popitem(last=False)
+
+
+def _hasher_at(upload_id: UUID, handle: IO[bytes], offset: int):
+    """SHA-256 of the first ``offset`` bytes, from memory or from the file."""
+
+    cached = _hashers.pop(upload_id, None)
+    if cached is not None and cached[0] == offset:
+        return cached[1]
+    hasher = hashlib.sha256()
+    handle.seek(0)
+    remaining = offset
+    while remaining:
+        block = handle.read(min(_READ_BLOCK, remaining))
+        if not block:
+            break
+        hasher.update(block)
+        remaining -= len(block)
+    return hasher
+
+
+def _lock_part(upload_id: UUID) -> IO[bytes]:
+    """Open the part file locked for writing.
+
+    Raises ``BlockingIOError`` if another request is writing to this upload.
+    """
+
+    path = part_path(upload_id)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    handle = open(path, "a+b")
+    try:
+        fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BaseException:
+        handle.close()
+        raise
+    return handle
+
+
+def _discard_part(upload_id: UUID) -> None:
+    _hashers.pop(upload_id, None)
+    part_path(upload_id).unlink(missing_ok=True)
+
+
+def describe(upload: UploadSession) -> dict[str, Any]:
+    """Upload state as returned to the client."""
+
+    return {
+        "upload_id": upload.id,
+        "doc_type": upload.doc_type,
+        "offset": upload.offset,
+        "length": upload.length,
+        "complete": upload.offset == upload.length,
+        "expires_at": upload.expires_at,
+    }
+
+
+async def create_upload(
+    session: AsyncSession,
+    application: KYCApplication,
+    *,
+    doc_type: str,
+    length: int,
+    filename: str | None = None,
+    checksum: str | None = None,
+) -> UploadSession:
+    """Open a resumable upload of one document of ``application``."""
+
+    if application.status not in {KYCStatus.PENDING.value, KYCStatus.PROCESSING.value}:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Application already processed",
+        )
+    if length > settings.upload_max_bytes:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Uploads are limited to {settings.upload_max_bytes} bytes",
+        )
+    upload = UploadSession(
+        application_id=application.id,
+        doc_type=doc_type,
+        filename=filename or doc_type,
+        length=length,
+        offset=0,
+        checksum=checksum.lower() if checksum else None,
+        expires_at=datetime.utcnow() + timedelta(seconds=settings.upload_session_ttl),
+    )
+    session.add(upload)
+    await session.commit()
+    metrics.RESUMABLE_UPLOADS.labels("created").inc()
+    return upload
+
+
+async def get_upload_or_404(session: AsyncSession, upload_id: UUID, user: User) -> UploadSession:
+    """Unexpired upload of one of ``user``'s applications."""
+
+    upload = await session.scalar(
+        select(UploadSession)
+        .join(KYCApplication, UploadSession.application_id == KYCApplication.id)
+        .where(
+            UploadSession.id == upload_id,
+            KYCApplication.user_id == user.id,
+            UploadSession.expires_at > datetime.utcnow(),
+        )
+    )
+    if not upload:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Upload not found")
+    return upload
+
+
+async def append_chunk(
+    session: AsyncSession,
+    upload: UploadSession,
+    *,
+    offset: int,
+    chunk: AsyncIterator[bytes],
+) -> UploadSession:
+    """Append the request body ``chunk`` to ``upload`` at ``offset``.
+
+    The offset must equal the upload's current offset (409 otherwise, so the
+    client re-queries it). If the connection drops mid-chunk, the bytes
+    received so far are kept. A completed upload whose content does not
+    match the declared checksum is reset to offset 0 (422).
+    """
+
+    try:
+        handle = await run_in_threadpool(_lock_part, upload.id)
+    except BlockingIOError:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT, detail="Upload is already being written"
+        )
+    try:
+        # Another request may have moved the offset before we got the lock.
+        await session.refresh(upload)
+        # Release the connection while the body streams in.
+        await session.commit()
+        if offset != upload.offset:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Upload is at offset {upload.offset}",
+                headers={"Upload-Offset": str(upload.offset)},
+            )
+        # Drop bytes of an earlier chunk whose offset was never recorded.
+        await run_in_threadpool(handle.truncate, offset)
+        hasher = await run_in_threadpool(_hasher_at, upload.id, handle, offset)
+
+        received = 0
+        remaining = upload.length - offset
+        try:
+            async for data in chunk:
+                if len(data) > remaining - received:
+                    await run_in_threadpool(handle.truncate, offset)
+                    _hashers.pop(upload.id, None)
+                    raise HTTPException(
+                        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                        detail=f"Chunk exceeds the declared length of {upload.length} bytes",
+                    )
+                await run_in_threadpool(handle.write, data)
+                hasher.update(data)
+                received += len(data)
+        except ClientDisconnect:
+            logger.info("Upload %s interrupted after %s bytes", upload.id, received)
+        await run_in_threadpool(handle.flush)
+
+        new_offset = offset + received
+        mismatch = (
+            new_offset == upload.length
+            and upload.checksum is not None
+            and hasher.hexdigest() != upload.checksum
+        )
+        if mismatch:
+            new_offset = 0
+            await run_in_threadpool(handle.truncate, 0)
+            _hashers.pop(upload.id, None)
+        else:
+            _remember_hasher(upload.id, new_offset, hasher)
+        await session.execute(
+            update(UploadSession)
+            .where(UploadSession.id == upload.id)
+            .values(
+                offset=new_offset,
+                expires_at=datetime.utcnow() + timedelta(seconds=settings.upload_session_ttl),
+            )
+        )
+        await session.commit()
+    finally:
+        handle.close()
+
+    await session.refresh(upload)
+    metrics.RESUMABLE_UPLOAD_BYTES.inc(received)
+    if mismatch:
+        metrics.RESUMABLE_UPLOADS.labels("checksum_mismatch").inc()
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Checksum mismatch; the upload was reset to offset 0",
+            headers={"Upload-Offset": "0"},
+        )
+    if new_offset == upload.length:
+        metrics.RESUMABLE_UPLOADS.labels("completed").inc()
+    return upload
+
+
+async def cancel_upload(session: AsyncSession, upload: UploadSession) -> None:
+    """Delete ``upload`` and its data."""
+
+    await session.delete(upload)
+    await session.commit()
+    await run_in_threadpool(_discard_part, upload.id)
+    metrics.RESUMABLE_UPLOADS.labels("cancelled").inc()
+
+
+async def completed_uploads(
+    session: AsyncSession, application_id: UUID
+) -> dict[str, UploadSession]:
+    """Latest complete, unexpired upload of each document type."""
+
+    uploads = await session.scalars(
+        select(UploadSession)
+        .where(
+            UploadSession.application_id == application_id,
+            UploadSession.offset == UploadSession.length,
+            UploadSession.expires_at > datetime.utcnow(),
+        )
+        .order_by(UploadSession.created_at)
+    )
+    return {upload.doc_type: upload for upload in uploads}
+
+
+def open_upload(upload: UploadSession) -> UploadFile:
+    """Assembled document of a complete upload, as if posted in a form."""
+
+    return UploadFile(file=open(part_path(upload.id), "rb"), filename=upload.filename)
+
+
+async def discard_uploads(session: AsyncSession, application_id: UUID) -> None:
+    """Delete every upload of ``application_id`` and its data."""
+
+    upload_ids = (
+        await session.scalars(
+            delete(UploadSession)
+            .where(UploadSession.application_id == application_id)
+            .returning(UploadSession.id)
+        )
+    ).all()
+    await session.commit()
+    for upload_id in upload_ids:
+        await run_in_threadpool(_discard_part, upload_id)
+
+
+async def purge_expired(session: AsyncSession) -> int:
+    """Delete expired uploads and their data; returns how many were removed."""
+
+    expired = (
+        await session.scalars(
+            delete(UploadSession)
+            .where(UploadSession.expires_at <= datetime.utcnow())
+            .returning(UploadSession.id)
+        )
+    ).all()
+    await session.commit()
+    for upload_id in expired:
+        await run_in_threadpool(_discard_part, upload_id)
+    metrics.RESUMABLE_UPLOADS.labels("expired").inc(len(expired))
+    return len(expired)
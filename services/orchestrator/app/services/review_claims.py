@@ -0,0 +1,165 @@
+"""Lease-based assignment of flagged applications to reviewers.
+
+A reviewer claims the next N flagged applications; each claim is a lease
+that expires after ``REVIEW_LEASE_SECONDS`` unless renewed by a heartbeat.
+Candidates are locked with ``FOR UPDATE SKIP LOCKED`` so concurrent
+claims never hand out the same application, and an expired lease makes the
+application claimable again.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+from datetime import datetime, timedelta, timezone
+from typing import Any
+from uuid import UUID
+
+from sqlalchemy import ColumnElement, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .. import metrics
+from ..config import settings
+from ..models import KYCApplication, KYCStatus, User
+
+CLAIM_ORDERS = {
+    "risk": (KYCApplication.risk_score.desc().nulls_last(), KYCApplication.created_at),
+    "age": (KYCApplication.created_at,),
+}
+
+
+def _utc_naive(value: datetime | None) -> datetime | None:
+    """Normalise driver-returned timestamps to naive UTC like ``datetime.utcnow``."""
+
+    if value is not None and value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def claimable_by(reviewer_id: UUID, now: datetime) -> ColumnElement[bool]:
+    """Applications not under another reviewer's live lease."""
+
+    return or_(
+        KYCApplication.claimed_by.is_(None),
+        KYCApplication.claimed_by == reviewer_id,
+        KYCApplication.claim_expires_at <= now,
+    )
+
+
+def held_by_other(application: KYCApplication, reviewer_id: UUID, now: datetime) -> bool:
+    """Whether another reviewer holds a live lease on ``application``."""
+
+    expires = _utc_naive(application.claim_expires_at)
+    return (
+        application.claimed_by is not None
+        and application.claimed_by != reviewer_id
+        and expires is not None
+        and expires > now
+    )
+
+
+def end_lease(application: KYCApplication, reviewer_id: UUID, action: str, now: datetime) -> None:
+    """Clear the lease of a decided application and record reviewer throughput."""
+
+    claimed_at = _utc_naive(application.claimed_at)
+    if application.claimed_by == reviewer_id and claimed_at is not None:
+        metrics.REVIEW_CLAIM_TO_DECISION.observe((now - claimed_at).total_seconds())
+        metrics.REVIEW_DECISIONS.labels(action, "claimed").inc()
+    else:
+        metrics.REVIEW_DECISIONS.labels(action, "unclaimed").inc()
+    application.claimed_by = None
+    application.claimed_at = None
+    application.claim_expires_at = None
+
+
+async def claim_applications(
+    session: AsyncSession, reviewer: User, *, limit: int, order: str
+) -> list[dict[str, Any]]:
+    """Lease up to ``limit`` flagged applications to ``reviewer``.
+
+    Leases the reviewer already holds are renewed and count towards
+    ``limit``. Returns ReviewClaimItem-shaped dicts in queue order.
+    """
+
+    now = datetime.utcnow()
+    expires = now + timedelta(seconds=settings.review_lease_seconds)
+    candidates = (
+        select(KYCApplication.id)
+        .where(
+            KYCApplication.status == KYCStatus.FLAGGED.value,
+            claimable_by(reviewer.id, now),
+        )
+        .order_by(*CLAIM_ORDERS[order])
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    result = await session.execute(
+        update(KYCApplication)
+        .where(KYCApplication.id.in_(candidates))
+        .values(claimed_by=reviewer.id, claimed_at=now, claim_expires_at=expires)
+        .returning(KYCApplication.id)
+        .execution_options(synchronize_session=False)
+    )
+    claimed = list(result.scalars())
+    await session.commit()
+    metrics.REVIEW_CLAIMS.labels(order).inc(len(claimed))
+    if not claimed:
+        return []
+
+    rows = await session.execute(
+        select(
+            KYCApplication.id.label("application_id"),
+            User.email.label("user_email"),
+            KYCApplication.risk_score,
+            KYCApplication.status,
+            KYCApplication.updated_at,
+            KYCApplication.version,
+            KYCApplication.claim_expires_at,
+        )
+        .join(User, KYCApplication.user_id == User.id)
+        .where(KYCApplication.id.in_(claimed))
+        .order_by(*CLAIM_ORDERS[order])
+    )
+    return [dict(row._mapping) for row in rows]
+
+
+async def renew_leases(
+    session: AsyncSession, reviewer: User, application_ids: Sequence[UUID]
+) -> list[dict[str, Any]]:
+    """Extend the reviewer's leases on ``application_ids`` that are still flagged."""
+
+    now = datetime.utcnow()
+    result = await session.execute(
+        update(KYCApplication)
+        .where(
+            KYCApplication.id.in_(application_ids),
+            KYCApplication.claimed_by == reviewer.id,
+            KYCApplication.status == KYCStatus.FLAGGED.value,
+        )
+        .values(claim_expires_at=now + timedelta(seconds=settings.review_lease_seconds))
+        .returning(KYCApplication.id, KYCApplication.claim_expires_at)
+        .execution_options(synchronize_session=False)
+    )
+    renewed = [{"application_id": app_id, "claim_expires_at": at} for app_id, at in result]
+    await session.commit()
+    return renewed
+
+
+async def release_leases(
+    session: AsyncSession, reviewer: User, application_ids: Sequence[UUID]
+) -> list[UUID]:
+    """Give back the reviewer's leases on ``application_ids`` without deciding."""
+
+    result = await session.execute(
+        update(KYCApplication)
+        .where(
+            KYCApplication.id.in_(application_ids),
+            KYCApplication.claimed_by == reviewer.id,
+        )
+        .values(claimed_by=None, claimed_at=None, claim_expires_at=None)
+        .returning(KYCApplication.id)
+        .execution_options(synchronize_session=False)
+    )
+    released = list(result.scalars())
+    await session.commit()
+    metrics.REVIEW_LEASE_RELEASES.inc(len(released))
+    return released
@@ -0,0 +1,358 @@
+"""In-process sanctions screening against a local list file.
+
+The list is a CSV with ``id`` and ``name`` columns and an optional
+``aliases`` column (``;``-separated); every name and alias becomes an
+entry. Names are normalised to ASCII lowercase tokens. Matching works on
+the token vocabulary rather than on whole entries:
+
+* each query token finds similar vocabulary tokens through a trigram
+  index (blocking), verified with a bounded Levenshtein distance, plus
+  tokens sharing its Soundex code;
+* entries containing enough matched tokens are scored by how well their
+  tokens line up with the query.
+
+Posting lists are ``array("I")`` so a million entries stay compact, and
+token lookups are memoised because names repeat heavily.
+:class:`SanctionsScreener` swaps in a rebuilt index when the file changes,
+without a restart.
+"""
+
+from __future__ import annotations
+
+import csv
+import logging
+import re
+import threading
+import time
+import unicodedata
+from array import array
+from collections import Counter, OrderedDict, defaultdict
+from collections.abc import Iterable, Iterator
+from itertools import chain, combinations
+from dataclasses import dataclass
+from pathlib import Path
+
+from .. import metrics
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+PHONETIC_SIMILARITY = 0.8
+TOKEN_CACHE_SIZE = 50_000
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+_SOUNDEX = {
+    **dict.fromkeys("bfpv", "1"),
+    **dict.fromkeys("cgjkqsxz", "2"),
+    **dict.fromkeys("dt", "3"),
+    "l": "4",
+    **dict.fromkeys("mn", "5"),
+    "r": "6",
+}
+
+
+@dataclass(frozen=True)
+class SanctionsMatch:
+    """Best list entry for a screened name."""
+
+    entry_id: str
+    name: str
+    score: float
+
+
+def normalize_tokens(name: str) -> list[str]:
+    """Lowercase ASCII tokens of ``name`` with accents and punctuation removed."""
+
+    decomposed = unicodedata.normalize("NFKD", name)
+    stripped = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return _TOKEN.findall(stripped.casefold())
+
+
+def phonetic_key(token: str) -> str:
+    """American Soundex code of ``token`` (digits are kept verbatim)."""
+
+    if not token.isalpha():
+        return token
+    code = token[0]
+    previous = _SOUNDEX.get(token[0], "")
+    for ch in token[1:]:
+        digit = _SOUNDEX.get(ch, "")
+        if digit and digit != previous:
+            code += digit
+            if len(code) == 4:
+                break
+        if ch not in "hw":
+            previous = digit
+    return code.ljust(4, "0")
+
+
+def trigrams(token: str) -> set[str]:
+    """Character trigrams of ``token`` padded with ``$`` at both ends."""
+
+    padded = f"${token}$"
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+def max_edits(token: str) -> int:
+    """Edits tolerated for a token of this length."""
+
+    if len(token) <= 3:
+        return 0
+    return 1 if len(token) <= 10 else 2
+
+
+def bounded_levenshtein(a: str, b: str, limit: int) -> int:
+    """Levenshtein distance of ``a`` and ``b``, or ``limit + 1`` once it exceeds ``limit``."""
+
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(
+                min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb))
+            )
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1] if previous[-1] <= limit else limit + 1
+
+
+def read_list(path: Path) -> Iterator[tuple[str, str]]:
+    """Yield ``(entry_id, name)`` for every name and alias in the list file."""
+
+    with path.open(newline="", encoding="utf-8") as handle:
+        for row in csv.DictReader(handle):
+            entry_id = row["id"]
+            yield entry_id, row["name"]
+            for alias in (row.get("aliases") or "").split(";"):
+                if alias.strip():
+                    yield entry_id, alias
+
+
+class SanctionsIndex:
+    """Immutable fuzzy-match index over sanctions list entries."""
+
+    def __init__(self, entries: Iterable[tuple[str, str]]) -> None:
+        vocabulary: dict[str, int] = {}
+        postings: defaultdict[int, array] = defaultdict(lambda: array("I"))
+        self._ids: list[str] = []
+        # Entry i's tokens are _entry_tokens[_offsets[i]:_offsets[i + 1]].
+        self._offsets = array("I", [0])
+        self._entry_tokens = array("I")
+        for entry_id, name in entries:
+            tokens = list(dict.fromkeys(normalize_tokens(name)))
+            if not tokens:
+                continue
+            entry = len(self._ids)
+            self._ids.append(entry_id)
+            for token in tokens:
+                token_id = vocabulary.setdefault(token, len(vocabulary))
+                self._entry_tokens.append(token_id)
+                postings[token_id].append(entry)
+            self._offsets.append(len(self._entry_tokens))
+
+        self._vocabulary = vocabulary
+        self._tokens = list(vocabulary)
+        self._postings = [postings[token_id] for token_id in range(len(self._tokens))]
+        # Trigram postings are split by token length so a lookup only counts
+        # tokens whose length is within the edit budget.
+        grams: defaultdict[tuple[str, int], array] = defaultdict(lambda: array("I"))
+        sounds: defaultdict[str, array] = defaultdict(lambda: array("I"))
+        for token_id, token in enumerate(self._tokens):
+            for gram in trigrams(token):
+                grams[gram, len(token)].append(token_id)
+            sounds[phonetic_key(token)].append(token_id)
+        self._trigram_postings = dict(grams)
+        self._phonetic_postings = dict(sounds)
+        self._token_cache: OrderedDict[str, dict[int, float]] = OrderedDict()
+        self._cache_lock = threading.Lock()
+
+    @classmethod
+    def from_file(cls, path: Path) -> SanctionsIndex:
+        """Build an index from a list file (see :func:`read_list`)."""
+
+        return cls(read_list(path))
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def _entry_token_ids(self, entry: int) -> array:
+        return self._entry_tokens[self._offsets[entry] : self._offsets[entry + 1]]
+
+    def _entries_of(self, token_ids: Iterable[int]) -> set[int]:
+        return set(chain.from_iterable(self._postings[token_id] for token_id in token_ids))
+
+    def _similar_tokens(self, token: str) -> dict[int, float]:
+        """Vocabulary tokens resembling ``token`` with their similarity in ``(0, 1]``."""
+
+        with self._cache_lock:
+            cached = self._token_cache.get(token)
+            if cached is not None:
+                self._token_cache.move_to_end(token)
+                return cached
+
+        limit = max_edits(token)
+        similar: dict[int, float] = {}
+        exact = self._vocabulary.get(token)
+        if exact is not None:
+            similar[exact] = 1.0
+        if limit:
+            query_grams = trigrams(token)
+            for length in range(len(token) - limit, len(token) + limit + 1):
+                # Each edit destroys at most three of the longer token's trigrams.
+                required = max(1, max(len(token), length) - 3 * limit)
+                shared: Counter[int] = Counter()
+                for gram in query_grams:
+                    shared.update(self._trigram_postings.get((gram, length), ()))
+                for token_id, count in shared.items():
+                    if count < required or token_id == exact:
+                        continue
+                    candidate = self._tokens[token_id]
+                    distance = bounded_levenshtein(token, candidate, limit)
+                    if distance <= limit:
+                        similar[token_id] = 1 - distance / max(len(token), len(candidate))
+            for token_id in self._phonetic_postings.get(phonetic_key(token), ()):
+                if (
+                    similar.get(token_id, 0) < PHONETIC_SIMILARITY
+                    and abs(len(self._tokens[token_id]) - len(token)) <= 2
+                ):
+                    similar[token_id] = PHONETIC_SIMILARITY
+
+        with self._cache_lock:
+            self._token_cache[token] = similar
+            if len(self._token_cache) > TOKEN_CACHE_SIZE:
+                self._token_cache.popitem(last=False)
+        return similar
+
+    def screen(self, name: str, *, min_score: float = 0.0) -> SanctionsMatch | None:
+        """Return the best entry for ``name`` scoring at least ``min_score``.
+
+        An entry's score is the sum of its best token similarities, over the
+        larger of the two token counts, so extra or missing name parts count
+        against it. Multi-token names must match an entry on two tokens, so
+        candidates are the pairwise intersections of the per-token entry sets
+        and a common name part alone does not fan out into scoring.
+        """
+
+        query = list(dict.fromkeys(normalize_tokens(name)))
+        if not query:
+            return None
+        groups = [group for group in map(self._similar_tokens, query) if group]
+        if len(groups) < min(2, len(query)):
+            return None
+        matched: dict[int, float] = {}
+        for group in groups:
+            for token_id, similarity in group.items():
+                if similarity > matched.get(token_id, 0):
+                    matched[token_id] = similarity
+
+        entry_sets = [self._entries_of(group) for group in groups]
+        if len(query) == 1:
+            candidates = entry_sets[0]
+        else:
+            candidates = set().union(*(a & b for a, b in combinations(entry_sets, 2)))
+
+        best_entry, best_score = -1, min_score
+        for entry in candidates:
+            tokens = self._entry_token_ids(entry)
+            similarities = sorted((matched.get(t, 0.0) for t in tokens), reverse=True)
+            score = sum(similarities[: len(query)]) / max(len(query), len(tokens))
+            if score > best_score or (best_entry < 0 and score == best_score):
+                best_entry, best_score = entry, score
+        if best_entry < 0:
+            return None
+        return SanctionsMatch(
+            entry_id=self._ids[best_entry],
+            name=" ".join(self._tokens[t] for t in self._entry_token_ids(best_entry)),
+            score=round(best_score, 4),
+        )
+
+
+class SanctionsScreener:
+    """Holds the current index and reloads it when the list file changes.
+
+    The file's mtime is checked at most every ``check_interval`` seconds. The
+    first load blocks; later rebuilds run on a background thread while the
+    previous index keeps serving, then replace it in one assignment.
+    """
+
+    def __init__(self, path: Path | None, *, check_interval: float) -> None:
+        self._path = path
+        self._check_interval = check_interval
+        self._index: SanctionsIndex | None = None
+        self._mtime: int | None = None
+        self._checked_at = float("-inf")
+        self._lock = threading.Lock()
+        self._reloading = False
+
+    @property
+    def index(self) -> SanctionsIndex | None:
+        """The current index, reloading it first if the list file changed."""
+
+        now = time.monotonic()
+        if self._path is not None and now - self._checked_at >= self._check_interval:
+            self._checked_at = now
+            self._check_for_update()
+        return self._index
+
+    def screen(self, name: str) -> SanctionsMatch | None:
+        """Best match for ``name`` at or above ``SANCTIONS_MATCH_THRESHOLD``."""
+
+        index = self.index
+        if index is None:
+            return None
+        return index.screen(name, min_score=settings.sanctions_match_threshold)
+
+    def _check_for_update(self) -> None:
+        try:
+            mtime = self._path.stat().st_mtime_ns
+        except OSError as exc:
+            logger.warning("Sanctions list %s unavailable: %s", self._path, exc)
+            return
+        with self._lock:
+            if mtime == self._mtime or self._reloading:
+                return
+            self._reloading = True
+        if self._index is None:
+            self._load(mtime)
+        else:
+            threading.Thread(
+                target=self._load, args=(mtime,), name="sanctions-reload", daemon=True
+            ).start()
+
+    def _load(self, mtime: int) -> None:
+        started = time.perf_counter()
+        try:
+            index = SanctionsIndex.from_file(self._path)
+        except Exception:
+            metrics.SANCTIONS_RELOADS.labels("failed").inc()
+            logger.exception("Failed to load sanctions list %s", self._path)
+            with self._lock:
+                self._reloading = False
+            return
+        with self._lock:
+            self._index, self._mtime, self._reloading = index, mtime, False
+        metrics.SANCTIONS_RELOADS.labels("loaded").inc()
+        logger.info(
+            "Loaded %s sanctions entries from %s in %.1fs",
+            len(index),
+            self._path,
+            time.perf_counter() - started,
+        )
+
+
+_screener: SanctionsScreener | None = None
+
+
+def get_screener() -> SanctionsScreener:
+    """Process-wide screener for ``SANCTIONS_LIST_PATH``."""
+
+    global _screener
+    if _screener is None:
+        _screener = SanctionsScreener(
+            settings.sanctions_list_path,
+            check_interval=settings.sanctions_reload_interval,
+        )
+    return _screener
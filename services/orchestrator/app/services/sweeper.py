@@ -0,0 +1,76 @@
+"""Watchdog for applications stuck in PROCESSING.
+
+An application can stay PROCESSING forever if the worker running it dies,
+if its ``process_kyc`` message is lost, or if publishing that message
+failed after the upload committed. The sweeper finds applications that
+have not moved for ``SWEEPER_STUCK_SECONDS`` (and are past their admission
+estimate) and hands them back to the pipeline, which resumes from the
+first incomplete stage.
+
+Claiming a batch is one ``UPDATE ... RETURNING`` over the partial index
+``idx_applications_processing_updated``, so the cost depends on the number
+of in-flight applications, not on the table size. The update moves
+``updated_at`` forward, which makes the rescue idempotent: concurrent
+sweepers skip locked rows, and a rescued application is not picked again
+until another threshold has passed. After ``SWEEPER_MAX_RESCUES`` attempts
+an application is left alone and reported as abandoned.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from uuid import UUID
+
+from sqlalchemy import ColumnElement, func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..config import settings
+from ..models import KYCApplication, KYCStatus
+
+
+def _stuck(now: datetime) -> ColumnElement[bool]:
+    cutoff = now - timedelta(seconds=settings.sweeper_stuck_seconds)
+    return (
+        (KYCApplication.status == KYCStatus.PROCESSING.value)
+        & (KYCApplication.updated_at < cutoff)
+        & or_(
+            KYCApplication.estimated_completion_at.is_(None),
+            KYCApplication.estimated_completion_at < cutoff,
+        )
+    )
+
+
+async def claim_stuck(session: AsyncSession, now: datetime, *, limit: int) -> list[UUID]:
+    """Mark up to ``limit`` stuck applications as rescued and return their ids.
+
+    Oldest first. The claim is committed before the caller re-enqueues, so
+    a failed publish is retried by a later sweep.
+    """
+
+    candidates = (
+        select(KYCApplication.id)
+        .where(_stuck(now), KYCApplication.rescue_count < settings.sweeper_max_rescues)
+        .order_by(KYCApplication.updated_at)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    result = await session.execute(
+        update(KYCApplication)
+        .where(KYCApplication.id.in_(candidates))
+        .values(updated_at=now, rescue_count=KYCApplication.rescue_count + 1)
+        .returning(KYCApplication.id)
+        .execution_options(synchronize_session=False)
+    )
+    claimed = list(result.scalars())
+    await session.commit()
+    return claimed
+
+
+async def count_abandoned(session: AsyncSession, now: datetime) -> int:
+    """Stuck applications that have used up their rescues."""
+
+    return await session.scalar(
+        select(func.count())
+        .select_from(KYCApplication)
+        .where(_stuck(now), KYCApplication.rescue_count >= settings.sweeper_max_rescues)
+    )
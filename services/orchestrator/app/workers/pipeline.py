@@ -0,0 +1,507 @@
+"""Checkpointed KYC processing stages executed by the Celery worker."""
+
+from __future__ import annotations
+
+import logging
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from statistics import mean
+from typing import Any
+from uuid import UUID
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, raiseload, selectinload
+
+from .. import metrics
+from ..clients import (
+    call_facematch_service,
+    call_ocr_service,
+    call_risk_service,
+    download_from_storage,
+)
+from ..config import settings
+from ..models import (
+    Document,
+    FaceMatch,
+    KYCApplication,
+    KYCStatus,
+    PipelineStage,
+    PipelineStageStatus,
+)
+from ..services import (
+    document_hashes,
+    events,
+    face_index,
+    image_normalizer,
+    queue_stats,
+    sanctions,
+)
+from ..services.audit_helper import create_audit_log
+
+logger = logging.getLogger(__name__)
+
+STAGES: tuple[str, ...] = (
+    "normalize",
+    "ocr",
+    "face",
+    "features",
+    "risk",
+    "decision",
+    "notify",
+)
+
+# Derived images each document type is sent to downstream services as.
+IMAGE_PROFILES: dict[str, tuple[str, ...]] = {
+    "id_card": ("ocr", "face"),
+    "address_proof": ("ocr",),
+    "selfie": ("ocr", "face"),
+}
+
+
+class StageError(RuntimeError):
+    """Raised when a pipeline stage fails and the task should be retried."""
+
+    def __init__(self, stage: str, message: str) -> None:
+        super().__init__(f"Stage {stage} failed: {message}")
+        self.stage = stage
+
+
+@dataclass
+class PipelineContext:
+    """State shared by the stages of one pipeline run."""
+
+    session: AsyncSession
+    application: KYCApplication
+    stages: dict[str, PipelineStage]
+    _on_commit: list[Callable[[], None]] = field(default_factory=list)
+
+    def output(self, stage: str) -> dict[str, Any]:
+        """Return the persisted output of an earlier stage."""
+
+        record = self.stages.get(stage)
+        return dict(record.output or {}) if record else {}
+
+    def on_commit(self, callback: Callable[[], None]) -> None:
+        """Run ``callback`` once the current stage has committed; dropped if it fails."""
+
+        self._on_commit.append(callback)
+
+
+async def load_application_for_processing(
+    session: AsyncSession,
+    application_id: UUID,
+) -> KYCApplication | None:
+    """Fetch an application with everything the stages touch.
+
+    Always three statements: the application joined with its face match, then
+    its documents and its stage checkpoints via ``selectinload``. Documents skip
+    the ``ocr_json`` payload (stages only write it) and any other relationship
+    raises instead of lazy-loading outside the greenlet.
+    """
+
+    result = await session.execute(
+        select(KYCApplication)
+        .options(
+            joinedload(KYCApplication.face_match).load_only(
+                FaceMatch.similarity_score,
+                FaceMatch.liveness_result,
+                FaceMatch.embedding_hash,
+            ),
+            selectinload(KYCApplication.documents).load_only(
+                Document.application_id,
+                Document.doc_type,
+                Document.storage_path,
+                Document.doc_hash,
+                Document.phash,
+                Document.doc_confidence,
+                Document.created_at,
+            ),
+            selectinload(KYCApplication.stages),
+            raiseload("*"),
+        )
+        .where(KYCApplication.id == application_id)
+    )
+    return result.unique().scalar_one_or_none()
+
+
+async def _stage_normalize(ctx: PipelineContext) -> dict[str, Any]:
+    """Derive the downscaled images OCR and face matching receive.
+
+    The derived images live in the image cache keyed by the digest of the
+    original, which this stage records for the stages after it.
+    """
+
+    documents = {}
+    for doc in ctx.application.documents:
+        original = download_from_storage(doc.storage_path)
+        digest = image_normalizer.content_digest(original)
+        derived = {
+            profile: len(await image_normalizer.derive(original, profile, digest=digest))
+            for profile in IMAGE_PROFILES.get(doc.doc_type, ())
+        }
+        documents[str(doc.id)] = {
+            "digest": digest,
+            "original_bytes": len(original),
+            "derived_bytes": derived,
+        }
+    return {"documents": documents}
+
+
+async def _document_image(ctx: PipelineContext, doc: Document, profile: str) -> bytes:
+    """The ``profile`` image of ``doc``, derived again if the cache lost it."""
+
+    normalized = ctx.output("normalize").get("documents", {}).get(str(doc.id), {})
+    if normalized.get("digest"):
+        cached = image_normalizer.get_cache().get(normalized["digest"], profile)
+        if cached is not None:
+            return cached
+    return await image_normalizer.derive(download_from_storage(doc.storage_path), profile)
+
+
+async def _stage_ocr(ctx: PipelineContext) -> dict[str, Any]:
+    """Run OCR on every document and store the extracted fields."""
+
+    application = ctx.application
+    results = []
+    names: dict[str, str] = {}
+    for doc in application.documents:
+        ocr = call_ocr_service(
+            str(application.id),
+            doc.doc_type,
+            await _document_image(ctx, doc, "ocr"),
+            meta={"doc_type": doc.doc_type},
+        )
+        doc.ocr_json = ocr.get("ocr_json")
+        doc.doc_confidence = ocr.get("doc_confidence", 0.8)
+        doc.doc_hash = ocr.get("doc_hash", doc.doc_hash)
+        ctx.session.add(doc)
+        if isinstance(doc.ocr_json, dict) and doc.ocr_json.get("name"):
+            names.setdefault(doc.doc_type, doc.ocr_json["name"])
+        results.append(
+            {
+                "document_id": str(doc.id),
+                "doc_type": doc.doc_type,
+                "doc_confidence": doc.doc_confidence,
+            }
+        )
+    # The ID card carries the authoritative name; other documents are fallbacks.
+    name = names.get("id_card") or next(iter(names.values()), None)
+    return {"documents": results, "name": name}
+
+
+async def _stage_face(ctx: PipelineContext) -> dict[str, Any]:
+    """Compare the ID photo with the selfie and persist the match."""
+
+    application = ctx.application
+    documents = {doc.doc_type: doc for doc in application.documents}
+    facematch = call_facematch_service(
+        str(application.id),
+        await _document_image(ctx, documents["id_card"], "face"),
+        await _document_image(ctx, documents["selfie"], "face"),
+    )
+    face_record = application.face_match or FaceMatch(application_id=application.id)
+    face_record.similarity_score = facematch.get("similarity", 0.8)
+    face_record.liveness_result = facematch.get("liveness_result", "UNKNOWN")
+    face_record.embedding_hash = facematch.get("embedding_hash")
+    ctx.session.add(face_record)
+    output = {
+        "similarity_score": face_record.similarity_score,
+        "liveness_result": face_record.liveness_result,
+        "duplicate_face": 0,
+    }
+
+    embedding = facematch.get("embedding")
+    if not embedding:
+        metrics.DUPLICATE_FACE_CHECKS.labels("no_embedding").inc()
+        return output
+    face_record.embedding = face_index.encode_embedding(embedding)
+    index = face_index.get_face_index()
+    # Autoflush would let the refresh read this stage's uncommitted face.
+    with ctx.session.no_autoflush:
+        await index.refresh(ctx.session)
+    # Re-applications by the same applicant are not duplicates of another identity.
+    applicant_id = application.applicant_id
+    others = [
+        neighbour
+        for neighbour in index.search(embedding, settings.face_duplicate_top_k)
+        if neighbour.applicant_id != applicant_id
+    ]
+    # Indexed only once committed, so a rolled-back face is never matched.
+    ctx.on_commit(lambda: index.add(application.id, applicant_id, embedding))
+    if others and others[0].similarity >= settings.face_duplicate_threshold:
+        output.update(
+            duplicate_face=1,
+            duplicate_of=str(others[0].application_id),
+            duplicate_similarity=round(others[0].similarity, 4),
+        )
+        metrics.DUPLICATE_FACE_CHECKS.labels("duplicate").inc()
+        logger.info(
+            "Face of %s matches application %s (%.3f)",
+            application.id,
+            others[0].application_id,
+            others[0].similarity,
+        )
+    else:
+        metrics.DUPLICATE_FACE_CHECKS.labels("unique").inc()
+    return output
+
+
+# Closest matches kept per document; the rest only add noise for reviewers.
+NEAR_DUPLICATE_MATCHES = 10
+
+
+async def _match_near_duplicate_documents(ctx: PipelineContext) -> int:
+    """Record other applicants' documents whose perceptual hash is close to ours.
+
+    Matches are stored on each document's ``near_duplicates`` for reviewers.
+    Returns 1 if any document has one, for the risk features.
+    """
+
+    application = ctx.application
+    hashed = [doc for doc in application.documents if doc.phash is not None]
+    if not hashed:
+        metrics.NEAR_DUPLICATE_DOCUMENT_CHECKS.labels("no_hash").inc()
+        return 0
+    index = document_hashes.get_document_hash_index()
+    await index.refresh(ctx.session)
+    # Over-fetch: the application's own and the same applicant's earlier documents are dropped.
+    found = {
+        doc.id: index.search(
+            doc.phash, settings.document_phash_max_distance, limit=4 * NEAR_DUPLICATE_MATCHES
+        )
+        for doc in hashed
+    }
+    candidates = {match.document_id for matches in found.values() for match in matches}
+    owners: dict[UUID, UUID] = {}
+    if candidates:
+        rows = await ctx.session.execute(
+            select(Document.id, Document.application_id)
+            .join(KYCApplication, Document.application_id == KYCApplication.id)
+            .where(
+                Document.id.in_(candidates),
+                KYCApplication.applicant_id != application.applicant_id,
+            )
+        )
+        owners = dict(rows.all())
+
+    duplicate = 0
+    for doc in hashed:
+        doc.near_duplicates = [
+            {
+                "document_id": str(match.document_id),
+                "application_id": str(owners[match.document_id]),
+                "distance": match.distance,
+            }
+            for match in found[doc.id]
+            if match.document_id in owners
+        ][:NEAR_DUPLICATE_MATCHES]
+        ctx.session.add(doc)
+        duplicate |= bool(doc.near_duplicates)
+    additions = [(doc.id, doc.phash, doc.created_at) for doc in hashed]
+
+    def _index_documents() -> None:
+        for document_id, phash, created_at in additions:
+            index.add(document_id, phash, created_at)
+
+    # Indexed only once committed, so a rolled-back document is never matched.
+    ctx.on_commit(_index_documents)
+    metrics.NEAR_DUPLICATE_DOCUMENT_CHECKS.labels("duplicate" if duplicate else "unique").inc()
+    return int(duplicate)
+
+
+async def _stage_features(ctx: PipelineContext) -> dict[str, Any]:
+    """Assemble the risk feature vector from earlier stage outputs."""
+
+    name = ctx.output("ocr").get("name")
+    sanctions_hit = 0
+    if not name:
+        metrics.SANCTIONS_SCREENS.labels("no_name").inc()
+    else:
+        screener = sanctions.get_screener()
+        if screener.index is None:
+            metrics.SANCTIONS_SCREENS.labels("unavailable").inc()
+        elif (match := screener.screen(name)) is not None:
+            sanctions_hit = 1
+            metrics.SANCTIONS_SCREENS.labels("hit").inc()
+            logger.info(
+                "Sanctions hit for %s: entry %s score %s",
+                ctx.application.id,
+                match.entry_id,
+                match.score,
+            )
+        else:
+            metrics.SANCTIONS_SCREENS.labels("clear").inc()
+
+    near_duplicate_document = await _match_near_duplicate_documents(ctx)
+    doc_confidences = [
+        doc.get("doc_confidence") or 0 for doc in ctx.output("ocr").get("documents", [])
+    ]
+    return {
+        "doc_confidence": mean(doc_confidences) if doc_confidences else 0,
+        "face_similarity": ctx.output("face").get("similarity_score") or 0,
+        "sanctions_hit": sanctions_hit,
+        "duplicate_face": ctx.output("face").get("duplicate_face", 0),
+        "near_duplicate_document": near_duplicate_document,
+        "geo_variance": 0,
+        "device_trust_score": 0.7,
+    }
+
+
+async def _stage_risk(ctx: PipelineContext) -> dict[str, Any]:
+    """Score the application with the risk service."""
+
+    return call_risk_service(
+        str(ctx.application.id),
+        ctx.output("features"),
+        meta={"actor": "orchestrator"},
+    )
+
+
+async def _stage_decision(ctx: PipelineContext) -> dict[str, Any]:
+    """Apply the risk threshold and record the outcome."""
+
+    application = ctx.application
+    before = queue_stats.application_key(application)
+    previous_status = application.status
+    risk_response = ctx.output("risk")
+    application.risk_score = risk_response.get("risk_score")
+    application.drpa_level = risk_response.get("drpa_level")
+    threshold = settings.risk_approve_threshold
+    if application.risk_score is not None and application.risk_score < threshold:
+        application.status = KYCStatus.APPROVED.value
+    else:
+        application.status = KYCStatus.FLAGGED.value
+    ctx.session.add(application)
+
+    await create_audit_log(
+        ctx.session,
+        application_id=application.id,
+        actor="orchestrator",
+        action="risk_scored",
+        payload={
+            "features": ctx.output("features"),
+            "risk_response": risk_response,
+        },
+        commit=False,
+    )
+    await queue_stats.record_transition(
+        ctx.session, before, queue_stats.application_key(application)
+    )
+    events.record(
+        ctx.session, events.status_changed(application, previous_status, actor="orchestrator")
+    )
+    metrics.KYC_OUTCOMES.labels(application.status, "pipeline").inc()
+    return {"status": application.status, "risk_score": application.risk_score}
+
+
+async def _stage_notify(ctx: PipelineContext) -> dict[str, Any]:
+    """Publish the scoring event for downstream listeners once the stage commits."""
+
+    decision = ctx.output("decision")
+    events.record(
+        ctx.session,
+        events.RiskScored(
+            application_id=ctx.application.id,
+            risk_score=decision.get("risk_score"),
+            drpa_level=ctx.application.drpa_level,
+        ),
+    )
+    return {"published": settings.events_enabled}
+
+
+STAGE_HANDLERS: dict[str, Callable[[PipelineContext], Awaitable[dict[str, Any]]]] = {
+    "normalize": _stage_normalize,
+    "ocr": _stage_ocr,
+    "face": _stage_face,
+    "features": _stage_features,
+    "risk": _stage_risk,
+    "decision": _stage_decision,
+    "notify": _stage_notify,
+}
+
+
+async def run_pipeline(session: AsyncSession, application: KYCApplication) -> bool:
+    """Run every stage that has not completed yet, committing after each one.
+
+    ``application`` must come from :func:`load_application_for_processing`.
+    A failing stage is marked FAILED and surfaces as :class:`StageError`; the
+    next attempt resumes from that stage using the persisted outputs of the
+    stages before it. Returns whether any stage ran.
+    """
+
+    stages = {record.stage: record for record in application.stages}
+    pending = [
+        name
+        for name in STAGES
+        if name not in stages or stages[name].status != PipelineStageStatus.COMPLETED.value
+    ]
+    if not pending:
+        logger.info("Application %s already fully processed", application.id)
+        return False
+    if "decision" in pending and application.status != KYCStatus.PROCESSING.value:
+        logger.info("Application %s not in PROCESSING", application.id)
+        return False
+
+    doc_types = {doc.doc_type for doc in application.documents}
+    if not {"id_card", "selfie"} <= doc_types:
+        logger.error("Missing required documents for %s", application.id)
+        return False
+
+    for name in pending:
+        if name not in stages:
+            stages[name] = PipelineStage(
+                application_id=application.id,
+                stage=name,
+                status=PipelineStageStatus.PENDING.value,
+                attempts=0,
+            )
+            session.add(stages[name])
+    await session.commit()
+
+    ctx = PipelineContext(session=session, application=application, stages=stages)
+    # A failed stage rolls back, which expires the application.
+    application_id = application.id
+    for name in pending:
+        record = stages[name]
+        record_id = record.id
+        attempts = (record.attempts or 0) + 1
+        started = time.perf_counter()
+        try:
+            output = await STAGE_HANDLERS[name](ctx)
+        except Exception as exc:
+            ctx._on_commit.clear()
+            metrics.STAGE_DURATION.labels(name, "failed").observe(time.perf_counter() - started)
+            await session.rollback()
+            await session.execute(
+                update(PipelineStage)
+                .where(PipelineStage.id == record_id)
+                .values(
+                    status=PipelineStageStatus.FAILED.value,
+                    attempts=attempts,
+                    error=str(exc)[:2000],
+                )
+            )
+            await session.commit()
+            logger.warning(
+                "Stage %s failed for %s (attempt %s): %s",
+                name,
+                application_id,
+                attempts,
+                exc,
+            )
+            raise StageError(name, str(exc)) from exc
+
+        record.status = PipelineStageStatus.COMPLETED.value
+        record.attempts = attempts
+        record.output = output
+        record.error = None
+        session.add(record)
+        await session.commit()
+        callbacks, ctx._on_commit = ctx._on_commit, []
+        for callback in callbacks:
+            callback()
+        metrics.STAGE_DURATION.labels(name, "completed").observe(time.perf_counter() - started)
+        logger.info("Stage %s completed for %s", name, application_id)
+    return True
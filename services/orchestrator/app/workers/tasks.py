@@ -3,24 +3,40 @@
 from __future__ import annotations
 
 import asyncio
-import json
 import logging
-from statistics import mean
+import os
+import time
+from collections.abc import Iterable
+from datetime import datetime
 from uuid import UUID
 
-from celery import Celery
-from redis import Redis
-from sqlalchemy import select
-
-from ..clients import (
-    call_facematch_service,
-    call_ocr_service,
-    call_risk_service,
+from celery import Celery, chord
+from celery.signals import (
+    celeryd_init,
+    task_retry,
+    worker_init,
+    worker_process_init,
+    worker_process_shutdown,
 )
+from prometheus_client import REGISTRY, CollectorRegistry, multiprocess, start_http_server
+
+from .. import db, metrics
 from ..config import settings
 from ..db import SessionLocal
-from ..models import Document, FaceMatch, KYCApplication, KYCStatus
-from ..services.audit_helper import create_audit_log
+from ..instrumentation import track
+from ..models import KYCBatch
+from ..services import (
+    admission,
+    audit_partitions,
+    derivatives,
+    events,
+    image_normalizer,
+    queue_stats,
+    resumable_uploads,
+    sanctions,
+    sweeper,
+)
+from .pipeline import StageError, load_application_for_processing, run_pipeline
 
 logger = logging.getLogger(__name__)
 
@@ -29,110 +45,277 @@ celery_app = Celery(
     broker=settings.celery_broker_url,
     backend=settings.celery_backend_url,
 )
+celery_app.conf.beat_schedule = {
+    "maintain-audit-partitions": {
+        "task": "app.workers.tasks.maintain_audit_partitions",
+        "schedule": settings.audit_maintenance_interval,
+    },
+    "reconcile-application-counters": {
+        "task": "app.workers.tasks.reconcile_application_counters",
+        "schedule": settings.counter_reconcile_interval,
+    },
+    "sweep-stuck-applications": {
+        "task": "app.workers.tasks.sweep_stuck_applications",
+        "schedule": settings.sweeper_interval,
+    },
+    "purge-expired-uploads": {
+        "task": "app.workers.tasks.purge_expired_uploads",
+        "schedule": settings.upload_purge_interval,
+    },
+}
+
+
+_loop: asyncio.AbstractEventLoop | None = None
+
+
+def run_async(coro):
+    """Run ``coro`` on this process's persistent event loop.
+
+    Pooled asyncpg connections are bound to the loop that opened them, so
+    a fresh ``asyncio.run`` per task would leave the pool unusable and
+    reconnect on every task.
+    """
+
+    global _loop
+    if _loop is None or _loop.is_closed():
+        _loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(_loop)
+    return _loop.run_until_complete(coro)
 
 
-@celery_app.task(bind=True, max_retries=3)
+@worker_init.connect
+@worker_process_init.connect
+def _configure_worker_db(**_: object) -> None:
+    """Give each worker process its own, separately sized connection pool."""
+
+    db.configure_engines(
+        pool_size=settings.worker_db_pool_size,
+        max_overflow=settings.worker_db_max_overflow,
+    )
+
+
+@worker_init.connect
+def _load_sanctions_list(**_: object) -> None:
+    """Build the sanctions index before forking so children start with it."""
+
+    sanctions.get_screener().index
+
+
+@celery_app.task(
+    bind=True,
+    max_retries=3,
+    autoretry_for=(StageError,),
+    retry_backoff=settings.pipeline_retry_backoff,
+    retry_backoff_max=settings.pipeline_retry_backoff_max,
+    retry_jitter=True,
+)
 def process_kyc(self, application_id: str) -> None:
-    """Celery entrypoint for KYC processing."""
+    """Celery entrypoint for KYC processing.
+
+    Failed stages raise :class:`StageError`, which Celery retries with
+    exponential backoff; completed stages are skipped on the retry.
+    """
 
-    asyncio.run(_process_kyc(UUID(application_id)))
+    run_async(_process_kyc(UUID(application_id)))
 
 
 async def _process_kyc(application_id: UUID) -> None:
     """Asynchronous processing pipeline."""
 
+    with track("task", "process_kyc"):
+        async with SessionLocal() as session:
+            application = await load_application_for_processing(session, application_id)
+            if not application:
+                logger.error("Application %s not found", application_id)
+                return
+
+            started = time.perf_counter()
+            # Early returns (nothing left to run) would skew the throughput estimate.
+            if await run_pipeline(session, application):
+                admission.record_completion(time.perf_counter() - started)
+
+
+@celery_app.task
+def finalize_batch(batch_id: str) -> None:
+    """Chord callback stamping a batch once all its applications were processed.
+
+    Also the chord's error callback, so a batch is stamped when some of its
+    applications gave up after their retries.
+    """
+
+    run_async(_finalize_batch(UUID(batch_id)))
+
+
+async def _finalize_batch(batch_id: UUID) -> None:
     async with SessionLocal() as session:
-        result = await session.execute(
-            select(KYCApplication).where(KYCApplication.id == application_id)
-        )
-        application = result.scalar_one_or_none()
-        if not application:
-            logger.error("Application %s not found", application_id)
+        batch = await session.get(KYCBatch, batch_id)
+        if batch is None:
+            logger.error("Batch %s not found", batch_id)
             return
-        if application.status != KYCStatus.PROCESSING.value:
-            logger.info("Application %s not in PROCESSING", application_id)
+        if batch.completed_at is not None:
             return
+        batch.completed_at = datetime.utcnow()
+        await session.commit()
+    logger.info("Batch %s processed", batch_id)
 
-        documents = application.documents
-        id_doc = next((doc for doc in documents if doc.doc_type == "id_card"), None)
-        selfie_doc = next((doc for doc in documents if doc.doc_type == "selfie"), None)
 
-        if not id_doc or not selfie_doc:
-            logger.error("Missing required documents for %s", application_id)
-            return
+def enqueue_batch(batch_id: UUID, application_ids: Iterable[UUID]) -> None:
+    """Process a batch's applications as a group, then run :func:`finalize_batch`."""
 
-        # Placeholder bytes; production would fetch from storage.
-        fake_bytes = b"stub"
+    # If an application exhausts its retries the chord body never runs, so
+    # its errback finalizes the batch instead.
+    callback = finalize_batch.si(str(batch_id))
+    callback.link_error(finalize_batch.si(str(batch_id)))
+    chord(process_kyc.si(str(app_id)) for app_id in application_ids)(callback)
 
-        for doc in documents:
-            ocr = call_ocr_service(
-                str(application.id),
-                doc.doc_type,
-                fake_bytes,
-                meta={"doc_type": doc.doc_type},
-            )
-            doc.ocr_json = ocr.get("ocr_json")
-            doc.doc_confidence = ocr.get("doc_confidence", 0.8)
-            doc.doc_hash = ocr.get("doc_hash", doc.doc_hash)
-            session.add(doc)
-
-        facematch = call_facematch_service(
-            str(application.id),
-            fake_bytes,
-            fake_bytes,
+
+@celery_app.task
+def maintain_audit_partitions() -> None:
+    """Create upcoming audit partitions and archive expired ones (celery beat)."""
+
+    run_async(_maintain_audit_partitions())
+
+
+async def _maintain_audit_partitions() -> None:
+    with track("task", "maintain_audit_partitions"):
+        await audit_partitions.ensure_partitions(
+            db.engine, months_ahead=settings.audit_partition_months_ahead
         )
-        face_record = application.face_match or FaceMatch(application_id=application.id)
-        face_record.similarity_score = facematch.get("similarity", 0.8)
-        face_record.liveness_result = facematch.get("liveness_result", "UNKNOWN")
-        face_record.embedding_hash = facematch.get("embedding_hash")
-        session.add(face_record)
-
-        doc_confidences = [doc.doc_confidence or 0 for doc in documents]
-        features = {
-            "doc_confidence": mean(doc_confidences) if doc_confidences else 0,
-            "face_similarity": face_record.similarity_score or 0,
-            "sanctions_hit": 0,
-            "geo_variance": 0,
-            "device_trust_score": 0.7,
-        }
-        risk_response = call_risk_service(
-            str(application.id),
-            features,
-            meta={"actor": "orchestrator"},
+        await audit_partitions.archive_expired_partitions(
+            db.engine,
+            retention_months=settings.audit_retention_months,
+            archive_dir=settings.audit_archive_dir,
         )
-        application.risk_score = risk_response.get("risk_score")
-        application.drpa_level = risk_response.get("drpa_level")
-        threshold = settings.risk_approve_threshold
-        if application.risk_score is not None and application.risk_score < threshold:
-            application.status = KYCStatus.APPROVED.value
-        else:
-            application.status = KYCStatus.FLAGGED.value
-        session.add(application)
-        await session.commit()
+    metrics.AUDIT_MAINTENANCE_LAST_SUCCESS.set_to_current_time()
 
-        await create_audit_log(
-            session,
-            application_id=application.id,
-            actor="orchestrator",
-            action="risk_scored",
-            payload={
-                "features": features,
-                "risk_response": risk_response,
-            },
-        )
 
-        # Publish minimal event
-        try:
-            redis_client = Redis.from_url(settings.redis_url)
-            redis_client.publish(
-                "risk_scored",
-                json.dumps(
-                    {
-                        "application_id": str(application.id),
-                        "risk_score": application.risk_score,
-                    }
-                ),
+@celery_app.task
+def reconcile_application_counters() -> None:
+    """Correct drift in the dashboard counters (celery beat)."""
+
+    run_async(_reconcile_application_counters())
+
+
+async def _reconcile_application_counters() -> None:
+    with track("task", "reconcile_application_counters"):
+        async with SessionLocal() as session:
+            await queue_stats.reconcile_counters(session)
+
+
+@celery_app.task
+def sweep_stuck_applications() -> int:
+    """Re-enqueue applications stuck in PROCESSING (celery beat)."""
+
+    return run_async(_sweep_stuck_applications())
+
+
+async def _sweep_stuck_applications() -> int:
+    with track("task", "sweep_stuck_applications"):
+        now = datetime.utcnow()
+        rescued = 0
+        async with SessionLocal() as session:
+            while rescued < settings.sweeper_max_per_run:
+                limit = min(settings.sweeper_batch_size, settings.sweeper_max_per_run - rescued)
+                batch = await sweeper.claim_stuck(session, now, limit=limit)
+                for application_id in batch:
+                    process_kyc.delay(str(application_id))
+                rescued += len(batch)
+                metrics.STUCK_APPLICATIONS_RESCUED.inc(len(batch))
+                if len(batch) < limit:
+                    break
+            abandoned = await sweeper.count_abandoned(session, now)
+    metrics.STUCK_APPLICATIONS_ABANDONED.set(abandoned)
+    if rescued:
+        logger.warning("Re-enqueued %s applications stuck in PROCESSING", rescued)
+    if abandoned:
+        logger.error("%s applications stuck in PROCESSING after all rescues", abandoned)
+    return rescued
+
+
+@celery_app.task
+def purge_expired_uploads() -> None:
+    """Delete abandoned resumable uploads (celery beat)."""
+
+    run_async(_purge_expired_uploads())
+
+
+async def _purge_expired_uploads() -> None:
+    with track("task", "purge_expired_uploads"):
+        async with SessionLocal() as session:
+            purged = await resumable_uploads.purge_expired(session)
+    if purged:
+        logger.info("Purged %s expired uploads", purged)
+
+
+@celery_app.task(ignore_result=True)
+def prefetch_review_derivatives(application_ids: list[str]) -> None:
+    """Generate viewer thumbnails and previews for freshly claimed cases."""
+
+    run_async(_prefetch_review_derivatives([UUID(app_id) for app_id in application_ids]))
+
+
+async def _prefetch_review_derivatives(application_ids: list[UUID]) -> None:
+    with track("task", "prefetch_review_derivatives"):
+        async with SessionLocal() as session:
+            generated = await derivatives.prefetch(session, application_ids)
+    logger.info("Prefetched %s derivatives for %s cases", generated, len(application_ids))
+
+
+@task_retry.connect
+def _count_task_retry(sender=None, reason=None, **_: object) -> None:
+    """Count retries per task and failing stage."""
+
+    metrics.TASK_RETRIES.labels(
+        getattr(sender, "name", "unknown"), getattr(reason, "stage", "unknown")
+    ).inc()
+
+
+@celeryd_init.connect
+def _start_metrics_exporter(**_: object) -> None:
+    """Serve worker metrics on ``WORKER_METRICS_PORT``.
+
+    With ``PROMETHEUS_MULTIPROC_DIR`` set the exporter aggregates all prefork
+    children; otherwise it only sees its own process (solo/threads pools).
+    """
+
+    if settings.worker_metrics_port <= 0:
+        return
+    queue_depths = metrics.redis_queue_depths(
+        settings.celery_broker_url, [celery_app.conf.task_default_queue]
+    )
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        registry.register(metrics.RuntimeCollector(queue_depths=queue_depths))
+    else:
+        registry = REGISTRY
+        registry.register(
+            metrics.RuntimeCollector(
+                queue_depths=queue_depths,
+                pool_stats=metrics.engine_pool_stats(lambda: db.engine),
             )
-        except Exception as exc:  # pragma: no cover
-            logger.warning("Failed to publish Redis event: %s", exc)
+        )
+    start_http_server(settings.worker_metrics_port, registry=registry)
+    logger.info("Worker metrics exporter listening on %s", settings.worker_metrics_port)
+
+
+@worker_process_shutdown.connect
+def _mark_metrics_process_dead(pid=None, **_: object) -> None:
+    """Drop a finished child's live gauges from the multiprocess store."""
+
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        multiprocess.mark_process_dead(pid or os.getpid())
+
+
+@worker_process_shutdown.connect
+def _stop_image_pool(**_: object) -> None:
+    """Stop the child's image processing pool with it."""
+
+    image_normalizer.shutdown_executor()
+
+
+@worker_process_shutdown.connect
+def _flush_events(**_: object) -> None:
+    """Send the child's buffered events before it exits."""
 
+    events.shutdown_publisher()
@@ -0,0 +1,52 @@
+"""Compare two load-test reports written by ``load_test.py``::
+
+    python -m benchmarks.compare benchmarks/results/load-abc123-*.json \\
+        benchmarks/results/load-def456-*.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+from pathlib import Path
+from typing import Any
+
+
+def _rows(report: dict[str, Any]) -> dict[str, dict[str, Any]]:
+    """Flatten a report into ``name -> stats`` rows."""
+
+    rows = dict(report.get("endpoints", {}))
+    if "time_to_decision" in report:
+        rows["time to decision"] = report["time_to_decision"]
+    return rows
+
+
+def _delta(old: float | None, new: float | None) -> str:
+    if old in (None, 0) or new is None:
+        return "n/a"
+    return f"{(new - old) / old * 100:+.1f}%"
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Compare two benchmark reports")
+    parser.add_argument("baseline", type=Path)
+    parser.add_argument("candidate", type=Path)
+    args = parser.parse_args(argv)
+
+    baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+    candidate = json.loads(args.candidate.read_text(encoding="utf-8"))
+    print(f"baseline  {baseline.get('commit')}  candidate  {candidate.get('commit')}")
+    if "rps" in baseline:
+        old_rps, new_rps = baseline["rps"], candidate.get("rps")
+        print(f"rps: {old_rps} -> {new_rps} ({_delta(old_rps, new_rps)})")
+
+    old_rows, new_rows = _rows(baseline), _rows(candidate)
+    print(f"{'name':<40} {'p50':>10} {'p95':>10} {'p99':>10}")
+    for name in sorted(old_rows.keys() | new_rows.keys()):
+        old, new = old_rows.get(name, {}), new_rows.get(name, {})
+        cells = [_delta(old.get(key), new.get(key)) for key in ("p50_ms", "p95_ms", "p99_ms")]
+        print(f"{name:<40} {cells[0]:>10} {cells[1]:>10} {cells[2]:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""Face index benchmark: brute force against IVF on synthetic embeddings.
+
+Generates clustered unit vectors (identities spread around many centres,
+like faces of similar appearance), plants noisy re-submissions of known
+faces as queries and times both index kinds::
+
+    python -m benchmarks.face_index_bench --faces 1000000 --queries 500
+
+Reports build time, resident memory growth, per-search latency in
+milliseconds, the duplicate hit rate and the IVF recall@k against brute
+force for each ``nprobe``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import resource
+import time
+from datetime import datetime, timezone
+from typing import Any
+
+import numpy as np
+
+from app.services.face_index import BruteForceIndex, IVFIndex, to_embedding
+
+from .load_test import RESULTS_DIR, _git_commit, percentile
+
+
+def make_faces(count: int, dim: int, seed: int) -> np.ndarray:
+    """``count`` unit vectors around ``sqrt(count)`` cluster centres."""
+
+    rng = np.random.default_rng(seed)
+    centres = rng.standard_normal((max(16, int(np.sqrt(count))), dim)).astype(np.float32)
+    faces = np.empty((count, dim), dtype=np.float32)
+    for start in range(0, count, 65_536):
+        size = min(65_536, count - start)
+        chunk = centres[rng.integers(len(centres), size=size)]
+        chunk += 0.8 * rng.standard_normal((size, dim)).astype(np.float32)
+        faces[start : start + size] = chunk / np.linalg.norm(chunk, axis=1, keepdims=True)
+    return faces
+
+
+def _max_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _time_searches(search, queries: np.ndarray, targets: np.ndarray, k: int) -> tuple[dict, list]:
+    latencies, results = [], []
+    for query in queries:
+        started = time.perf_counter()
+        results.append(search(query, k))
+        latencies.append(time.perf_counter() - started)
+
+    def _ms(value: float | None) -> float | None:
+        return round(value * 1000, 3) if value is not None else None
+
+    found = sum(bool(hits) and hits[0][0] == target for hits, target in zip(results, targets))
+    return {
+        "p50_ms": _ms(percentile(latencies, 50)),
+        "p95_ms": _ms(percentile(latencies, 95)),
+        "p99_ms": _ms(percentile(latencies, 99)),
+        "searches_per_second": round(len(queries) / sum(latencies)),
+        "duplicate_hit_rate": round(found / len(queries), 4),
+    }, results
+
+
+def run(args: argparse.Namespace) -> dict[str, Any]:
+    report: dict[str, Any] = {
+        "commit": _git_commit(),
+        "started_at": datetime.now(timezone.utc).isoformat(),
+        "faces": args.faces,
+        "dim": args.dim,
+        "k": args.k,
+    }
+    rss_before = _max_rss_mb()
+    faces = make_faces(args.faces, args.dim, args.seed)
+    rng = np.random.default_rng(args.seed + 1)
+    targets = rng.choice(args.faces, args.queries, replace=False)
+    noise = 0.03 * rng.standard_normal((args.queries, args.dim)).astype(np.float32)
+    queries = np.array([to_embedding(v) for v in faces[targets] + noise])
+
+    started = time.perf_counter()
+    brute = BruteForceIndex(args.dim, faces)
+    report["brute_force"] = {"build_seconds": round(time.perf_counter() - started, 2)}
+    stats, exact = _time_searches(brute.search, queries, targets, args.k)
+    report["brute_force"].update(stats)
+
+    n_lists = args.lists or int(np.clip(np.sqrt(args.faces), 16, 4096))
+    started = time.perf_counter()
+    ivf = IVFIndex(args.dim, faces, n_lists=n_lists, seed=args.seed)
+    report["ivf"] = {"n_lists": n_lists, "build_seconds": round(time.perf_counter() - started, 2)}
+    for nprobe in args.nprobe:
+        stats, approx = _time_searches(
+            lambda q, k: ivf.search(q, k, nprobe=nprobe), queries, targets, args.k
+        )
+        recall = np.mean(
+            [
+                len({row for row, _ in a} & {row for row, _ in e}) / len(e)
+                for a, e in zip(approx, exact)
+            ]
+        )
+        report["ivf"][f"nprobe_{nprobe}"] = {**stats, "recall_at_k": round(float(recall), 4)}
+    report["rss_growth_mb"] = round(_max_rss_mb() - rss_before, 1)
+    return report
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--faces", type=int, default=1_000_000)
+    parser.add_argument("--dim", type=int, default=512)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--lists", type=int, default=0, help="IVF lists (default sqrt(faces))")
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[4, 8, 16, 32])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    report = run(args)
+    output = RESULTS_DIR / f"face-index-{report['commit']}-{args.faces}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"{args.faces} x {args.dim}-d faces, +{report['rss_growth_mb']} MB")
+    print("brute_force", report["brute_force"])
+    for label, stats in report["ivf"].items():
+        print("ivf", label, stats)
+    print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""Local stand-ins for the OCR, FaceMatch, Risk, Storage and Audit services.
+
+All five APIs are served by one app so the orchestrator's service URLs can
+point at the same host. Latency and failures are drawn per request from the
+profile in ``FAKE_SERVICE_PROFILE`` (JSON), e.g.::
+
+    {"ocr": {"latency_ms": 400, "sigma": 0.5, "error_rate": 0.02},
+     "default": {"latency_ms": 20}}
+
+``latency_ms`` is the median of a log-normal distribution with shape
+``sigma``; ``error_rate`` is the share of requests answered with
+``error_status`` (503 by default, which the orchestrator retries).
+
+Run with ``uvicorn benchmarks.fake_services:app --port 8090``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import os
+import random
+import uuid
+from dataclasses import dataclass
+from typing import Any
+
+from fastapi import FastAPI, File, HTTPException, Response, UploadFile
+
+
+@dataclass
+class ServiceProfile:
+    """Latency and error distribution for one fake service."""
+
+    latency_ms: float = 20.0
+    sigma: float = 0.3
+    error_rate: float = 0.0
+    error_status: int = 503
+
+
+def _load_profiles() -> dict[str, ServiceProfile]:
+    """Parse ``FAKE_SERVICE_PROFILE`` into per-service profiles."""
+
+    raw = json.loads(os.environ.get("FAKE_SERVICE_PROFILE", "{}"))
+    default = ServiceProfile(**raw.get("default", {}))
+    profiles = {"default": default}
+    for name in ("ocr", "facematch", "risk", "storage", "audit"):
+        profiles[name] = ServiceProfile(**{**default.__dict__, **raw.get(name, {})})
+    return profiles
+
+
+PROFILES = _load_profiles()
+app = FastAPI(title="TrustLock fake downstream services")
+# Uploaded objects by storage path, so the pipeline can download them again.
+OBJECTS: dict[str, bytes] = {}
+
+
+async def _simulate(service: str) -> None:
+    """Sleep for a sampled latency and occasionally fail."""
+
+    profile = PROFILES[service]
+    delay = random.lognormvariate(0, profile.sigma) * profile.latency_ms / 1000
+    await asyncio.sleep(delay)
+    if random.random() < profile.error_rate:
+        raise HTTPException(status_code=profile.error_status, detail=f"fake {service} error")
+
+
+@app.post("/store/upload")
+async def store_upload(file: UploadFile = File(...)) -> dict[str, Any]:
+    data = await file.read()
+    await _simulate("storage")
+    digest = hashlib.sha256(data).hexdigest()
+    storage_path = f"fake://objects/{digest[:16]}_{file.filename}"
+    OBJECTS[storage_path] = data
+    return {
+        "storage_path": storage_path,
+        "hash": f"sha256:{digest}",
+        "size": len(data),
+    }
+
+
+@app.get("/store/download")
+async def store_download(path: str) -> Response:
+    await _simulate("storage")
+    if path not in OBJECTS:
+        raise HTTPException(status_code=404, detail="object not found")
+    return Response(OBJECTS[path], media_type="application/octet-stream")
+
+
+@app.post("/infer/document")
+async def infer_document(payload: dict[str, Any]) -> dict[str, Any]:
+    await _simulate("ocr")
+    return {
+        "application_id": payload.get("application_id"),
+        "document_type": payload.get("document_type"),
+        "ocr_json": {"name": "Bench User", "document_number": uuid.uuid4().hex[:10]},
+        "doc_confidence": round(random.uniform(0.6, 0.99), 3),
+        "doc_hash": f"sha256:{uuid.uuid4().hex}",
+    }
+
+
+@app.post("/face/match")
+async def face_match(payload: dict[str, Any]) -> dict[str, Any]:
+    await _simulate("facematch")
+    return {
+        "application_id": payload.get("application_id"),
+        "similarity": round(random.uniform(0.5, 0.99), 3),
+        "liveness_result": "PASS",
+        "embedding_hash": f"sha256:{uuid.uuid4().hex}",
+    }
+
+
+@app.post("/score")
+async def score(payload: dict[str, Any]) -> dict[str, Any]:
+    await _simulate("risk")
+    risk_score = random.randint(0, 100)
+    return {
+        "application_id": payload.get("application_id"),
+        "risk_score": risk_score,
+        "drpa_level": "LOW" if risk_score < 40 else "MEDIUM" if risk_score < 70 else "HIGH",
+        "explanations": [],
+        "audit_id": f"audit_{uuid.uuid4().hex[:12]}",
+    }
+
+
+@app.post("/audit/append")
+async def audit_append(payload: dict[str, Any]) -> dict[str, Any]:
+    await _simulate("audit")
+    return {
+        "audit_id": f"audit_{uuid.uuid4().hex[:12]}",
+        "log_hash": hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest(),
+    }
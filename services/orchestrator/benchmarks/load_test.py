@@ -0,0 +1,335 @@
+"""End-to-end load test for the orchestrator API and Celery pipeline.
+
+Each virtual user drives register -> start -> upload -> poll status ->
+result for a series of applications, so every run also exercises the
+worker. Per-endpoint latency percentiles, throughput and the time from
+upload to decision are written as JSON for comparison across commits
+(see ``benchmarks/compare.py``).
+
+Against a running stack::
+
+    python -m benchmarks.load_test --users 20 --applications 200
+
+Or let the script start the fake downstream services, the API and a worker
+(Postgres and Redis from ``DATABASE_URL``/``REDIS_URL`` must be up and
+migrated)::
+
+    python -m benchmarks.load_test --spawn --users 20 --applications 200 \\
+        --profile '{"ocr": {"latency_ms": 300, "error_rate": 0.02}}'
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import subprocess
+import sys
+import time
+import uuid
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Iterator
+
+import httpx
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+DEMO_DIR = ROOT_DIR / "demo_files"
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+TERMINAL_STATUSES = {"APPROVED", "FLAGGED", "REJECTED"}
+
+
+def percentile(values: list[float], pct: float) -> float | None:
+    """Nearest-rank percentile of ``values`` (``pct`` in 0..100)."""
+
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+def summarize(values: list[float]) -> dict[str, Any]:
+    """Return count and latency percentiles in milliseconds."""
+
+    def _ms(value: float | None) -> float | None:
+        return round(value * 1000, 2) if value is not None else None
+
+    return {
+        "count": len(values),
+        "mean_ms": _ms(sum(values) / len(values)) if values else None,
+        "p50_ms": _ms(percentile(values, 50)),
+        "p95_ms": _ms(percentile(values, 95)),
+        "p99_ms": _ms(percentile(values, 99)),
+        "max_ms": _ms(max(values)) if values else None,
+    }
+
+
+class Recorder:
+    """Collect per-endpoint latencies, errors and decision times."""
+
+    def __init__(self) -> None:
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.errors: Counter[str] = Counter()
+        self.time_to_decision: list[float] = []
+        self.decisions: Counter[str] = Counter()
+        self.timeouts = 0
+
+    async def call(
+        self,
+        client: httpx.AsyncClient,
+        endpoint: str,
+        method: str,
+        url: str,
+        **kwargs: Any,
+    ) -> httpx.Response | None:
+        started = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+        except httpx.HTTPError:
+            self.errors[endpoint] += 1
+            return None
+        self.latencies[endpoint].append(time.perf_counter() - started)
+        if response.status_code >= 400:
+            self.errors[endpoint] += 1
+        return response
+
+
+async def _run_application(
+    client: httpx.AsyncClient,
+    recorder: Recorder,
+    *,
+    run_id: str,
+    index: int,
+    files: dict[str, bytes],
+    poll_interval: float,
+    decision_timeout: float,
+) -> None:
+    """Drive one application through the full lifecycle."""
+
+    email = f"bench-{run_id}-{index}@example.com"
+    resp = await recorder.call(
+        client,
+        "POST /auth/register",
+        "POST",
+        "/auth/register",
+        json={"email": email, "password": "benchmark-pass"},
+    )
+    if resp is None or resp.status_code != 201:
+        return
+    headers = {"Authorization": f"Bearer {resp.json()['access_token']}"}
+
+    resp = await recorder.call(
+        client, "POST /kyc/start", "POST", "/kyc/start", json={"method": "doc"}, headers=headers
+    )
+    if resp is None or resp.status_code != 201:
+        return
+    app_id = resp.json()["application_id"]
+
+    uploaded_at = time.perf_counter()
+    resp = await recorder.call(
+        client,
+        "POST /kyc/upload",
+        "POST",
+        "/kyc/upload",
+        headers=headers,
+        data={"application_id": app_id},
+        files={
+            "id_front": ("id_front.jpg", files["id_front"], "image/jpeg"),
+            "selfie": ("selfie.jpg", files["selfie"], "image/jpeg"),
+        },
+    )
+    if resp is None or resp.status_code != 200:
+        return
+
+    status = None
+    while time.perf_counter() - uploaded_at < decision_timeout:
+        resp = await recorder.call(
+            client,
+            "GET /kyc/status/{application_id}",
+            "GET",
+            f"/kyc/status/{app_id}",
+            headers=headers,
+        )
+        status = resp.json().get("status") if resp is not None and resp.status_code == 200 else None
+        if status in TERMINAL_STATUSES:
+            break
+        await asyncio.sleep(poll_interval)
+    else:
+        recorder.timeouts += 1
+        return
+
+    recorder.time_to_decision.append(time.perf_counter() - uploaded_at)
+    recorder.decisions[status] += 1
+    await recorder.call(
+        client,
+        "GET /kyc/result/{application_id}",
+        "GET",
+        f"/kyc/result/{app_id}",
+        headers=headers,
+    )
+
+
+async def run_load(args: argparse.Namespace) -> dict[str, Any]:
+    """Run the configured number of applications across virtual users."""
+
+    files = {
+        "id_front": (DEMO_DIR / "id_front.jpg").read_bytes(),
+        "selfie": (DEMO_DIR / "selfie.jpg").read_bytes(),
+    }
+    recorder = Recorder()
+    run_id = uuid.uuid4().hex[:8]
+    queue: asyncio.Queue[int] = asyncio.Queue()
+    for index in range(args.applications):
+        queue.put_nowait(index)
+
+    limits = httpx.Limits(max_connections=args.users, max_keepalive_connections=args.users)
+    async with httpx.AsyncClient(base_url=args.api_url, timeout=60, limits=limits) as client:
+
+        async def _user() -> None:
+            while not queue.empty():
+                index = queue.get_nowait()
+                await _run_application(
+                    client,
+                    recorder,
+                    run_id=run_id,
+                    index=index,
+                    files=files,
+                    poll_interval=args.poll_interval,
+                    decision_timeout=args.decision_timeout,
+                )
+
+        started = time.perf_counter()
+        await asyncio.gather(*(_user() for _ in range(args.users)))
+        wall = time.perf_counter() - started
+
+    total_requests = sum(len(values) for values in recorder.latencies.values())
+    return {
+        "run_id": run_id,
+        "commit": _git_commit(),
+        "started_at": datetime.now(timezone.utc).isoformat(),
+        "config": {
+            "users": args.users,
+            "applications": args.applications,
+            "poll_interval": args.poll_interval,
+            "profile": json.loads(args.profile) if args.profile else None,
+        },
+        "wall_seconds": round(wall, 3),
+        "requests": total_requests,
+        "rps": round(total_requests / wall, 2) if wall else None,
+        "applications_per_second": round(len(recorder.time_to_decision) / wall, 3)
+        if wall
+        else None,
+        "endpoints": {
+            endpoint: {**summarize(values), "errors": recorder.errors[endpoint]}
+            for endpoint, values in sorted(recorder.latencies.items())
+        },
+        "time_to_decision": summarize(recorder.time_to_decision),
+        "decisions": dict(recorder.decisions),
+        "decision_timeouts": recorder.timeouts,
+    }
+
+
+def _git_commit() -> str:
+    """Return the short commit hash of the working tree, if available."""
+
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def _wait_for(url: str, timeout: float = 30) -> None:
+    """Poll ``url`` until it answers or ``timeout`` elapses."""
+
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            httpx.get(url, timeout=1)
+            return
+        except httpx.HTTPError:
+            time.sleep(0.25)
+    raise RuntimeError(f"Timed out waiting for {url}")
+
+
+@contextmanager
+def spawn_stack(args: argparse.Namespace) -> Iterator[None]:
+    """Start fake services, the API and a Celery worker for the run."""
+
+    fake_url = f"http://127.0.0.1:{args.fake_port}"
+    env = {
+        **os.environ,
+        "USE_STUBS": "false",
+        "FAKE_SERVICE_PROFILE": args.profile or "{}",
+        "SERVICE_URLS": json.dumps(
+            {
+                "OCR_SERVICE_URL": fake_url,
+                "FACEMATCH_SERVICE_URL": fake_url,
+                "RISK_SERVICE_URL": fake_url,
+                "STORAGE_SERVICE_URL": fake_url,
+                "AUDIT_SERVICE_URL": fake_url,
+            }
+        ),
+    }
+    commands = [
+        [sys.executable, "-m", "uvicorn", "benchmarks.fake_services:app",
+         "--port", str(args.fake_port), "--log-level", "warning"],
+        [sys.executable, "-m", "uvicorn", "app.main:app",
+         "--port", str(args.api_port), "--workers", str(args.api_workers),
+         "--log-level", "warning"],
+        [sys.executable, "-m", "celery", "-A", "app.workers.tasks.celery_app", "worker",
+         "--concurrency", str(args.worker_concurrency), "--loglevel", "warning"],
+    ]
+    processes = [subprocess.Popen(command, cwd=ROOT_DIR, env=env) for command in commands]
+    try:
+        _wait_for(f"{fake_url}/docs")
+        _wait_for(f"http://127.0.0.1:{args.api_port}/health")
+        yield
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--api-url", default=None, help="defaults to the spawned API")
+    parser.add_argument("--users", type=int, default=10, help="concurrent virtual users")
+    parser.add_argument("--applications", type=int, default=100)
+    parser.add_argument("--poll-interval", type=float, default=0.5)
+    parser.add_argument("--decision-timeout", type=float, default=120)
+    parser.add_argument("--spawn", action="store_true", help="start fakes, API and worker")
+    parser.add_argument("--fake-port", type=int, default=8090)
+    parser.add_argument("--api-port", type=int, default=8000)
+    parser.add_argument("--api-workers", type=int, default=1)
+    parser.add_argument("--worker-concurrency", type=int, default=4)
+    parser.add_argument("--profile", default=None, help="FAKE_SERVICE_PROFILE JSON")
+    parser.add_argument("--output", type=Path, default=None)
+    args = parser.parse_args(argv)
+    args.api_url = args.api_url or f"http://127.0.0.1:{args.api_port}"
+
+    if args.spawn:
+        with spawn_stack(args):
+            report = asyncio.run(run_load(args))
+    else:
+        report = asyncio.run(run_load(args))
+
+    output = args.output or RESULTS_DIR / f"load-{report['commit']}-{report['run_id']}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(json.dumps({k: report[k] for k in ("rps", "time_to_decision", "decision_timeouts")}))
+    print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,263 @@
+"""Microbenchmarks for per-request CPU hot paths."""
+
+from __future__ import annotations
+
+import json
+import uuid
+from datetime import datetime, timedelta
+
+import orjson
+import pytest
+from jose import jwt
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.auth import create_access_token
+from app.config import settings
+from app.models import AuditLog, Base, Document, KYCApplication, PipelineStage, User
+from app.schemas import AuditLogResponse, ReviewQueueItem
+from app.services.orchestrator_service import get_application_or_404
+from app.workers.pipeline import PipelineContext, _stage_features
+
+from .conftest import BACKEND_URLS
+
+RISK_PAYLOAD = {
+    "features": {
+        "doc_confidence": 0.87,
+        "face_similarity": 0.91,
+        "sanctions_hit": 0,
+        "geo_variance": 0,
+        "device_trust_score": 0.7,
+    },
+    "risk_response": {
+        "risk_score": 42,
+        "drpa_level": "LOW",
+        "explanations": [
+            {"factor": f"factor_{i}", "weight": 10, "contribution": 1.5 * i} for i in range(8)
+        ],
+        "audit_id": "audit_bench",
+    },
+}
+
+
+def _run_sync(coro):
+    """Drive a coroutine that never suspends without an event loop."""
+
+    try:
+        coro.send(None)
+    except StopIteration as stop:
+        return stop.value
+    raise RuntimeError("coroutine suspended")
+
+
+def _audit_rows(count: int) -> list[AuditLog]:
+    now = datetime.utcnow()
+    return [
+        AuditLog(
+            application_id=uuid.uuid4(),
+            actor="orchestrator",
+            action="risk_scored",
+            payload=RISK_PAYLOAD,
+            log_hash="a" * 64,
+            created_at=now + timedelta(seconds=i),
+        )
+        for i in range(count)
+    ]
+
+
+def bench_review_queue_items(benchmark, check_threshold):
+    """Build 1000 ReviewQueueItem models (the pre-orjson review queue path)."""
+
+    now = datetime.utcnow()
+    rows = [
+        (
+            KYCApplication(
+                id=uuid.uuid4(),
+                user_id=uuid.uuid4(),
+                method="doc",
+                status="FLAGGED",
+                risk_score=i % 100,
+                updated_at=now,
+                version=1,
+            ),
+            User(email=f"user{i}@example.com", password_hash="x"),
+        )
+        for i in range(1000)
+    ]
+
+    def _build() -> list[ReviewQueueItem]:
+        return [
+            ReviewQueueItem(
+                application_id=app.id,
+                user_email=user.email,
+                risk_score=app.risk_score,
+                status=app.status,
+                updated_at=app.updated_at,
+                version=app.version,
+            )
+            for app, user in rows
+        ]
+
+    assert len(benchmark(_build)) == 1000
+    check_threshold()
+
+
+def bench_audit_log_responses(benchmark, check_threshold):
+    """Build and dump 1000 AuditLogResponse models as review_detail does."""
+
+    audits = _audit_rows(1000)
+
+    def _build() -> list[dict]:
+        return [
+            AuditLogResponse(
+                actor=a.actor,
+                action=a.action,
+                payload=a.payload,
+                log_hash=a.log_hash,
+                created_at=a.created_at,
+            ).model_dump()
+            for a in audits
+        ]
+
+    assert len(benchmark(_build)) == 1000
+    check_threshold()
+
+
+def bench_review_queue_rows_orjson(benchmark, check_threshold):
+    """Encode 1000 review queue row dicts with orjson, as /review/queue does."""
+
+    now = datetime.utcnow()
+    rows = [
+        {
+            "application_id": uuid.uuid4(),
+            "user_email": f"user{i}@example.com",
+            "risk_score": i % 100,
+            "status": "FLAGGED",
+            "updated_at": now,
+            "version": 1,
+        }
+        for i in range(1000)
+    ]
+    assert len(benchmark(lambda: [orjson.dumps(row) for row in rows])) == 1000
+    check_threshold()
+
+
+def bench_audit_payload_json(benchmark, check_threshold):
+    """Encode 100 audit append payloads to JSON."""
+
+    payloads = [
+        {
+            "application_id": str(uuid.uuid4()),
+            "actor": "orchestrator",
+            "action": "risk_scored",
+            "payload": RISK_PAYLOAD,
+        }
+        for _ in range(100)
+    ]
+    benchmark(lambda: [json.dumps(p) for p in payloads])
+    check_threshold()
+
+
+def bench_jwt_roundtrip(benchmark, check_threshold):
+    """Issue and decode one access token."""
+
+    subject = uuid.uuid4()
+
+    def _roundtrip() -> dict:
+        token = create_access_token(subject, False)
+        return jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
+
+    assert benchmark(_roundtrip)["sub"] == str(subject)
+    check_threshold()
+
+
+def bench_feature_assembly(benchmark, check_threshold):
+    """Assemble the risk feature dict from stage outputs."""
+
+    stages = {
+        "ocr": PipelineStage(
+            stage="ocr",
+            output={
+                "documents": [
+                    {"doc_type": "id_card", "doc_confidence": 0.91},
+                    {"doc_type": "selfie", "doc_confidence": 0.84},
+                ]
+            },
+        ),
+        "face": PipelineStage(stage="face", output={"similarity_score": 0.88}),
+    }
+    # Without perceptual hashes the near-duplicate check never touches the session.
+    application = KYCApplication(
+        id=uuid.uuid4(),
+        user_id=uuid.uuid4(),
+        method="doc",
+        status="PROCESSING",
+        documents=[Document(doc_type="id_card"), Document(doc_type="selfie")],
+    )
+    ctx = PipelineContext(session=None, application=application, stages=stages)
+    features = benchmark(lambda: _run_sync(_stage_features(ctx)))
+    assert features["face_similarity"] == 0.88
+    check_threshold()
+
+
+async def _seed_application(session_factory, audit_count: int) -> uuid.UUID:
+    async with session_factory() as session:
+        user = User(email=f"hydrate-{uuid.uuid4().hex}@example.com", password_hash="x")
+        session.add(user)
+        await session.flush()
+        application = KYCApplication(user_id=user.id, method="doc", status="FLAGGED")
+        session.add(application)
+        await session.flush()
+        for doc_type in ("id_card", "address_proof", "selfie"):
+            session.add(
+                Document(
+                    application_id=application.id,
+                    doc_type=doc_type,
+                    storage_path=f"s3://bench/{doc_type}.jpg",
+                    doc_hash="sha256:bench",
+                    ocr_json={"name": "Bench User"},
+                    doc_confidence=0.9,
+                )
+            )
+        now = datetime.utcnow()
+        session.add_all(
+            AuditLog(
+                application_id=application.id,
+                actor="orchestrator",
+                action="risk_scored",
+                payload=RISK_PAYLOAD,
+                log_hash="a" * 64,
+                created_at=now + timedelta(milliseconds=i),
+            )
+            for i in range(audit_count)
+        )
+        await session.commit()
+        return application.id
+
+
+@pytest.mark.parametrize("audit_count", [10, 100, 1000])
+@pytest.mark.parametrize("backend", ["sqlite", "postgres"])
+def bench_application_hydration(benchmark, check_threshold, bench_loop, backend, audit_count):
+    """Load an application with documents and audits via get_application_or_404."""
+
+    url = BACKEND_URLS[backend]
+    if not url:
+        pytest.skip("BENCH_POSTGRES_URL not set")
+    engine = create_async_engine(url)
+    session_factory = async_sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
+
+    async def _setup() -> uuid.UUID:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        return await _seed_application(session_factory, audit_count)
+
+    async def _hydrate() -> KYCApplication:
+        async with session_factory() as session:
+            return await get_application_or_404(session, app_id, with_audits=True)
+
+    app_id = bench_loop.run_until_complete(_setup())
+    try:
+        application = benchmark(lambda: bench_loop.run_until_complete(_hydrate()))
+        assert len(application.audits) == audit_count
+    finally:
+        bench_loop.run_until_complete(engine.dispose())
+    check_threshold()
@@ -0,0 +1,57 @@
+"""Fixtures for the hot-path microbenchmarks.
+
+Run from ``services/orchestrator`` with ``pytest benchmarks/micro``. Set
+``BENCH_POSTGRES_URL`` (an asyncpg URL to a scratch database) to include
+Postgres in the ORM hydration benchmarks; otherwise only SQLite runs.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+from collections.abc import Callable, Iterator
+from pathlib import Path
+
+import pytest
+
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///./orchestrator_bench.db")
+os.environ.setdefault("REDIS_URL", "redis://localhost:6379/0")
+os.environ.setdefault("USE_STUBS", "true")
+
+THRESHOLDS: dict[str, float] = json.loads(
+    (Path(__file__).parent / "thresholds.json").read_text(encoding="utf-8")
+)
+BACKEND_URLS = {
+    "sqlite": "sqlite+aiosqlite:///./orchestrator_bench.db",
+    "postgres": os.environ.get("BENCH_POSTGRES_URL"),
+}
+
+
+@pytest.fixture(scope="session")
+def bench_loop() -> Iterator[asyncio.AbstractEventLoop]:
+    """Event loop used to drive async code from synchronous benchmarks."""
+
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+@pytest.fixture
+def check_threshold(request, benchmark) -> Callable[[], None]:
+    """Return a callable failing the benchmark if its mean exceeds the budget.
+
+    Budgets (milliseconds, mean per round) live in ``thresholds.json`` keyed
+    by test node name; ``--benchmark-disable`` skips the check.
+    """
+
+    def _check() -> None:
+        limit = THRESHOLDS.get(request.node.name)
+        if limit is None or benchmark.stats is None:
+            return
+        mean_ms = benchmark.stats.stats.mean * 1000
+        assert mean_ms <= limit, (
+            f"{request.node.name} mean {mean_ms:.3f} ms exceeds threshold {limit} ms"
+        )
+
+    return _check
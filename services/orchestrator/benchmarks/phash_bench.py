@@ -0,0 +1,137 @@
+"""Near-duplicate document lookup benchmark over millions of 64-bit hashes.
+
+Indexes random hashes with planted near-duplicates, then times Hamming
+radius queries through the multi-index tables against a full linear scan::
+
+    python -m benchmarks.phash_bench --hashes 5000000 --queries 2000
+
+Reports build time, memory growth, per-query latency in microseconds for
+each radius, candidates verified per query and whether the results match
+the linear scan. Perceptual hashing itself is timed on a synthetic JPEG.
+"""
+
+from __future__ import annotations
+
+import argparse
+import io
+import json
+import resource
+import time
+from datetime import datetime, timezone
+from typing import Any
+
+import numpy as np
+from PIL import Image
+
+from app.services.document_hashes import HammingIndex, hamming_distances, perceptual_hash
+
+from .load_test import RESULTS_DIR, _git_commit, percentile
+
+
+def _max_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _us(value: float | None) -> float | None:
+    return round(value * 1_000_000, 1) if value is not None else None
+
+
+def make_hashes(count: int, queries: int, seed: int) -> tuple[np.ndarray, np.ndarray]:
+    """Random hashes where each query has a copy 0-10 bits away."""
+
+    rng = np.random.default_rng(seed)
+    hashes = rng.integers(0, 2**63, size=count, dtype=np.int64).astype(np.uint64)
+    hashes ^= rng.integers(0, 2, size=count, dtype=np.uint64) << np.uint64(63)
+    sources = rng.choice(count, queries, replace=False)
+    query_hashes = hashes[sources].copy()
+    for i in range(queries):
+        for bit in rng.choice(64, rng.integers(0, 11), replace=False):
+            query_hashes[i] ^= np.uint64(1) << np.uint64(int(bit))
+    return hashes, query_hashes
+
+
+def _time_radius(index: HammingIndex, queries: np.ndarray, radius: int, verify: int) -> dict:
+    latencies, found = [], 0
+    for query in queries.tolist():
+        started = time.perf_counter()
+        rows, _ = index.search(query, radius)
+        latencies.append(time.perf_counter() - started)
+        found += len(rows)
+    mismatches = 0
+    for query in queries[:verify].tolist():
+        rows, _ = index.search(query, radius)
+        expected = np.flatnonzero(hamming_distances(index.hashes, query) <= radius)
+        mismatches += not np.array_equal(np.sort(rows), expected)
+    return {
+        "p50_us": _us(percentile(latencies, 50)),
+        "p95_us": _us(percentile(latencies, 95)),
+        "p99_us": _us(percentile(latencies, 99)),
+        "queries_per_second": round(len(queries) / sum(latencies)),
+        "matches_per_query": round(found / len(queries), 2),
+        "linear_scan_mismatches": mismatches,
+    }
+
+
+def _time_hashing(repeats: int) -> dict[str, Any]:
+    pixels = np.random.default_rng(0).integers(0, 255, (1200, 1900, 3), dtype=np.uint8)
+    buffer = io.BytesIO()
+    Image.fromarray(pixels).save(buffer, format="JPEG", quality=85)
+    data = buffer.getvalue()
+    latencies = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        perceptual_hash(data)
+        latencies.append(time.perf_counter() - started)
+    return {"image_kb": len(data) // 1024, "p50_ms": round(percentile(latencies, 50) * 1000, 2)}
+
+
+def run(args: argparse.Namespace) -> dict[str, Any]:
+    report: dict[str, Any] = {
+        "commit": _git_commit(),
+        "started_at": datetime.now(timezone.utc).isoformat(),
+        "hashes": args.hashes,
+        "queries": args.queries,
+    }
+    hashes, queries = make_hashes(args.hashes, args.queries, args.seed)
+    rss_before = _max_rss_mb()
+    started = time.perf_counter()
+    index = HammingIndex(hashes)
+    report["build_seconds"] = round(time.perf_counter() - started, 2)
+    report["rss_growth_mb"] = round(_max_rss_mb() - rss_before, 1)
+
+    started = time.perf_counter()
+    for query in queries[: args.verify].tolist():
+        hamming_distances(index.hashes, query)
+    report["linear_scan_ms"] = round((time.perf_counter() - started) / args.verify * 1000, 1)
+    report["radius"] = {
+        str(radius): _time_radius(index, queries, radius, args.verify) for radius in args.radius
+    }
+    report["perceptual_hash"] = _time_hashing(50)
+    return report
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--hashes", type=int, default=5_000_000)
+    parser.add_argument("--queries", type=int, default=2_000)
+    parser.add_argument("--radius", type=int, nargs="+", default=[4, 8, 12])
+    parser.add_argument("--verify", type=int, default=20, help="queries checked by linear scan")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    report = run(args)
+    output = RESULTS_DIR / f"phash-{report['commit']}-{args.hashes}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(
+        f"indexed {args.hashes} hashes in {report['build_seconds']}s, "
+        f"+{report['rss_growth_mb']} MB; linear scan {report['linear_scan_ms']} ms"
+    )
+    for radius, stats in report["radius"].items():
+        print(f"radius {radius}", stats)
+    print("perceptual_hash", report["perceptual_hash"])
+    print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""Sanctions screening benchmark against a large synthetic list.
+
+Writes a list of synthetic multi-token names (plus aliases) to a CSV, builds
+the in-process index from it and screens query mixes: exact list names,
+names with one typo per token, names not on the list, and the exact names
+again once their tokens are in the lookup cache::
+
+    python -m benchmarks.sanctions_bench --entries 1000000 --queries 20000
+
+Reports build time, resident memory growth and per-query latency in
+microseconds for each mix.
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import json
+import random
+import resource
+import string
+import tempfile
+import time
+from datetime import datetime, timezone
+from itertools import accumulate
+from pathlib import Path
+from typing import Any
+
+from app.services.sanctions import SanctionsIndex
+
+from .load_test import RESULTS_DIR, _git_commit, percentile
+
+SYLLABLES = [c + v for c in "bdfghjklmnprstvz" for v in "aeiou"] + ["sh", "an", "el", "or"]
+VOCABULARY_SIZE = 150_000
+# Zipf-like weights with a flattened head: the commonest token is ~1% of all.
+_WEIGHTS = list(accumulate(1 / (rank + 10) for rank in range(VOCABULARY_SIZE)))
+
+
+def _token(rng: random.Random) -> str:
+    return "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))).capitalize()
+
+
+# Like real name lists, a bounded vocabulary with a long tail: a few tokens
+# are very common, most are rare.
+_VOCABULARY = [_token(random.Random(f"token-{i}")) for i in range(VOCABULARY_SIZE)]
+
+
+def _name(rng: random.Random) -> str:
+    return " ".join(
+        rng.choices(_VOCABULARY, cum_weights=_WEIGHTS, k=rng.choice((2, 2, 3, 3, 4)))
+    )
+
+
+def _typo(rng: random.Random, name: str) -> str:
+    tokens = []
+    for token in name.split():
+        if len(token) > 4:
+            i = rng.randrange(1, len(token))
+            token = token[:i] + rng.choice(string.ascii_lowercase) + token[i + 1 :]
+        tokens.append(token)
+    return " ".join(tokens)
+
+
+def write_list(path: Path, entries: int, seed: int) -> list[str]:
+    """Write ``entries`` synthetic rows to ``path``; return their primary names."""
+
+    rng = random.Random(seed)
+    names = []
+    with path.open("w", newline="", encoding="utf-8") as handle:
+        writer = csv.writer(handle)
+        writer.writerow(["id", "name", "aliases"])
+        for i in range(entries):
+            name = _name(rng)
+            alias = _name(rng) if rng.random() < 0.1 else ""
+            writer.writerow([f"SYN-{i}", name, alias])
+            names.append(name)
+    return names
+
+
+def _max_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _time_queries(index: SanctionsIndex, queries: list[str], threshold: float) -> dict[str, Any]:
+    latencies, hits = [], 0
+    for query in queries:
+        started = time.perf_counter()
+        match = index.screen(query, min_score=threshold)
+        latencies.append(time.perf_counter() - started)
+        hits += match is not None
+
+    def _us(value: float | None) -> float | None:
+        return round(value * 1_000_000, 1) if value is not None else None
+
+    total = sum(latencies)
+    return {
+        "count": len(queries),
+        "hit_rate": round(hits / len(queries), 4),
+        "mean_us": _us(total / len(queries)),
+        "p50_us": _us(percentile(latencies, 50)),
+        "p95_us": _us(percentile(latencies, 95)),
+        "p99_us": _us(percentile(latencies, 99)),
+        "screens_per_second": round(len(queries) / total),
+    }
+
+
+def run(args: argparse.Namespace) -> dict[str, Any]:
+    report: dict[str, Any] = {
+        "commit": _git_commit(),
+        "started_at": datetime.now(timezone.utc).isoformat(),
+        "entries": args.entries,
+        "threshold": args.threshold,
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "sanctions.csv"
+        names = write_list(path, args.entries, args.seed)
+        rss_before = _max_rss_mb()
+        started = time.perf_counter()
+        index = SanctionsIndex.from_file(path)
+        report["build_seconds"] = round(time.perf_counter() - started, 2)
+        report["rss_growth_mb"] = round(_max_rss_mb() - rss_before, 1)
+
+    rng = random.Random(args.seed + 1)
+    members = rng.sample(names, min(args.queries, len(names)))
+    workloads = {
+        "exact": members,
+        "typo": [_typo(rng, name) for name in members],
+        "absent": [_name(random.Random(f"absent-{i}")) for i in range(len(members))],
+        "exact_warm": members,
+    }
+    report["screening"] = {
+        label: _time_queries(index, queries, args.threshold)
+        for label, queries in workloads.items()
+    }
+    return report
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entries", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=20_000)
+    parser.add_argument("--threshold", type=float, default=0.85)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    report = run(args)
+    output = RESULTS_DIR / f"sanctions-{report['commit']}-{args.entries}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(
+        f"built {args.entries} entries in {report['build_seconds']}s, "
+        f"+{report['rss_growth_mb']} MB"
+    )
+    for label, stats in report["screening"].items():
+        print(label, {k: stats[k] for k in ("p50_us", "p95_us", "screens_per_second", "hit_rate")})
+    print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+"""Reviewer search benchmark against a large ``documents`` table.
+
+Seeds synthetic applications with OCR output (two documents each) into the
+Postgres database from ``DATABASE_URL`` (migrated to head), then times
+``orchestrator_service.search_documents`` by name and by document number,
+with the ``ix_documents_ocr_*`` expression indexes and, using a transaction
+that drops them and rolls back, without::
+
+    python -m benchmarks.search_bench --documents 1000000 --queries 200
+
+Seeding is skipped when the table already holds enough benchmark rows.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Any
+
+from sqlalchemy import func, insert, select, text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.config import settings
+from app.models import Document, KYCApplication, User
+from app.services.orchestrator_service import search_documents
+
+from .load_test import RESULTS_DIR, _git_commit, summarize
+
+FIRST_NAMES = [f"First{i:02d}" for i in range(50)]
+LAST_NAMES = [f"Last{i:03d}" for i in range(200)]
+SEED_EMAIL = "search-bench@example.com"
+INDEXES = ("ix_documents_ocr_name", "ix_documents_ocr_document_number")
+
+
+def _document_number(index: int) -> str:
+    return f"DL{index:08d}"
+
+
+def _name(index: int) -> str:
+    return f"{FIRST_NAMES[index % len(FIRST_NAMES)]} {LAST_NAMES[index // 7 % len(LAST_NAMES)]}"
+
+
+async def seed(session: AsyncSession, documents: int, batch_size: int) -> int:
+    """Insert benchmark documents until ``documents`` exist; return rows added."""
+
+    existing = await session.scalar(
+        select(func.count()).select_from(Document).where(Document.storage_path.like("bench://%"))
+    )
+    if existing >= documents:
+        return 0
+
+    user_id = await session.scalar(select(User.id).where(User.email == SEED_EMAIL))
+    if user_id is None:
+        user_id = uuid.uuid4()
+        await session.execute(
+            insert(User).values(id=user_id, email=SEED_EMAIL, password_hash="x", is_staff=False)
+        )
+
+    now = datetime.now(timezone.utc)
+    for start in range(existing, documents, batch_size):
+        applications, rows = [], []
+        for index in range(start, min(start + batch_size, documents), 2):
+            app_id = uuid.uuid4()
+            applications.append(
+                {
+                    "id": app_id,
+                    "user_id": user_id,
+                    "method": "doc",
+                    "status": "FLAGGED",
+                    "created_at": now,
+                    "updated_at": now,
+                }
+            )
+            ocr = {"name": _name(index), "document_number": _document_number(index)}
+            for offset, doc_type in enumerate(("id_card", "address_proof")):
+                rows.append(
+                    {
+                        "id": uuid.uuid4(),
+                        "application_id": app_id,
+                        "doc_type": doc_type,
+                        "storage_path": f"bench://{index + offset}",
+                        "doc_hash": "sha256:bench",
+                        "ocr_json": ocr,
+                        "doc_confidence": 0.9,
+                        "created_at": now,
+                        "updated_at": now,
+                    }
+                )
+        await session.execute(insert(KYCApplication), applications)
+        await session.execute(insert(Document), rows)
+        await session.commit()
+        print(f"seeded {start + len(rows)}/{documents} documents", flush=True)
+    await session.execute(text("ANALYZE documents"))
+    await session.commit()
+    return documents - existing
+
+
+async def _time_queries(
+    session: AsyncSession, field: str, values: list[str]
+) -> dict[str, Any]:
+    latencies = []
+    for value in values:
+        started = time.perf_counter()
+        await search_documents(session, **{field: value})
+        latencies.append(time.perf_counter() - started)
+    return summarize(latencies)
+
+
+async def _plan(session: AsyncSession, field: str, value: str) -> list[str]:
+    """Return the scan node types Postgres picks for one search."""
+
+    condition = {
+        "name": "lower((ocr_json ->> 'name')) = :value",
+        "document_number": "(ocr_json ->> 'document_number') = :value",
+    }[field]
+    plan = await session.scalar(
+        text(f"EXPLAIN (FORMAT JSON) SELECT id FROM documents WHERE {condition}"),
+        {"value": value},
+    )
+    plan = json.loads(plan) if isinstance(plan, str) else plan
+    nodes: list[str] = []
+
+    def _walk(node: dict[str, Any]) -> None:
+        index = node.get("Index Name")
+        nodes.append(node["Node Type"] + (f" on {index}" if index else ""))
+        for child in node.get("Plans", []):
+            _walk(child)
+
+    _walk(plan[0]["Plan"])
+    return nodes
+
+
+async def run(args: argparse.Namespace) -> dict[str, Any]:
+    engine = create_async_engine(args.database_url)
+    report: dict[str, Any] = {
+        "commit": _git_commit(),
+        "started_at": datetime.now(timezone.utc).isoformat(),
+        "documents": args.documents,
+        "queries": args.queries,
+    }
+    try:
+        async with AsyncSession(engine, expire_on_commit=False) as session:
+            report["seeded"] = await seed(session, args.documents, args.batch_size)
+
+        rng = random.Random(args.seed)
+        samples = [rng.randrange(args.documents) for _ in range(args.queries)]
+        workloads = {
+            "name": [_name(i).lower() for i in samples],
+            "document_number": [_document_number(i - i % 2) for i in samples],
+        }
+        for label, drop in (("indexed", False), ("unindexed", True)):
+            async with AsyncSession(engine) as session:
+                if drop:
+                    for index in INDEXES:
+                        await session.execute(text(f"DROP INDEX IF EXISTS {index}"))
+                report[label] = {
+                    field: {
+                        **await _time_queries(session, field, values),
+                        "plan": await _plan(session, field, values[0]),
+                    }
+                    for field, values in workloads.items()
+                }
+                await session.rollback()
+    finally:
+        await engine.dispose()
+    return report
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", default=settings.database_url)
+    parser.add_argument("--documents", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=0, help="random seed for query sampling")
+    args = parser.parse_args(argv)
+
+    report = asyncio.run(run(args))
+    output = RESULTS_DIR / f"search-{report['commit']}-{args.documents}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    for label in ("indexed", "unindexed"):
+        print(label, {field: stats["p50_ms"] for field, stats in report[label].items()})
+    print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+"""Insert benchmark for UUIDv4 versus UUIDv7 primary keys.
+
+Loads the same number of rows into two scratch tables, shaped like
+``audit_logs`` (uuid primary key, timestamp, ~200 byte payload), in the
+Postgres database from ``DATABASE_URL``. One table gets ``uuid.uuid4``
+keys and the other ``app.ids.uuid7`` keys. After every ``--report-every``
+rows it records, per table:
+
+* insert throughput over the interval;
+* primary key index size;
+* index blocks read from outside shared buffers (cache misses);
+* WAL written, which grows with page splits and full-page images.
+
+Then it times keyset pagination over the primary key::
+
+    python -m benchmarks.uuid_insert_bench --rows 10000000
+
+The tables are dropped at the end unless ``--keep`` is given.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import time
+import uuid
+from collections.abc import Callable
+from datetime import datetime, timezone
+from typing import Any
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, create_async_engine
+
+from app.config import settings
+from app.ids import uuid7
+
+from .load_test import RESULTS_DIR, _git_commit, summarize
+
+GENERATORS: dict[str, Callable[[], uuid.UUID]] = {"uuid4": uuid.uuid4, "uuid7": uuid7}
+PAYLOAD_BYTES = 200
+
+
+def _table(kind: str) -> str:
+    return f"bench_pk_{kind}"
+
+
+async def _create(conn: AsyncConnection, kind: str) -> None:
+    table = _table(kind)
+    await conn.execute(text(f"DROP TABLE IF EXISTS {table}"))
+    await conn.execute(
+        text(
+            f"CREATE TABLE {table} ("
+            "id uuid PRIMARY KEY, created_at timestamptz NOT NULL, payload text NOT NULL)"
+        )
+    )
+
+
+async def _index_stats(conn: AsyncConnection, kind: str) -> tuple[int, int, int]:
+    """Primary key size, its blocks read from disk so far, and the WAL position."""
+
+    row = (
+        await conn.execute(
+            text(
+                "SELECT pg_relation_size(:index), "
+                "coalesce((SELECT idx_blks_read FROM pg_statio_user_indexes "
+                "WHERE indexrelname = :index), 0), "
+                "pg_current_wal_lsn() - '0/0'::pg_lsn"
+            ),
+            {"index": f"{_table(kind)}_pkey"},
+        )
+    ).one()
+    return int(row[0]), int(row[1]), int(row[2])
+
+
+async def load(
+    conn: AsyncConnection, kind: str, rows: int, batch_size: int, report_every: int
+) -> list[dict[str, Any]]:
+    """Insert ``rows`` rows in batches; return one checkpoint per ``report_every``."""
+
+    generate = GENERATORS[kind]
+    statement = text(
+        f"INSERT INTO {_table(kind)} (id, created_at, payload) "
+        "SELECT id, now(), repeat('x', :payload) FROM unnest(CAST(:ids AS uuid[])) AS id"
+    )
+    checkpoints: list[dict[str, Any]] = []
+    _, blocks_read, wal = await _index_stats(conn, kind)
+    interval_started = time.perf_counter()
+    interval_rows = 0
+    for start in range(0, rows, batch_size):
+        ids = [generate() for _ in range(min(batch_size, rows - start))]
+        await conn.execute(statement, {"ids": ids, "payload": PAYLOAD_BYTES})
+        await conn.commit()
+        interval_rows += len(ids)
+        loaded = start + len(ids)
+        if loaded // report_every == start // report_every and loaded != rows:
+            continue
+        elapsed = time.perf_counter() - interval_started
+        size, now_read, now_wal = await _index_stats(conn, kind)
+        checkpoints.append(
+            {
+                "rows": loaded,
+                "rows_per_s": round(interval_rows / elapsed, 1),
+                "index_mb": round(size / 2**20, 1),
+                "index_blocks_read": now_read - blocks_read,
+                "wal_mb": round((now_wal - wal) / 2**20, 1),
+            }
+        )
+        print(kind, checkpoints[-1], flush=True)
+        blocks_read, wal = now_read, now_wal
+        interval_started = time.perf_counter()
+        interval_rows = 0
+    return checkpoints
+
+
+async def keyset_pages(conn: AsyncConnection, kind: str, pages: int, page_size: int) -> dict:
+    """Time ``pages`` consecutive ``WHERE id > :last ORDER BY id`` pages."""
+
+    statement = text(
+        f"SELECT id FROM {_table(kind)} WHERE id > :last ORDER BY id LIMIT :limit"
+    )
+    last = uuid.UUID(int=0)
+    latencies = []
+    for _ in range(pages):
+        started = time.perf_counter()
+        ids = (await conn.execute(statement, {"last": last, "limit": page_size})).scalars().all()
+        latencies.append(time.perf_counter() - started)
+        if not ids:
+            break
+        last = ids[-1]
+    return summarize(latencies)
+
+
+async def run(args: argparse.Namespace) -> dict[str, Any]:
+    engine = create_async_engine(args.database_url)
+    report: dict[str, Any] = {
+        "commit": _git_commit(),
+        "started_at": datetime.now(timezone.utc).isoformat(),
+        "rows": args.rows,
+        "batch_size": args.batch_size,
+    }
+    try:
+        async with engine.connect() as conn:
+            for kind in GENERATORS:
+                await _create(conn, kind)
+                await conn.commit()
+                started = time.perf_counter()
+                checkpoints = await load(
+                    conn, kind, args.rows, args.batch_size, args.report_every
+                )
+                report[kind] = {
+                    "seconds": round(time.perf_counter() - started, 1),
+                    "checkpoints": checkpoints,
+                    "keyset_pages": await keyset_pages(conn, kind, args.pages, args.page_size),
+                }
+                if not args.keep:
+                    await conn.execute(text(f"DROP TABLE {_table(kind)}"))
+                    await conn.commit()
+    finally:
+        await engine.dispose()
+    return report
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", default=settings.database_url)
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    parser.add_argument("--report-every", type=int, default=1_000_000)
+    parser.add_argument("--pages", type=int, default=200, help="keyset pages to time")
+    parser.add_argument("--page-size", type=int, default=1000)
+    parser.add_argument("--keep", action="store_true", help="keep the scratch tables")
+    args = parser.parse_args(argv)
+
+    report = asyncio.run(run(args))
+    output = RESULTS_DIR / f"uuid-insert-{report['commit']}-{args.rows}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    for kind in GENERATORS:
+        final = report[kind]["checkpoints"][-1]
+        print(kind, f"{report[kind]['seconds']} s", final)
+    print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
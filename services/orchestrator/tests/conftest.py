@@ -3,21 +3,33 @@
 from __future__ import annotations
 
 import os
+import tempfile
+import uuid
+from collections.abc import Awaitable, Callable, Iterator
+from contextlib import contextmanager
+
 import pytest
 import pytest_asyncio
 from httpx import AsyncClient
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
 
 os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///./orchestrator_test.db")
 os.environ.setdefault("REDIS_URL", "redis://localhost:6379/0")
 os.environ.setdefault("USE_STUBS", "true")
+os.environ.setdefault("IMAGE_CACHE_DIR", tempfile.mkdtemp(prefix="orchestrator-images-"))
+os.environ.setdefault("UPLOAD_TEMP_DIR", tempfile.mkdtemp(prefix="orchestrator-uploads-"))
+os.environ.setdefault("EVENTS_ENABLED", "false")
 
 from app.main import app  # noqa: E402
-from app.db import get_db  # noqa: E402
-from app.models import Base  # noqa: E402
+from app.db import engine as app_engine, get_db, get_read_db  # noqa: E402
+from app.instrumentation import instrument_engine  # noqa: E402
+from app.auth import get_password_hash  # noqa: E402
+from app.models import Base, User  # noqa: E402
 
 engine = create_async_engine(os.environ["DATABASE_URL"], future=True)
+instrument_engine(engine)
 TestingSessionLocal = sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
 
 
@@ -38,6 +50,7 @@ async def _override_get_db():
 
 
 app.dependency_overrides[get_db] = _override_get_db
+app.dependency_overrides[get_read_db] = _override_get_db
 
 
 @pytest_asyncio.fixture
@@ -48,6 +61,32 @@ async def client() -> AsyncClient:
         yield c
 
 
+@pytest_asyncio.fixture
+async def uploaded_application(
+    client: AsyncClient,
+) -> Callable[..., Awaitable[uuid.UUID]]:
+    """Return a factory creating an application with uploaded documents."""
+
+    async def _create(email: str, id_front: bytes = b"fake") -> uuid.UUID:
+        await client.post("/user/register", json={"email": email, "password": "password123"})
+        login_resp = await client.post(
+            "/auth/login", json={"email": email, "password": "password123"}
+        )
+        headers = {"Authorization": f"Bearer {login_resp.json()['access_token']}"}
+        start_resp = await client.post("/kyc/start", json={"method": "doc"}, headers=headers)
+        app_id = start_resp.json()["application_id"]
+        files = {
+            "application_id": (None, app_id),
+            "id_front": ("id.jpg", id_front, "image/jpeg"),
+            "selfie": ("selfie.jpg", b"fake", "image/jpeg"),
+        }
+        upload_resp = await client.post("/kyc/upload", headers=headers, files=files)
+        assert upload_resp.status_code == 200
+        return uuid.UUID(app_id)
+
+    return _create
+
+
 @pytest_asyncio.fixture
 async def db_session() -> AsyncSession:
     """Direct access to the test database session."""
@@ -55,3 +94,84 @@ async def db_session() -> AsyncSession:
     async with TestingSessionLocal() as session:
         yield session
 
+
+@pytest_asyncio.fixture
+async def staff_login(client: AsyncClient, db_session: AsyncSession):
+    """Factory creating a staff user and returning its authorization headers."""
+
+    async def _create() -> dict[str, str]:
+        email = f"staff-{uuid.uuid4().hex[:8]}@example.com"
+        db_session.add(
+            User(email=email, password_hash=get_password_hash("password123"), is_staff=True)
+        )
+        await db_session.commit()
+        login_resp = await client.post(
+            "/auth/staff/login", json={"email": email, "password": "password123"}
+        )
+        return {"Authorization": f"Bearer {login_resp.json()['access_token']}"}
+
+    return _create
+
+
+@pytest_asyncio.fixture
+async def partner_login(client: AsyncClient, db_session: AsyncSession):
+    """Factory creating a partner user and returning its authorization headers."""
+
+    async def _create(storage_prefix: str = "s3://bucket/") -> dict[str, str]:
+        email = f"partner-{uuid.uuid4().hex[:8]}@example.com"
+        db_session.add(
+            User(
+                email=email,
+                password_hash=get_password_hash("password123"),
+                storage_prefix=storage_prefix,
+            )
+        )
+        await db_session.commit()
+        login_resp = await client.post(
+            "/auth/login", json={"email": email, "password": "password123"}
+        )
+        return {"Authorization": f"Bearer {login_resp.json()['access_token']}"}
+
+    return _create
+
+
+@pytest_asyncio.fixture
+async def staff_headers(staff_login) -> dict[str, str]:
+    """Create a staff user and return its authorization headers."""
+
+    return await staff_login()
+
+
+class QueryCounter:
+    """Record SQL statements executed on the test and application engines."""
+
+    def __init__(self) -> None:
+        self.statements: list[str] = []
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        self.statements.append(statement)
+
+    @contextmanager
+    def budget(self, limit: int, label: str) -> Iterator[None]:
+        """Fail if the wrapped block executes more than ``limit`` statements."""
+
+        start = len(self.statements)
+        yield
+        executed = self.statements[start:]
+        assert len(executed) <= limit, (
+            f"{label} executed {len(executed)} queries (budget {limit}):\n"
+            + "\n".join(executed)
+        )
+
+
+@pytest.fixture
+def query_counter() -> Iterator[QueryCounter]:
+    """Count statements sent by request handlers and worker tasks."""
+
+    counter = QueryCounter()
+    engines = {engine.sync_engine, app_engine.sync_engine}
+    for sync_engine in engines:
+        event.listen(sync_engine, "before_cursor_execute", counter)
+    yield counter
+    for sync_engine in engines:
+        event.remove(sync_engine, "before_cursor_execute", counter)
@@ -0,0 +1,144 @@
+"""Tests for admission control on KYC uploads."""
+
+from __future__ import annotations
+
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import func, select
+
+from app.config import settings
+from app.models import Document, KYCApplication
+from app.services import admission, batch_service
+
+
+@pytest.fixture
+def queue(monkeypatch) -> dict[str, admission.QueueState]:
+    """Serve the queue state stored under ``"state"`` to a fresh controller."""
+
+    states: dict[str, admission.QueueState] = {}
+    monkeypatch.setattr(admission, "_controller", None)
+    monkeypatch.setattr(settings, "admission_probe_interval", 0)
+    monkeypatch.setattr(admission, "read_queue_state", lambda: states["state"])
+    return states
+
+
+def test_decide_by_method():
+    """Branch submissions are admitted at depths that shed self-service ones."""
+
+    # 600 completions in 300 s: 2 per second, 4 s each.
+    state = admission.QueueState(depth=6000, completed=600, busy_seconds=2400, window=300)
+    assert state.estimated_wait() == pytest.approx(6001 / 2 + 4)
+
+    doc = admission.decide(state, "doc")
+    assert not doc.accepted
+    # 1001 applications over the limit drain in about 501 s.
+    assert doc.retry_after == 501
+
+    branch = admission.decide(state, "branch")
+    assert branch.accepted
+    assert branch.estimated_wait == pytest.approx(3004.5)
+
+    slow = admission.QueueState(depth=100, completed=3, busy_seconds=30, window=300)
+    rejected = admission.decide(slow, "ssi")
+    assert not rejected.accepted
+    assert rejected.retry_after == settings.admission_retry_after_max
+
+    idle = admission.QueueState(depth=10, completed=0, busy_seconds=0, window=300)
+    assert admission.decide(idle, "doc") == admission.Admission(accepted=True)
+
+
+@pytest.mark.asyncio
+async def test_upload_rejected_then_admitted(client: AsyncClient, db_session, queue):
+    """A full queue answers 503 before storing anything; later uploads get an estimate."""
+
+    email = "admission@example.com"
+    await client.post("/user/register", json={"email": email, "password": "password123"})
+    login = await client.post("/auth/login", json={"email": email, "password": "password123"})
+    headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+    start = await client.post("/kyc/start", json={"method": "doc"}, headers=headers)
+    app_id = start.json()["application_id"]
+    files = {
+        "application_id": (None, app_id),
+        "id_front": ("id.jpg", b"fake", "image/jpeg"),
+        "selfie": ("selfie.jpg", b"fake", "image/jpeg"),
+    }
+
+    queue["state"] = admission.QueueState(
+        depth=10_000, completed=300, busy_seconds=900, window=300
+    )
+    resp = await client.post("/kyc/upload", headers=headers, files=files)
+    assert resp.status_code == 503
+    assert 30 <= int(resp.headers["retry-after"]) <= settings.admission_retry_after_max
+    application = await db_session.get(KYCApplication, uuid.UUID(app_id))
+    assert application.status == "PENDING"
+    stored = await db_session.scalar(
+        select(func.count()).select_from(Document).where(
+            Document.application_id == application.id
+        )
+    )
+    assert stored == 0
+
+    # 59 queued ahead at 1 per second, plus 3 s of processing.
+    queue["state"] = admission.QueueState(depth=59, completed=300, busy_seconds=900, window=300)
+    before = datetime.now(timezone.utc)
+    resp = await client.post("/kyc/upload", headers=headers, files=files)
+    assert resp.status_code == 200
+    # Serialized with an offset, so browsers do not read it as local time.
+    estimate = datetime.fromisoformat(resp.json()["estimated_completion_at"])
+    assert estimate.utcoffset() is not None
+    assert 62 <= (estimate - before).total_seconds() <= 68
+
+    resp = await client.get(f"/kyc/status/{app_id}", headers=headers)
+    assert resp.json()["status"] == "PROCESSING"
+    assert datetime.fromisoformat(resp.json()["estimated_completion_at"]) == estimate
+
+
+@pytest.mark.asyncio
+async def test_batch_admitted_as_a_whole(
+    client: AsyncClient, db_session, monkeypatch, queue, partner_login
+):
+    """A batch that would push its method over the limit is rejected entirely."""
+
+    monkeypatch.setattr(batch_service, "enqueue_batch", lambda batch_id, ids: None)
+    headers = await partner_login()
+    ref = uuid.uuid4().hex
+    stored = {"storage_path": f"s3://bucket/{ref}.jpg", "doc_hash": f"sha256:{ref}"}
+    payload = {
+        "applications": [
+            {
+                "external_ref": f"{ref}-{i}",
+                "documents": [{"doc_type": "id_card", **stored}, {"doc_type": "selfie", **stored}],
+            }
+            for i in range(3)
+        ]
+    }
+    limit = settings.admission_queue_limits["doc"]
+
+    # One upload would still fit, the third application of the batch does not.
+    queue["state"] = admission.QueueState(
+        depth=limit - 2, completed=0, busy_seconds=0, window=300
+    )
+    resp = await client.post("/kyc/batch", json=payload, headers=headers)
+    assert resp.status_code == 503
+    assert int(resp.headers["retry-after"]) >= admission.MIN_RETRY_AFTER
+    created = await db_session.scalar(
+        select(func.count()).select_from(KYCApplication).where(
+            KYCApplication.external_ref.like(f"{ref}-%")
+        )
+    )
+    assert created == 0
+
+    queue["state"] = admission.QueueState(depth=59, completed=300, busy_seconds=900, window=300)
+    resp = await client.post("/kyc/batch", json=payload, headers=headers)
+    assert resp.status_code == 202
+    estimates = (
+        await db_session.scalars(
+            select(KYCApplication.estimated_completion_at).where(
+                KYCApplication.external_ref.like(f"{ref}-%")
+            )
+        )
+    ).all()
+    assert len(estimates) == 3 and all(estimates)
@@ -0,0 +1,24 @@
+"""Tests for audit log partition bookkeeping."""
+
+from __future__ import annotations
+
+from datetime import date, datetime
+
+from app.services.audit_partitions import Partition, add_months, partitions_between
+
+
+def test_monthly_partition_bounds():
+    """Partitions cover whole months and round-trip through their names."""
+
+    partitions = partitions_between(datetime(2024, 11, 17), date(2025, 2, 1))
+    assert [p.name for p in partitions] == [
+        "audit_logs_y2024m11",
+        "audit_logs_y2024m12",
+        "audit_logs_y2025m01",
+        "audit_logs_y2025m02",
+    ]
+    assert partitions[1].end == date(2025, 1, 1)
+    assert Partition.from_name("audit_logs_y2024m12") == partitions[1]
+    assert Partition.from_name("audit_logs_default") is None
+    assert add_months(date(2025, 1, 1), -24) == date(2023, 1, 1)
+    assert "FROM ('2024-12-01') TO ('2025-01-01')" in partitions[1].create_sql()
@@ -0,0 +1,190 @@
+"""Tests for batch KYC submission."""
+
+from __future__ import annotations
+
+import io
+import json
+import uuid
+import zipfile
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import func, select
+
+from app.models import AuditLog, Document, KYCBatch
+from app.services import batch_service
+from app.workers import tasks
+from app.workers.tasks import _process_kyc
+
+
+def _entry(ref: str, **doc_fields) -> dict:
+    return {
+        "external_ref": ref,
+        "documents": [
+            {"doc_type": "id_card", **doc_fields.get("id_card", {})},
+            {"doc_type": "selfie", **doc_fields.get("selfie", {})},
+        ],
+    }
+
+
+@pytest.mark.asyncio
+async def test_batch_with_stored_blobs(
+    client: AsyncClient, db_session, monkeypatch, partner_login
+):
+    """A JSON batch creates applications in bulk and reports aggregate progress."""
+
+    enqueued = []
+    monkeypatch.setattr(
+        batch_service, "enqueue_batch", lambda batch_id, ids: enqueued.append((batch_id, ids))
+    )
+    headers = await partner_login()
+    stored = {"storage_path": "s3://bucket/x.jpg", "doc_hash": "sha256:x"}
+    payload = {
+        "applications": [
+            _entry(f"cust-{i}", id_card=stored, selfie=stored) for i in range(3)
+        ]
+    }
+
+    resp = await client.post("/kyc/batch", json=payload, headers=headers)
+    assert resp.status_code == 202
+    body = resp.json()
+    assert body["total"] == 3
+    assert [item["external_ref"] for item in body["applications"]] == ["cust-0", "cust-1", "cust-2"]
+    app_ids = [item["application_id"] for item in body["applications"]]
+    assert [str(app_id) for app_id in enqueued[0][1]] == app_ids
+
+    documents = await db_session.scalar(
+        select(func.count())
+        .select_from(Document)
+        .where(Document.storage_path == "s3://bucket/x.jpg")
+    )
+    audits = await db_session.scalar(
+        select(func.count())
+        .select_from(AuditLog)
+        .where(
+            AuditLog.action == "kyc_batch_submit",
+            AuditLog.application_id.in_([uuid.UUID(app_id) for app_id in app_ids]),
+        )
+    )
+    assert (documents, audits) == (6, 3)
+
+    await _process_kyc(enqueued[0][1][0])
+    progress = (await client.get(f"/kyc/batch/{body['batch_id']}", headers=headers)).json()
+    assert progress["total"] == 3
+    assert progress["completed"] == 1
+    assert progress["status_counts"]["PROCESSING"] == 2
+
+    other = await partner_login()
+    resp = await client.get(f"/kyc/batch/{body['batch_id']}", headers=other)
+    assert resp.status_code == 403
+
+    resp = await client.post(
+        "/kyc/batch", json={"applications": [_entry("missing")]}, headers=headers
+    )
+    assert resp.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_batch_archive_upload(client: AsyncClient, monkeypatch, partner_login):
+    """Archive batches upload each referenced member to Storage."""
+
+    monkeypatch.setattr(batch_service, "enqueue_batch", lambda batch_id, ids: None)
+    uploaded = []
+    monkeypatch.setattr(
+        batch_service,
+        "upload_to_storage",
+        lambda data, name: uploaded.append(name) or {"storage_path": f"s3://b/{name}", "hash": "h"},
+    )
+    headers = await partner_login(storage_prefix="s3://archive-partner/")
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as bundle:
+        for name in ("a-id.jpg", "a-selfie.jpg"):
+            bundle.writestr(name, b"fake")
+    manifest = {
+        "applications": [
+            _entry("a", id_card={"filename": "a-id.jpg"}, selfie={"filename": "a-selfie.jpg"})
+        ]
+    }
+
+    resp = await client.post(
+        "/kyc/batch/archive",
+        headers=headers,
+        data={"manifest": json.dumps(manifest)},
+        files={"archive": ("batch.zip", buffer.getvalue(), "application/zip")},
+    )
+    assert resp.status_code == 202
+    assert sorted(uploaded) == ["a-id.jpg", "a-selfie.jpg"]
+
+    manifest["applications"][0]["documents"][0]["filename"] = "missing.jpg"
+    resp = await client.post(
+        "/kyc/batch/archive",
+        headers=headers,
+        data={"manifest": json.dumps(manifest)},
+        files={"archive": ("batch.zip", buffer.getvalue(), "application/zip")},
+    )
+    assert resp.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_batch_restricted_to_partner_storage(
+    client: AsyncClient, monkeypatch, partner_login
+):
+    """Only partners submit batches, and only for blobs under their own prefix."""
+
+    monkeypatch.setattr(batch_service, "enqueue_batch", lambda batch_id, ids: None)
+    email = "not-a-partner@example.com"
+    await client.post("/user/register", json={"email": email, "password": "password123"})
+    login_resp = await client.post("/auth/login", json={"email": email, "password": "password123"})
+    customer = {"Authorization": f"Bearer {login_resp.json()['access_token']}"}
+    own = {"storage_path": "s3://partner-a/1.jpg", "doc_hash": "sha256:1"}
+    payload = {"applications": [_entry("own", id_card=own, selfie=own)]}
+
+    resp = await client.post("/kyc/batch", json=payload, headers=customer)
+    assert resp.status_code == 403
+
+    headers = await partner_login(storage_prefix="s3://partner-a/")
+    resp = await client.post("/kyc/batch", json=payload, headers=headers)
+    assert resp.status_code == 202
+
+    for path in ("s3://partner-b/1.jpg", "s3://partner-a/../partner-b/1.jpg"):
+        foreign = {"storage_path": path, "doc_hash": "sha256:1"}
+        resp = await client.post(
+            "/kyc/batch",
+            json={"applications": [_entry("foreign", id_card=own, selfie=foreign)]},
+            headers=headers,
+        )
+        assert resp.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_failed_application_still_finalizes_batch(
+    client: AsyncClient, db_session, monkeypatch, partner_login
+):
+    """The chord body is also its error callback, so a failed application ends the batch."""
+
+    chords = []
+    monkeypatch.setattr(tasks, "chord", lambda header: lambda body: chords.append(body))
+    monkeypatch.setattr(batch_service, "enqueue_batch", tasks.enqueue_batch)
+    headers = await partner_login()
+    stored = {"storage_path": "s3://bucket/final.jpg", "doc_hash": "sha256:final"}
+    resp = await client.post(
+        "/kyc/batch",
+        json={"applications": [_entry("final", id_card=stored, selfie=stored)]},
+        headers=headers,
+    )
+    assert resp.status_code == 202
+    batch_id = resp.json()["batch_id"]
+
+    (body,) = chords
+    (errback,) = body.options["link_error"]
+    assert errback["task"] == body["task"] == tasks.finalize_batch.name
+    assert errback["args"] == body["args"] == (batch_id,)
+
+    await tasks._finalize_batch(uuid.UUID(batch_id))
+    batch = await db_session.get(KYCBatch, uuid.UUID(batch_id))
+    completed_at = batch.completed_at
+    assert completed_at is not None
+    # Running again (callback after errback) keeps the first stamp.
+    await tasks._finalize_batch(uuid.UUID(batch_id))
+    await db_session.refresh(batch)
+    assert batch.completed_at == completed_at
@@ -0,0 +1,72 @@
+"""Tests for the downstream circuit breaker."""
+
+from __future__ import annotations
+
+import pytest
+
+from app import clients
+from app.config import settings
+
+
+@pytest.fixture
+def clock(monkeypatch) -> list[float]:
+    """Fresh circuits, a threshold of 2 and a monotonic clock set via ``clock[0]``."""
+
+    now = [1000.0]
+    monkeypatch.setattr(clients, "_circuits", {})
+    monkeypatch.setattr(settings, "circuit_failure_threshold", 2)
+    monkeypatch.setattr(settings, "circuit_reset_seconds", 30)
+    monkeypatch.setattr(clients.time, "monotonic", lambda: now[0])
+    return now
+
+
+def _trip(service: str) -> None:
+    for _ in range(settings.circuit_failure_threshold):
+        clients._check_circuit(service)
+        clients._record_outcome(service, ok=False)
+
+
+def test_half_open_trial_closes_circuit(clock):
+    """After the reset period one trial call goes through; its success closes the circuit."""
+
+    _trip("ocr")
+    with pytest.raises(clients.CircuitOpenError):
+        clients._check_circuit("ocr")
+
+    clock[0] += 30
+    clients._check_circuit("ocr")
+    # Concurrent callers keep failing fast while the trial is in flight.
+    with pytest.raises(clients.CircuitOpenError):
+        clients._check_circuit("ocr")
+
+    clients._record_outcome("ocr", ok=True)
+    clients._check_circuit("ocr")
+    clients._check_circuit("ocr")
+
+
+def test_failed_trial_reopens_circuit(clock):
+    """A failed trial keeps the circuit open for another full reset period."""
+
+    _trip("risk")
+    clock[0] += 30
+    clients._check_circuit("risk")
+    clients._record_outcome("risk", ok=False)
+
+    clock[0] += 29
+    with pytest.raises(clients.CircuitOpenError):
+        clients._check_circuit("risk")
+    clock[0] += 1
+    clients._check_circuit("risk")
+
+
+def test_lost_trial_is_replaced(clock):
+    """A trial whose outcome never arrives does not hold the circuit open forever."""
+
+    _trip("storage")
+    clock[0] += 30
+    clients._check_circuit("storage")
+    clock[0] += 29
+    with pytest.raises(clients.CircuitOpenError):
+        clients._check_circuit("storage")
+    clock[0] += 1
+    clients._check_circuit("storage")
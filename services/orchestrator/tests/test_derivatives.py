@@ -0,0 +1,144 @@
+"""Tests for reviewer thumbnails and previews."""
+
+from __future__ import annotations
+
+import io
+
+import pytest
+from httpx import AsyncClient
+from PIL import Image
+from sqlalchemy import select
+
+from app.config import settings
+from app.models import Document
+from app.services import derivatives, image_normalizer
+
+
+def _photo(size=(2400, 1600)) -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", size, (120, 90, 60)).save(buffer, format="JPEG", quality=95)
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def storage(tmp_path, monkeypatch) -> dict[str, bytes]:
+    """In-memory storage; unknown paths hold a photo, ``.pdf`` paths a PDF."""
+
+    monkeypatch.setattr(settings, "image_cache_dir", tmp_path / "images")
+    monkeypatch.setattr(image_normalizer, "_cache", None)
+    monkeypatch.setattr(settings, "image_process_workers", 0)
+    objects: dict[str, bytes] = {}
+    photo = _photo()
+
+    def download(path: str) -> bytes:
+        if path in objects:
+            return objects[path]
+        return b"%PDF-1.4" if path.endswith(".pdf") else photo
+
+    def upload(data: bytes, filename: str) -> dict:
+        objects[filename] = data
+        return {"storage_path": filename}
+
+    monkeypatch.setattr(derivatives, "download_from_storage", download)
+    monkeypatch.setattr(derivatives, "upload_to_storage", upload)
+    return objects
+
+
+async def _document(db_session, app_id) -> Document:
+    return (
+        await db_session.execute(
+            select(Document).where(
+                Document.application_id == app_id, Document.doc_type == "id_card"
+            )
+        )
+    ).scalar_one()
+
+
+@pytest.mark.asyncio
+async def test_thumbnail_caching_headers(
+    client: AsyncClient, db_session, uploaded_application, staff_headers, storage
+):
+    """Thumbnails carry an ETag, revalidate with 304 and honour byte ranges."""
+
+    app_id = await uploaded_application("thumb@example.com")
+    document = await _document(db_session, app_id)
+    url = f"/review/{app_id}/documents/{document.id}/thumbnail"
+
+    resp = await client.get(url, headers=staff_headers)
+    assert resp.status_code == 200
+    assert resp.headers["content-type"] == "image/jpeg"
+    assert resp.headers["accept-ranges"] == "bytes"
+    etag = resp.headers["etag"]
+    body = resp.content
+    with Image.open(io.BytesIO(body)) as image:
+        assert max(image.size) == settings.image_thumbnail_max_side
+    source = image_normalizer.content_digest(_photo())
+    assert list(storage) == [f"derivatives/{source}-thumbnail.jpg"]
+
+    resp = await client.get(url, headers={**staff_headers, "If-None-Match": etag})
+    assert resp.status_code == 304
+    assert resp.content == b""
+
+    resp = await client.get(url, headers={**staff_headers, "Range": "bytes=0-99"})
+    assert resp.status_code == 206
+    assert resp.headers["content-range"] == f"bytes 0-99/{len(body)}"
+    assert resp.content == body[:100]
+
+    resp = await client.get(url, headers={**staff_headers, "Range": f"bytes={len(body)}-"})
+    assert resp.status_code == 416
+    assert resp.headers["content-range"] == f"bytes */{len(body)}"
+
+    resp = await client.get(
+        f"/review/{app_id}/documents/{document.id}/original", headers=staff_headers
+    )
+    assert resp.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_derivative_tiers(
+    client: AsyncClient, db_session, uploaded_application, staff_headers, storage
+):
+    """A recorded derivative is reused from the local cache, then from storage."""
+
+    app_id = await uploaded_application("tiers@example.com")
+    document = await _document(db_session, app_id)
+    url = f"/review/{app_id}/documents/{document.id}/preview"
+    first = await client.get(url, headers=staff_headers)
+    assert first.status_code == 200
+
+    generated = derivatives.metrics.DERIVATIVE_REQUESTS.labels("preview", "generated")
+    before = generated._value.get()
+    assert (await client.get(url, headers=staff_headers)).content == first.content
+
+    # Another host: nothing cached locally, so the stored copy is fetched.
+    image_normalizer._cache = image_normalizer.ImageCache(
+        settings.image_cache_dir.with_name("other-host"), 1 << 20
+    )
+    resp = await client.get(url, headers=staff_headers)
+    assert resp.content == first.content
+    assert resp.headers["etag"] == first.headers["etag"]
+    assert generated._value.get() == before
+
+
+@pytest.mark.asyncio
+async def test_prefetch_and_non_images(db_session, uploaded_application, storage):
+    """Prefetch fills in every variant of image documents and skips the rest."""
+
+    app_id = await uploaded_application("prefetch@example.com")
+    document = await _document(db_session, app_id)
+    selfie = (
+        await db_session.execute(
+            select(Document).where(
+                Document.application_id == app_id, Document.doc_type == "selfie"
+            )
+        )
+    ).scalar_one()
+    selfie.storage_path = "uploads/selfie.pdf"
+    await db_session.commit()
+
+    assert await derivatives.prefetch(db_session, [app_id]) == len(derivatives.VARIANTS)
+    await db_session.refresh(document)
+    assert set(document.derivatives) == set(derivatives.VARIANTS)
+    assert await derivatives.prefetch(db_session, [app_id]) == 0
+    with pytest.raises(ValueError):
+        await derivatives.get_derivative(db_session, selfie, "thumbnail")
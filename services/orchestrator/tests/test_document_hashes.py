@@ -0,0 +1,163 @@
+"""Tests for perceptual document hashes and the Hamming-distance index."""
+
+from __future__ import annotations
+
+import io
+import json
+import uuid
+import zipfile
+from datetime import datetime
+
+import numpy as np
+import pytest
+from httpx import AsyncClient
+from PIL import Image, ImageDraw
+
+from app.services import batch_service, document_hashes
+from app.workers import pipeline
+from app.workers.tasks import _process_kyc
+
+
+def _id_card(seed: int, *, size=(640, 400), quality=90) -> bytes:
+    """A synthetic card: a gradient with seeded blocks and lines."""
+
+    rng = np.random.default_rng(seed)
+    gradient = np.linspace(40, 220, 400 * 640).reshape(400, 640).astype(np.uint8)
+    image = Image.fromarray(gradient).convert("RGB")
+    draw = ImageDraw.Draw(image)
+    for _ in range(12):
+        x, y, width, height = (int(v) for v in rng.integers((0, 0, 20, 10), (560, 330, 80, 70)))
+        fill = tuple(int(c) for c in rng.integers(0, 255, 3))
+        draw.rectangle([x, y, x + width, y + height], fill=fill)
+    buffer = io.BytesIO()
+    image.resize(size).save(buffer, format="JPEG", quality=quality)
+    return buffer.getvalue()
+
+
+def _distance(a: int, b: int) -> int:
+    return bin(document_hashes.to_unsigned(a) ^ document_hashes.to_unsigned(b)).count("1")
+
+
+def test_perceptual_hash_survives_recompression_and_resizing():
+    """Re-encoded copies stay close; different documents and non-images do not."""
+
+    original = document_hashes.perceptual_hash(_id_card(1))
+    copy = document_hashes.perceptual_hash(_id_card(1, size=(480, 300), quality=40))
+    other = document_hashes.perceptual_hash(_id_card(2))
+    assert _distance(original, copy) <= 4
+    assert _distance(original, other) > 16
+    assert -(2**63) <= original < 2**63
+    assert document_hashes.perceptual_hash(b"not an image") is None
+
+
+@pytest.mark.parametrize("wide", [False, True])
+@pytest.mark.parametrize("radius", [0, 3, 8, 12])
+def test_hamming_index_matches_linear_scan(monkeypatch, radius, wide):
+    """Multi-index lookups return exactly the hashes a full scan finds."""
+
+    if wide:
+        monkeypatch.setattr(document_hashes, "WIDE_CHUNKS_FROM", 0)
+    rng = np.random.default_rng(radius)
+    hashes = rng.integers(0, 2**63, size=20_000, dtype=np.int64).astype(np.uint64)
+    query = int(hashes[7])
+    # Plant neighbours at every distance up to 16 bits.
+    for i, flips in enumerate(range(17), start=100):
+        bits = rng.choice(64, flips, replace=False)
+        hashes[i] = np.uint64(query ^ sum(1 << int(b) for b in bits))
+    index = document_hashes.HammingIndex(hashes)
+
+    rows, distances = index.search(document_hashes.to_signed(query), radius)
+    expected = np.flatnonzero(document_hashes.hamming_distances(hashes, query) <= radius)
+    assert sorted(rows.tolist()) == expected.tolist()
+    assert max(distances.tolist()) <= radius
+
+
+def test_document_index_merges_tail_and_skips_seen_documents():
+    """Hashes are searchable before and after the tail is merged."""
+
+    index = document_hashes.DocumentHashIndex()
+    now = datetime.utcnow()
+    ids = [uuid.uuid4() for _ in range(5000)]
+    for i, document_id in enumerate(ids):
+        index.add(document_id, i * 7919, now)
+    index.add(ids[0], 123, now)
+    assert len(index) == 5000
+    assert index.search(3 * 7919, 0, limit=5)[0].document_id == ids[3]
+    assert index.search(4999 * 7919, 0, limit=5)[0].document_id == ids[4999]
+
+
+@pytest.mark.asyncio
+async def test_pipeline_flags_reused_id_image(
+    client: AsyncClient, uploaded_application, staff_headers, monkeypatch
+):
+    """A second user uploading a re-photographed ID is flagged and shown to reviewers."""
+
+    monkeypatch.setattr(document_hashes, "_document_hash_index", None)
+    real_risk = pipeline.call_risk_service
+    sent = []
+
+    def _capture(application_id, features, meta):
+        sent.append(features)
+        return real_risk(application_id, features, meta=meta)
+
+    monkeypatch.setattr(pipeline, "call_risk_service", _capture)
+
+    first = await uploaded_application("phash-one@example.com", id_front=_id_card(5))
+    await _process_kyc(first)
+    second = await uploaded_application(
+        "phash-two@example.com", id_front=_id_card(5, size=(500, 312), quality=50)
+    )
+    await _process_kyc(second)
+    assert [features["near_duplicate_document"] for features in sent] == [0, 1]
+
+    resp = await client.get(f"/review/{second}", headers=staff_headers)
+    id_card = next(doc for doc in resp.json()["documents"] if doc["doc_type"] == "id_card")
+    assert len(id_card["phash"]) == 16
+    assert [match["application_id"] for match in id_card["near_duplicates"]] == [str(first)]
+
+
+@pytest.mark.asyncio
+async def test_batch_flags_reused_id_image(client: AsyncClient, monkeypatch, partner_login):
+    """One partner's batch applications sharing an ID image flag each other."""
+
+    monkeypatch.setattr(document_hashes, "_document_hash_index", None)
+    enqueued = []
+    monkeypatch.setattr(batch_service, "enqueue_batch", lambda _, ids: enqueued.extend(ids))
+    real_risk = pipeline.call_risk_service
+    sent = []
+
+    def _capture(application_id, features, meta):
+        sent.append(features)
+        return real_risk(application_id, features, meta=meta)
+
+    monkeypatch.setattr(pipeline, "call_risk_service", _capture)
+    headers = await partner_login()
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as bundle:
+        bundle.writestr("a-id.jpg", _id_card(23))
+        bundle.writestr("b-id.jpg", _id_card(23, size=(500, 312), quality=50))
+        bundle.writestr("selfie.jpg", b"fake")
+    manifest = {
+        "applications": [
+            {
+                "external_ref": ref,
+                "documents": [
+                    {"doc_type": "id_card", "filename": f"{ref}-id.jpg"},
+                    {"doc_type": "selfie", "filename": "selfie.jpg"},
+                ],
+            }
+            for ref in ("a", "b")
+        ]
+    }
+    resp = await client.post(
+        "/kyc/batch/archive",
+        headers=headers,
+        data={"manifest": json.dumps(manifest)},
+        files={"archive": ("batch.zip", buffer.getvalue(), "application/zip")},
+    )
+    assert resp.status_code == 202
+
+    # Both documents are stored with the batch, so each finds the other.
+    for app_id in enqueued:
+        await _process_kyc(app_id)
+    assert [features["near_duplicate_document"] for features in sent] == [1, 1]
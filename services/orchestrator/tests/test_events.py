@@ -0,0 +1,182 @@
+"""Tests for the application event stream."""
+
+from __future__ import annotations
+
+import uuid
+
+import pytest
+from httpx import AsyncClient
+from redis import ConnectionError as RedisConnectionError
+
+from app.config import settings
+from app.models import KYCApplication, User
+from app.services import events
+
+
+class FakeRedis:
+    """Records pipelined XADDs; the first ``failures`` executions raise."""
+
+    def __init__(self, failures: int = 0) -> None:
+        self.failures = failures
+        self.batches: list[list[tuple[str, dict, dict]]] = []
+
+    def pipeline(self, transaction: bool = True) -> "FakePipeline":
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    def __init__(self, client: FakeRedis) -> None:
+        self.client = client
+        self.commands: list[tuple[str, dict, dict]] = []
+
+    def xadd(self, stream: str, fields: dict, **options) -> None:
+        self.commands.append((stream, fields, options))
+
+    def execute(self) -> None:
+        if self.client.failures:
+            self.client.failures -= 1
+            raise RedisConnectionError("down")
+        self.client.batches.append(self.commands)
+
+
+class Unencodable(events.RiskScored):
+    def to_fields(self) -> dict[str, bytes | str]:
+        raise TypeError("cannot encode")
+
+
+def _decoded(fields: dict) -> events.Event:
+    return events.decode(
+        {
+            key.encode(): value if isinstance(value, bytes) else value.encode()
+            for key, value in fields.items()
+        }
+    )
+
+
+@pytest.fixture
+def stream(monkeypatch) -> FakeRedis:
+    """Route this process's publisher to a fake Redis."""
+
+    client = FakeRedis()
+    publisher = events.EventPublisher(client, stream="test:events", retention=60, linger=0)
+    monkeypatch.setattr(settings, "events_enabled", True)
+    monkeypatch.setattr(events, "get_publisher", lambda: publisher)
+    yield client
+    publisher.close()
+
+
+def test_publisher_batches_and_retries(monkeypatch):
+    """Events are sent in pipelined batches, in order, after transient failures."""
+
+    monkeypatch.setattr(events, "RETRY_BACKOFF", 0)
+    client = FakeRedis(failures=2)
+    publisher = events.EventPublisher(
+        client, stream="test:events", retention=60, batch_size=100, linger=0
+    )
+    sent = [
+        events.RiskScored(application_id=uuid.uuid4(), risk_score=n, drpa_level="LOW")
+        for n in range(250)
+    ]
+    publisher.publish(sent)
+    assert publisher.flush(timeout=5)
+    publisher.close()
+
+    assert [len(batch) for batch in client.batches] == [100, 100, 50]
+    commands = [command for batch in client.batches for command in batch]
+    assert {stream for stream, _, _ in commands} == {"test:events"}
+    assert all(options["approximate"] and options["minid"] for _, _, options in commands)
+    assert [_decoded(fields) for _, fields, _ in commands] == sent
+
+
+def test_publisher_survives_unencodable_batch():
+    """A batch failing for a non-Redis reason is dropped; later events still go out."""
+
+    client = FakeRedis()
+    publisher = events.EventPublisher(client, stream="test:events", retention=60, linger=0)
+    publisher.publish([Unencodable(application_id=uuid.uuid4(), risk_score=1, drpa_level="LOW")])
+    assert publisher.flush(timeout=5)
+    assert client.batches == []
+
+    good = events.RiskScored(application_id=uuid.uuid4(), risk_score=2, drpa_level="LOW")
+    publisher.publish([good])
+    assert publisher.flush(timeout=5)
+    publisher.close()
+    assert [_decoded(fields) for _, fields, _ in client.batches[0]] == [good]
+
+
+def test_publisher_restarts_dead_thread(monkeypatch):
+    """If the sending thread dies, the next publish starts a new one."""
+
+    client = FakeRedis()
+    publisher = events.EventPublisher(client, stream="test:events", retention=60, linger=0)
+    real_send_batches = publisher._send_batches
+    monkeypatch.setattr(publisher, "_send_batches", lambda: None)
+    publisher.publish([])
+    with publisher._cond:
+        assert publisher._cond.wait_for(lambda: publisher._thread is None, 5)
+
+    monkeypatch.setattr(publisher, "_send_batches", real_send_batches)
+    sent = events.RiskScored(application_id=uuid.uuid4(), risk_score=3, drpa_level="LOW")
+    publisher.publish([sent])
+    assert publisher.flush(timeout=5)
+    publisher.close()
+    assert [_decoded(fields) for _, fields, _ in client.batches[0]] == [sent]
+
+
+@pytest.mark.asyncio
+async def test_events_published_after_commit_only(db_session, stream):
+    """Rolled-back transitions never reach the stream."""
+
+    owner = User(email="events-rollback@example.com", password_hash="x")
+    db_session.add(owner)
+    await db_session.commit()
+    application = KYCApplication(user_id=owner.id, method="doc")
+    db_session.add(application)
+    await db_session.flush()
+
+    events.record(db_session, events.status_changed(application, None, actor="test"))
+    await db_session.rollback()
+    await db_session.commit()
+    assert events.get_publisher().flush(timeout=5)
+    assert stream.batches == []
+
+    db_session.add(application)
+    events.record(db_session, events.status_changed(application, None, actor="test"))
+    await db_session.commit()
+    assert events.get_publisher().flush(timeout=5)
+    [[(_, fields, _)]] = stream.batches
+    assert _decoded(fields) == events.StatusChanged(
+        application_id=application.id,
+        method="doc",
+        from_status=None,
+        to_status="PENDING",
+        actor="test",
+        occurred_at=_decoded(fields).occurred_at,
+    )
+
+
+@pytest.mark.asyncio
+async def test_application_flow_emits_status_changes(client: AsyncClient, stream):
+    """Starting and uploading an application publishes each transition."""
+
+    email = "events@example.com"
+    await client.post("/user/register", json={"email": email, "password": "password123"})
+    login = await client.post("/auth/login", json={"email": email, "password": "password123"})
+    headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+    start = await client.post("/kyc/start", json={"method": "doc"}, headers=headers)
+    app_id = uuid.UUID(start.json()["application_id"])
+    files = {
+        "application_id": (None, str(app_id)),
+        "id_front": ("id.jpg", b"fake", "image/jpeg"),
+        "selfie": ("selfie.jpg", b"fake", "image/jpeg"),
+    }
+    resp = await client.post("/kyc/upload", headers=headers, files=files)
+    assert resp.status_code == 200
+
+    assert events.get_publisher().flush(timeout=5)
+    published = [_decoded(fields) for batch in stream.batches for _, fields, _ in batch]
+    assert [(event.from_status, event.to_status) for event in published] == [
+        (None, "PENDING"),
+        ("PENDING", "PROCESSING"),
+    ]
+    assert {event.application_id for event in published} == {app_id}
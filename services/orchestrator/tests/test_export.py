@@ -0,0 +1,58 @@
+"""Tests for the staff export endpoints."""
+
+from __future__ import annotations
+
+import csv
+import gzip
+import io
+import json
+
+import pytest
+from httpx import AsyncClient
+
+
+@pytest.mark.asyncio
+async def test_audit_export_resumes_from_cursor(
+    client: AsyncClient, uploaded_application, staff_headers
+):
+    """NDJSON rows carry cursors and ``after`` continues past the given row."""
+
+    app_id = await uploaded_application("export@example.com")
+    params = {"application_id": str(app_id)}
+
+    resp = await client.get("/export/audit-logs", params=params, headers=staff_headers)
+    assert resp.status_code == 200
+    assert resp.headers["content-type"] == "application/x-ndjson"
+    rows = [json.loads(line) for line in resp.text.splitlines()]
+    assert [row["action"] for row in rows] == ["kyc_start", "kyc_upload"]
+
+    resp = await client.get(
+        "/export/audit-logs",
+        params={**params, "after": rows[0]["cursor"]},
+        headers=staff_headers,
+    )
+    assert [json.loads(line)["id"] for line in resp.text.splitlines()] == [rows[1]["id"]]
+
+    resp = await client.get(
+        "/export/audit-logs", params={"after": "not-a-cursor"}, headers=staff_headers
+    )
+    assert resp.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_application_export_csv_gzip(
+    client: AsyncClient, uploaded_application, staff_headers
+):
+    """Applications export as gzip CSV filtered by status."""
+
+    app_id = await uploaded_application("export-csv@example.com")
+
+    resp = await client.get(
+        "/export/applications",
+        params={"status": "PROCESSING", "format": "csv"},
+        headers=staff_headers,
+    )
+    assert resp.status_code == 200
+    rows = list(csv.DictReader(io.StringIO(gzip.decompress(resp.content).decode())))
+    assert str(app_id) in {row["id"] for row in rows}
+    assert {row["status"] for row in rows} == {"PROCESSING"}
@@ -0,0 +1,116 @@
+"""Tests for the face-embedding duplicate index."""
+
+from __future__ import annotations
+
+import uuid
+
+import numpy as np
+import pytest
+
+from app.config import settings
+from app.services import batch_service, face_index
+from app.workers import pipeline
+from app.workers.tasks import _process_kyc
+
+
+def _faces(count: int, dim: int = 64, seed: int = 0) -> np.ndarray:
+    vectors = np.random.default_rng(seed).standard_normal((count, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+@pytest.mark.parametrize("ivf_threshold", [10**9, 100])
+def test_finds_planted_duplicate(monkeypatch, ivf_threshold):
+    """Brute-force and IVF search both return a re-submitted face first."""
+
+    monkeypatch.setattr(settings, "face_index_ivf_threshold", ivf_threshold)
+    monkeypatch.setattr(settings, "face_index_nprobe", 4)
+    vectors = _faces(2000)
+    index = face_index.FaceIndex()
+    ids = [uuid.uuid4() for _ in vectors]
+    for app_id, vector in zip(ids, vectors):
+        index.add(app_id, uuid.uuid4(), vector)
+
+    noisy = vectors[1234] + 0.05 * _faces(1, seed=1)[0]
+    best = index.search(noisy, 3)[0]
+    assert best.application_id == ids[1234]
+    assert best.similarity > 0.95
+    if ivf_threshold == 100:
+        assert isinstance(index._index, face_index.IVFIndex)
+
+    index.add(ids[0], uuid.uuid4(), vectors[1])
+    assert len(index) == 2000
+    assert index.search(np.ones(32), 3) == []
+
+
+@pytest.fixture
+def same_face(monkeypatch) -> list[dict]:
+    """Give every application the same face; collect the risk features sent."""
+
+    monkeypatch.setattr(face_index, "_face_index", None)
+    # A face of its own per test: earlier tests' faces stay in the database.
+    face = _faces(1, dim=128, seed=uuid.uuid4().int % 2**32)[0]
+    real_facematch = pipeline.call_facematch_service
+    real_risk = pipeline.call_risk_service
+    sent: list[dict] = []
+
+    def _facematch(application_id, id_bytes, selfie_bytes):
+        result = real_facematch(application_id, id_bytes, selfie_bytes)
+        return {**result, "embedding": face.tolist()}
+
+    def _capture(application_id, features, meta):
+        sent.append(features)
+        return real_risk(application_id, features, meta=meta)
+
+    monkeypatch.setattr(pipeline, "call_facematch_service", _facematch)
+    monkeypatch.setattr(pipeline, "call_risk_service", _capture)
+    return sent
+
+
+@pytest.mark.asyncio
+async def test_pipeline_flags_duplicate_face(uploaded_application, same_face):
+    """A second user presenting the same face gets ``duplicate_face`` in risk features."""
+
+    await _process_kyc(await uploaded_application("face-one@example.com"))
+    await _process_kyc(await uploaded_application("face-two@example.com"))
+    assert [features["duplicate_face"] for features in same_face] == [0, 1]
+
+
+@pytest.mark.asyncio
+async def test_batch_applications_are_separate_applicants(
+    client, same_face, monkeypatch, partner_login
+):
+    """One partner's customers with the same face are flagged despite sharing a user."""
+
+    enqueued = []
+    monkeypatch.setattr(batch_service, "enqueue_batch", lambda _, ids: enqueued.extend(ids))
+    headers = await partner_login()
+    stored = {"storage_path": "s3://bucket/face.jpg", "doc_hash": "sha256:face"}
+    entries = [
+        {
+            "external_ref": f"face-{i}",
+            "documents": [{"doc_type": "id_card", **stored}, {"doc_type": "selfie", **stored}],
+        }
+        for i in range(2)
+    ]
+    resp = await client.post("/kyc/batch", json={"applications": entries}, headers=headers)
+    assert resp.status_code == 202
+
+    for app_id in enqueued:
+        await _process_kyc(app_id)
+    assert [features["duplicate_face"] for features in same_face] == [0, 1]
+
+
+@pytest.mark.asyncio
+async def test_failed_face_stage_is_not_indexed(uploaded_application, same_face, monkeypatch):
+    """A face whose stage rolls back never becomes a match for later applications."""
+
+    def _fail(*_):
+        raise RuntimeError("metrics down")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(pipeline.metrics.DUPLICATE_FACE_CHECKS, "labels", _fail)
+        with pytest.raises(pipeline.StageError):
+            await _process_kyc(await uploaded_application("face-failed@example.com"))
+
+    await _process_kyc(await uploaded_application("face-after@example.com"))
+    assert [features["duplicate_face"] for features in same_face] == [0]
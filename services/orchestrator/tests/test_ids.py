@@ -0,0 +1,42 @@
+"""Tests for UUIDv7 primary keys."""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import ids
+from app.models import User
+
+
+def test_uuid7_layout_and_order(monkeypatch):
+    """Ids carry version 7 and their time, and increase even within one millisecond."""
+
+    before = datetime.utcnow()
+    generated = [ids.uuid7() for _ in range(10_000)]
+    assert {(value.version, value.variant) for value in generated} == {
+        (7, "specified in RFC 4122")
+    }
+    assert generated == sorted(generated)
+    assert len(set(generated)) == len(generated)
+    created = ids.uuid7_timestamp(generated[0])
+    assert before - timedelta(milliseconds=1) <= created <= datetime.utcnow()
+    assert ids.uuid7_floor(before) <= generated[0]
+
+    # A clock that stands still or steps back does not break the order.
+    frozen = generated[-1].int >> 80
+    monkeypatch.setattr(ids.time, "time_ns", lambda: (frozen - 5) * 1_000_000)
+    stalled = [ids.uuid7() for _ in range(5000)]
+    assert stalled == sorted(stalled) and stalled[0] > generated[-1]
+    assert stalled[-1].int >> 80 > frozen
+
+
+@pytest.mark.asyncio
+async def test_models_default_to_uuid7(db_session):
+    """New rows get UUIDv7 primary keys."""
+
+    user = User(email="uuid7@example.com", password_hash="x")
+    db_session.add(user)
+    await db_session.flush()
+    assert user.id.version == 7
@@ -0,0 +1,117 @@
+"""Tests for the image normalisation stage and its cache."""
+
+from __future__ import annotations
+
+import io
+import os
+
+import pytest
+from PIL import Image
+
+from app.config import settings
+from app.services import image_normalizer
+from app.workers import pipeline
+from app.workers.tasks import _process_kyc
+
+
+def _photo(size=(3000, 2000), orientation: int | None = None) -> bytes:
+    image = Image.new("RGB", size, (200, 180, 160))
+    image.paste((20, 40, 60), (0, 0, size[0] // 4, size[1] // 4))
+    exif = Image.Exif()
+    if orientation:
+        exif[0x0112] = orientation
+    buffer = io.BytesIO()
+    image.save(buffer, format="JPEG", quality=95, exif=exif)
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def image_cache(tmp_path, monkeypatch) -> image_normalizer.ImageCache:
+    monkeypatch.setattr(settings, "image_cache_dir", tmp_path / "images")
+    monkeypatch.setattr(image_normalizer, "_cache", None)
+    return image_normalizer.get_cache()
+
+
+def test_normalize_rotates_and_downscales():
+    """EXIF orientation is applied and the long side fits the profile."""
+
+    original = _photo(orientation=6)
+    image = image_normalizer.normalize_image(original, 800, 85)
+    assert (image.width, image.height) == (533, 800)
+    with Image.open(io.BytesIO(image.data)) as decoded:
+        assert decoded.format == "JPEG"
+        assert decoded.size == (533, 800)
+        # The dark corner block is now at the top right.
+        assert decoded.getpixel((500, 20))[0] < 100
+    assert len(image.data) < len(original) / 4
+
+
+def test_small_upright_jpeg_and_non_images():
+    """Images already within bounds are kept; non-images are rejected."""
+
+    small = _photo(size=(600, 400))
+    assert image_normalizer.normalize_image(small, 800, 85).data == small
+    with pytest.raises(ValueError):
+        image_normalizer.normalize_image(b"%PDF-1.4", 800, 85)
+
+
+@pytest.mark.asyncio
+async def test_derive_uses_cache(image_cache, monkeypatch):
+    """A second request for the same content and profile is served from disk."""
+
+    original = _photo()
+    first = await image_normalizer.derive(original, "face")
+    monkeypatch.setattr(image_normalizer, "normalize_image", None)
+    assert await image_normalizer.derive(original, "face") == first
+    digest = image_normalizer.content_digest(original)
+    assert image_cache.get(digest, "face") == first
+    assert image_cache.get(digest, "ocr") is None
+
+
+def test_cache_prunes_least_recently_used(tmp_path):
+    """Pruning keeps the most recently read files within the size limit."""
+
+    cache = image_normalizer.ImageCache(tmp_path, max_bytes=2500)
+    for i, name in enumerate("abc"):
+        cache.put(name * 64, "ocr", b"x" * 1000)
+        os.utime(cache._path(name * 64, "ocr"), (i, i))
+    cache.get("a" * 64, "ocr")
+    assert cache.prune() == 1
+    assert cache.get("b" * 64, "ocr") is None
+    assert cache.get("a" * 64, "ocr") is not None
+
+
+@pytest.mark.asyncio
+async def test_pipeline_sends_normalized_images(uploaded_application, image_cache, monkeypatch):
+    """OCR and face matching receive downscaled copies of the stored originals."""
+
+    photos = {"id.jpg": _photo(orientation=8), "selfie.jpg": _photo(size=(4000, 3000))}
+    downloads = []
+
+    def _download(storage_path):
+        downloads.append(storage_path)
+        return photos[storage_path.rsplit("/", 1)[-1]]
+
+    sent: dict[str, list[bytes]] = {"ocr": [], "face": []}
+    real_ocr, real_facematch = pipeline.call_ocr_service, pipeline.call_facematch_service
+
+    def _ocr(application_id, doc_type, image_bytes, meta):
+        sent["ocr"].append(image_bytes)
+        return real_ocr(application_id, doc_type, image_bytes, meta=meta)
+
+    def _facematch(application_id, id_bytes, selfie_bytes):
+        sent["face"].extend([id_bytes, selfie_bytes])
+        return real_facematch(application_id, id_bytes, selfie_bytes)
+
+    monkeypatch.setattr(pipeline, "download_from_storage", _download)
+    monkeypatch.setattr(pipeline, "call_ocr_service", _ocr)
+    monkeypatch.setattr(pipeline, "call_facematch_service", _facematch)
+
+    await _process_kyc(await uploaded_application("normalize@example.com"))
+    assert len(downloads) == 2
+    for profile, max_side in (("ocr", settings.image_ocr_max_side), ("face", 800)):
+        for data in sent[profile]:
+            with Image.open(io.BytesIO(data)) as image:
+                assert max(image.size) == max_side
+    with Image.open(io.BytesIO(sent["face"][0])) as id_face:
+        assert id_face.size == (533, 800)
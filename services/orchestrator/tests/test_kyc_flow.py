@@ -100,3 +100,7 @@ async def test_reviewer_flow(client: AsyncClient, db_session):
     assert action_resp.status_code == 200
     assert action_resp.json()["status"] == "APPROVED"
 
+    audit_resp = await client.get(f"/audit/{application.id}", headers=headers)
+    assert audit_resp.status_code == 200
+    assert audit_resp.headers["content-type"] == "application/json"
+    assert [entry["action"] for entry in audit_resp.json()] == ["review_approve"]
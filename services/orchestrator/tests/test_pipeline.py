@@ -0,0 +1,48 @@
+"""Tests for the checkpointed processing pipeline."""
+
+from __future__ import annotations
+
+import pytest
+from sqlalchemy import select
+
+from app.clients import ClientError
+from app.models import KYCApplication, PipelineStage
+from app.workers import pipeline
+from app.workers.tasks import _process_kyc
+
+
+@pytest.mark.asyncio
+async def test_retry_resumes_from_failed_stage(
+    uploaded_application, db_session, monkeypatch
+):
+    """A risk failure keeps OCR/face results and the retry only re-runs risk onwards."""
+
+    app_id = await uploaded_application("pipeline@example.com")
+
+    def _risk_down(*args, **kwargs):
+        raise ClientError("risk unavailable")
+
+    monkeypatch.setattr(pipeline, "call_risk_service", _risk_down)
+    with pytest.raises(pipeline.StageError):
+        await _process_kyc(app_id)
+
+    result = await db_session.execute(
+        select(PipelineStage).where(PipelineStage.application_id == app_id)
+    )
+    stages = {record.stage: record for record in result.scalars()}
+    assert stages["ocr"].status == "COMPLETED"
+    assert stages["face"].status == "COMPLETED"
+    assert stages["risk"].status == "FAILED"
+    assert stages["risk"].attempts == 1
+
+    def _must_not_run(*args, **kwargs):
+        raise AssertionError("completed stage was re-run")
+
+    monkeypatch.undo()
+    monkeypatch.setattr(pipeline, "call_ocr_service", _must_not_run)
+    monkeypatch.setattr(pipeline, "call_facematch_service", _must_not_run)
+    await _process_kyc(app_id)
+
+    db_session.expire_all()
+    application = await db_session.get(KYCApplication, app_id)
+    assert application.status in {"APPROVED", "FLAGGED"}
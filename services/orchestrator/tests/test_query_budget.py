@@ -0,0 +1,79 @@
+"""Query budgets and metrics for request handlers and worker tasks."""
+
+from __future__ import annotations
+
+import pytest
+from httpx import AsyncClient
+
+from app.db import SessionLocal
+from app.workers.pipeline import load_application_for_processing
+from app.workers.tasks import _process_kyc
+
+
+@pytest.mark.asyncio
+async def test_worker_loads_application_in_fixed_queries(uploaded_application, query_counter):
+    """Application, documents, face match and stages load in three statements."""
+
+    app_id = await uploaded_application("budget-load@example.com")
+    await _process_kyc(app_id)
+
+    async with SessionLocal() as session:
+        with query_counter.budget(3, "load_application_for_processing"):
+            application = await load_application_for_processing(session, app_id)
+            # Touching the relationships must not issue further queries.
+            assert {doc.doc_type for doc in application.documents} == {"id_card", "selfie"}
+            assert application.face_match is not None
+            assert len(application.stages) == 7
+
+
+@pytest.mark.asyncio
+async def test_process_kyc_query_budget(uploaded_application, query_counter):
+    """A full pipeline run stays within its statement budget."""
+
+    app_id = await uploaded_application("budget-task@example.com")
+    # The decision stage also upserts the dashboard counters (one statement),
+    # and the normalize stage adds one stage checkpoint.
+    with query_counter.budget(16, "process_kyc"):
+        await _process_kyc(app_id)
+
+
+@pytest.mark.asyncio
+async def test_status_request_query_budget(client: AsyncClient, query_counter):
+    """Polling status costs a bounded number of statements."""
+
+    await client.post(
+        "/user/register", json={"email": "budget-status@example.com", "password": "password123"}
+    )
+    login_resp = await client.post(
+        "/auth/login", json={"email": "budget-status@example.com", "password": "password123"}
+    )
+    headers = {"Authorization": f"Bearer {login_resp.json()['access_token']}"}
+    start_resp = await client.post("/kyc/start", json={"method": "doc"}, headers=headers)
+    app_id = start_resp.json()["application_id"]
+
+    with query_counter.budget(3, "GET /kyc/status"):
+        resp = await client.get(f"/kyc/status/{app_id}", headers=headers)
+    assert resp.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_server_timing_header(client: AsyncClient):
+    """Responses carry DB and serialization timings."""
+
+    resp = await client.post(
+        "/user/register", json={"email": "timing@example.com", "password": "password123"}
+    )
+    server_timing = resp.headers["Server-Timing"]
+    assert 'db;dur=' in server_timing
+    assert '"0 queries"' not in server_timing
+    assert "total;dur=" in server_timing
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint(client: AsyncClient):
+    """The scrape endpoint exposes pipeline and request metrics."""
+
+    resp = await client.get("/metrics")
+    assert resp.status_code == 200
+    assert "orchestrator_unit_duration_seconds" in resp.text
+    assert "orchestrator_db_pool_connections" in resp.text
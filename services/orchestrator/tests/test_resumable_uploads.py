@@ -0,0 +1,167 @@
+"""Tests for resumable document uploads."""
+
+from __future__ import annotations
+
+import hashlib
+import uuid
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import select
+from starlette.requests import ClientDisconnect
+
+from app.models import Document, KYCApplication, UploadSession
+from app.services import orchestrator_service, resumable_uploads
+
+
+async def _start(client: AsyncClient, email: str) -> tuple[dict[str, str], str]:
+    await client.post("/user/register", json={"email": email, "password": "password123"})
+    login = await client.post("/auth/login", json={"email": email, "password": "password123"})
+    headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+    start = await client.post("/kyc/start", json={"method": "doc"}, headers=headers)
+    return headers, start.json()["application_id"]
+
+
+async def _create(client, headers, app_id, doc_type, data: bytes, **extra) -> str:
+    resp = await client.post(
+        "/kyc/uploads",
+        headers=headers,
+        json={"application_id": app_id, "doc_type": doc_type, "length": len(data), **extra},
+    )
+    assert resp.status_code == 201
+    assert resp.headers["upload-offset"] == "0"
+    return resp.json()["upload_id"]
+
+
+async def _patch(client, headers, upload_id, offset: int, data: bytes):
+    return await client.patch(
+        f"/kyc/uploads/{upload_id}",
+        headers={
+            **headers,
+            "Upload-Offset": str(offset),
+            "Content-Type": "application/offset+octet-stream",
+        },
+        content=data,
+    )
+
+
+@pytest.mark.asyncio
+async def test_chunked_upload_and_finalize(client: AsyncClient, db_session, monkeypatch):
+    """Documents sent in chunks are submitted as if posted in one request."""
+
+    stored: dict[str, bytes] = {}
+
+    def upload_to_storage(data: bytes, filename: str) -> dict:
+        stored[filename] = data
+        return {"storage_path": f"uploads/{filename}", "hash": "h"}
+
+    monkeypatch.setattr(orchestrator_service, "upload_to_storage", upload_to_storage)
+    headers, app_id = await _start(client, "resumable@example.com")
+    id_card = bytes(range(256)) * 40
+    selfie = b"selfie-bytes" * 100
+
+    id_upload = await _create(
+        client,
+        headers,
+        app_id,
+        "id_card",
+        id_card,
+        filename="id.jpg",
+        sha256=hashlib.sha256(id_card).hexdigest(),
+    )
+    resp = await _patch(client, headers, id_upload, 0, id_card[:4000])
+    assert resp.status_code == 200
+    assert resp.json()["offset"] == 4000 and not resp.json()["complete"]
+
+    # A retried chunk at a stale offset is refused with the current one.
+    resp = await _patch(client, headers, id_upload, 0, id_card[:4000])
+    assert resp.status_code == 409
+    assert resp.headers["upload-offset"] == "4000"
+
+    resp = await client.head(f"/kyc/uploads/{id_upload}", headers=headers)
+    assert resp.status_code == 200
+    assert resp.headers["upload-offset"] == "4000"
+    assert resp.headers["upload-length"] == str(len(id_card))
+
+    # Another process resumes without the running hash.
+    resumable_uploads._hashers.clear()
+    resp = await _patch(client, headers, id_upload, 4000, id_card[4000:])
+    assert resp.status_code == 200
+    assert resp.json()["complete"]
+
+    resp = await client.post(
+        "/kyc/uploads/finalize", headers=headers, json={"application_id": app_id}
+    )
+    assert resp.status_code == 400
+
+    selfie_upload = await _create(client, headers, app_id, "selfie", selfie)
+    assert (await _patch(client, headers, selfie_upload, 0, selfie)).status_code == 200
+    resp = await client.post(
+        "/kyc/uploads/finalize", headers=headers, json={"application_id": app_id}
+    )
+    assert resp.status_code == 200
+    assert stored == {"id.jpg": id_card, "selfie": selfie}
+
+    application = await db_session.get(KYCApplication, uuid.UUID(app_id))
+    await db_session.refresh(application)
+    assert application.status == "PROCESSING"
+    documents = await db_session.scalars(
+        select(Document.doc_type).where(Document.application_id == application.id)
+    )
+    assert sorted(documents) == ["id_card", "selfie"]
+    remaining = await db_session.scalars(
+        select(UploadSession).where(UploadSession.application_id == application.id)
+    )
+    assert remaining.all() == []
+    assert not resumable_uploads.part_path(uuid.UUID(id_upload)).exists()
+    resp = await client.get(f"/kyc/uploads/{id_upload}", headers=headers)
+    assert resp.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_rejected_chunks(client: AsyncClient):
+    """Oversized chunks and corrupted uploads are refused."""
+
+    headers, app_id = await _start(client, "resumable-bad@example.com")
+    data = b"x" * 1000
+    upload_id = await _create(
+        client, headers, app_id, "selfie", data, sha256=hashlib.sha256(data).hexdigest()
+    )
+    resp = await _patch(client, headers, upload_id, 0, data + b"extra")
+    assert resp.status_code == 413
+    assert (await client.get(f"/kyc/uploads/{upload_id}", headers=headers)).json()["offset"] == 0
+
+    resp = await _patch(client, headers, upload_id, 0, b"y" * 1000)
+    assert resp.status_code == 422
+    assert resp.headers["upload-offset"] == "0"
+    assert resumable_uploads.part_path(uuid.UUID(upload_id)).stat().st_size == 0
+
+    other_headers, _ = await _start(client, "resumable-other@example.com")
+    resp = await client.get(f"/kyc/uploads/{upload_id}", headers=other_headers)
+    assert resp.status_code == 404
+
+    resp = await client.delete(f"/kyc/uploads/{upload_id}", headers=headers)
+    assert resp.status_code == 204
+    assert not resumable_uploads.part_path(uuid.UUID(upload_id)).exists()
+
+
+@pytest.mark.asyncio
+async def test_interrupted_chunk_keeps_received_bytes(client: AsyncClient, db_session):
+    """Bytes received before a dropped connection count towards the offset."""
+
+    headers, app_id = await _start(client, "resumable-drop@example.com")
+    upload_id = await _create(client, headers, app_id, "id_card", b"z" * 300)
+    upload = await db_session.get(UploadSession, uuid.UUID(upload_id))
+
+    async def flaky_body():
+        yield b"z" * 100
+        yield b"z" * 50
+        raise ClientDisconnect()
+
+    upload = await resumable_uploads.append_chunk(
+        db_session, upload, offset=0, chunk=flaky_body()
+    )
+    assert upload.offset == 150
+    resp = await _patch(client, headers, upload_id, 150, b"z" * 150)
+    assert resp.json()["complete"]
+    assert resumable_uploads.part_path(upload.id).read_bytes() == b"z" * 300
@@ -0,0 +1,261 @@
+"""Tests for reviewer endpoints."""
+
+from __future__ import annotations
+
+import uuid
+
+import pytest
+from fastapi import HTTPException
+from httpx import AsyncClient
+from sqlalchemy import select, update
+
+from app.models import AuditLog, Document, KYCApplication, KYCStatus, User
+from app.schemas import ReviewActionRequest
+from app.services import orchestrator_service, queue_stats
+
+
+@pytest.mark.asyncio
+async def test_search_by_ocr_fields(
+    client: AsyncClient, db_session, uploaded_application, staff_headers
+):
+    """Reviewers find documents by case-insensitive name or document number."""
+
+    app_id = await uploaded_application("search@example.com")
+    document = (
+        await db_session.execute(
+            select(Document).where(
+                Document.application_id == app_id, Document.doc_type == "id_card"
+            )
+        )
+    ).scalar_one()
+    document.ocr_json = {"name": "Asha Verma", "document_number": "DL12345678"}
+    await db_session.commit()
+
+    resp = await client.get(
+        "/review/search", params={"name": " ASHA  verma"}, headers=staff_headers
+    )
+    assert resp.status_code == 200
+    assert [(r["application_id"], r["document_number"]) for r in resp.json()] == [
+        (str(app_id), "DL12345678")
+    ]
+
+    resp = await client.get(
+        "/review/search", params={"document_number": "DL12345678"}, headers=staff_headers
+    )
+    assert [r["name"] for r in resp.json()] == ["Asha Verma"]
+
+    resp = await client.get("/review/search", headers=staff_headers)
+    assert resp.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_bulk_action_reports_conflicts(client: AsyncClient, db_session, staff_headers):
+    """Only flagged applications at the given version are updated."""
+
+    owner = User(email="bulk-owner@example.com", password_hash="x")
+    db_session.add(owner)
+    await db_session.flush()
+    applications = [
+        KYCApplication(user_id=owner.id, method="doc", status=KYCStatus.FLAGGED.value)
+        for _ in range(3)
+    ]
+    db_session.add_all(applications)
+    await db_session.commit()
+    fresh, stale, decided = applications
+    decided.status = KYCStatus.REJECTED.value
+    await db_session.commit()
+
+    resp = await client.post(
+        "/review/bulk-action",
+        headers=staff_headers,
+        json={
+            "action": "approve",
+            "items": [
+                {"application_id": str(fresh.id), "version": 1},
+                {"application_id": str(stale.id), "version": 0},
+                {"application_id": str(decided.id), "version": 1},
+                {"application_id": str(uuid.uuid4()), "version": 1},
+            ],
+        },
+    )
+    assert resp.status_code == 200
+    assert [(r["result"], r["status"], r["version"]) for r in resp.json()] == [
+        ("updated", "APPROVED", 2),
+        ("conflict", "FLAGGED", 1),
+        ("conflict", "REJECTED", 2),
+        ("not_found", None, None),
+    ]
+
+    audits = await db_session.scalars(
+        select(AuditLog.application_id).where(AuditLog.action == "review_approve")
+    )
+    assert fresh.id in set(audits)
+
+    resp = await client.post(
+        f"/review/{stale.id}/action",
+        headers=staff_headers,
+        json={"action": "approve", "version": 0},
+    )
+    assert resp.status_code == 409
+
+
+@pytest.mark.asyncio
+async def test_concurrent_review_write_is_a_conflict(db_session):
+    """A write between loading and deciding answers 409, without a version in the request."""
+
+    reviewer = User(email="stale-reviewer@example.com", password_hash="x", is_staff=True)
+    db_session.add(reviewer)
+    await db_session.flush()
+    application = KYCApplication(
+        user_id=reviewer.id, method="doc", status=KYCStatus.FLAGGED.value
+    )
+    db_session.add(application)
+    await db_session.commit()
+    await db_session.execute(
+        update(KYCApplication)
+        .where(KYCApplication.id == application.id)
+        .values(version=KYCApplication.version + 1)
+        .execution_options(synchronize_session=False)
+    )
+    await db_session.commit()
+
+    with pytest.raises(HTTPException) as excinfo:
+        await orchestrator_service.apply_review_action(
+            db_session,
+            application=application,
+            reviewer=reviewer,
+            payload=ReviewActionRequest(action="approve"),
+        )
+    assert excinfo.value.status_code == 409
+
+
+@pytest.mark.asyncio
+async def test_bulk_request_info_keeps_version(client: AsyncClient, db_session, staff_headers):
+    """Requesting info leaves applications FLAGGED at the same version."""
+
+    owner = User(email="bulk-info@example.com", password_hash="x")
+    db_session.add(owner)
+    await db_session.flush()
+    application = KYCApplication(user_id=owner.id, method="doc", status=KYCStatus.FLAGGED.value)
+    db_session.add(application)
+    await db_session.commit()
+
+    resp = await client.post(
+        "/review/bulk-action",
+        headers=staff_headers,
+        json={
+            "action": "request_info",
+            "items": [{"application_id": str(application.id), "version": 1}],
+        },
+    )
+    assert [(r["result"], r["status"], r["version"]) for r in resp.json()] == [
+        ("updated", "FLAGGED", 1)
+    ]
+
+
+@pytest.mark.asyncio
+async def test_claims_are_disjoint_and_enforced(client: AsyncClient, db_session, staff_login):
+    """Concurrent reviewers lease different applications and cannot decide each other's."""
+
+    owner = User(email="claim-owner@example.com", password_hash="x")
+    db_session.add(owner)
+    await db_session.flush()
+    db_session.add_all(
+        KYCApplication(
+            user_id=owner.id, method="doc", status=KYCStatus.FLAGGED.value, risk_score=score
+        )
+        for score in (90, 80, 70, 60)
+    )
+    await db_session.commit()
+    first, second = await staff_login(), await staff_login()
+
+    resp = await client.post("/review/claim", headers=first, json={"limit": 2})
+    assert resp.status_code == 200
+    first_ids = [r["application_id"] for r in resp.json()]
+    assert [r["risk_score"] for r in resp.json()] == [90, 80]
+    resp = await client.post("/review/claim", headers=second, json={"limit": 2})
+    second_ids = [r["application_id"] for r in resp.json()]
+    assert [r["risk_score"] for r in resp.json()] == [70, 60]
+
+    resp = await client.post(
+        f"/review/{first_ids[0]}/action", headers=second, json={"action": "approve"}
+    )
+    assert resp.status_code == 409
+    resp = await client.post(
+        "/review/bulk-action",
+        headers=second,
+        json={"action": "reject", "items": [{"application_id": first_ids[1], "version": 1}]},
+    )
+    assert [r["result"] for r in resp.json()] == ["conflict"]
+
+    resp = await client.post(
+        "/review/claims/heartbeat",
+        headers=first,
+        json={"application_ids": first_ids + second_ids},
+    )
+    assert sorted(r["application_id"] for r in resp.json()) == sorted(first_ids)
+
+    resp = await client.post(
+        f"/review/{first_ids[0]}/action", headers=first, json={"action": "approve"}
+    )
+    assert resp.status_code == 200
+    resp = await client.post(
+        "/review/claims/release", headers=first, json={"application_ids": first_ids}
+    )
+    assert resp.json() == [first_ids[1]]
+
+    resp = await client.post("/review/claim", headers=second, json={"limit": 5})
+    reclaimed = {r["application_id"] for r in resp.json()}
+    assert set(second_ids + first_ids[1:]) <= reclaimed
+    assert first_ids[0] not in reclaimed
+
+
+@pytest.mark.asyncio
+async def test_stats_follow_transitions_and_reconcile(
+    client: AsyncClient, db_session, uploaded_application, staff_headers
+):
+    """Counters move with every status change and reconciliation fixes drift."""
+
+    async def stats(**params):
+        resp = await client.get("/review/stats", params=params, headers=staff_headers)
+        assert resp.status_code == 200
+        return resp.json()
+
+    await queue_stats.reconcile_counters(db_session)
+    before = await stats()
+    app_id = await uploaded_application("stats@example.com")
+    after_upload = await stats()
+    assert after_upload["total"] == before["total"] + 1
+    assert (
+        after_upload["by_status"].get("PROCESSING", 0)
+        == before["by_status"].get("PROCESSING", 0) + 1
+    )
+
+    application = await db_session.get(KYCApplication, app_id)
+    key = queue_stats.application_key(application)
+    application.status = KYCStatus.FLAGGED.value
+    application.risk_score = 87
+    application.drpa_level = "high"
+    await queue_stats.record_transition(
+        db_session, key, queue_stats.application_key(application)
+    )
+    await db_session.commit()
+    flagged = await stats(status="FLAGGED")
+    assert flagged["by_drpa_level"].get("high", 0) >= 1
+    assert flagged["risk_histogram"][8]["count"] >= 1
+
+    resp = await client.post(
+        f"/review/{app_id}/action", headers=staff_headers, json={"action": "reject"}
+    )
+    assert resp.status_code == 200
+    assert (await stats(status="FLAGGED"))["total"] == flagged["total"] - 1
+
+    # Drift, e.g. from a manual fix in the database, is corrected.
+    await db_session.refresh(application)
+    application.status = KYCStatus.APPROVED.value
+    await db_session.commit()
+    assert await queue_stats.reconcile_counters(db_session) == 2
+    assert await queue_stats.reconcile_counters(db_session) == 0
+    final = await stats()
+    assert final["total"] == after_upload["total"]
+    assert final["by_status"]["APPROVED"] == before["by_status"].get("APPROVED", 0) + 1
@@ -0,0 +1,91 @@
+"""Tests for the local sanctions screening index."""
+
+from __future__ import annotations
+
+import os
+
+import pytest
+
+from app.config import settings
+from app.services import sanctions
+from app.workers import pipeline
+from app.workers.tasks import _process_kyc
+
+LIST = """id,name,aliases
+SDN-1,Viktor Bout,Victor Butt;Boris
+SDN-2,José Martínez Oñate,
+SDN-3,Ali Hassan Al-Majid,
+"""
+
+
+@pytest.fixture
+def index(tmp_path) -> sanctions.SanctionsIndex:
+    path = tmp_path / "sanctions.csv"
+    path.write_text(LIST, encoding="utf-8")
+    return sanctions.SanctionsIndex.from_file(path)
+
+
+def test_matches_typos_accents_and_aliases(index):
+    """Fuzzy token matching finds misspelt, accented and aliased names."""
+
+    assert index.screen("Viktor Bout").score == 1.0
+    assert index.screen("VIKTOR  BOUT.").entry_id == "SDN-1"
+    assert index.screen("Jose Martinez Onate").entry_id == "SDN-2"
+    assert index.screen("Viktr Bout", min_score=0.85).entry_id == "SDN-1"
+    assert index.screen("Ali Hasan al Majid", min_score=0.85).entry_id == "SDN-3"
+    assert index.screen("Victor Butt").entry_id == "SDN-1"
+
+
+def test_rejects_unrelated_and_partial_names(index):
+    """Sharing a single common token with an entry is not a hit."""
+
+    assert index.screen("Demo User", min_score=0.85) is None
+    assert index.screen("Viktor Smith", min_score=0.85) is None
+    assert index.screen("", min_score=0.85) is None
+
+
+def test_screener_hot_reloads_changed_list(tmp_path, monkeypatch):
+    """A rewritten list file replaces the index without a restart."""
+
+    path = tmp_path / "sanctions.csv"
+    path.write_text("id,name\nA,Demo User\n", encoding="utf-8")
+    screener = sanctions.SanctionsScreener(path, check_interval=0)
+    assert screener.screen("Demo User").entry_id == "A"
+
+    path.write_text("id,name\nB,Other Person\n", encoding="utf-8")
+    os.utime(path, ns=(0, path.stat().st_mtime_ns + 1_000_000))
+    monkeypatch.setattr(sanctions.threading, "Thread", _InlineThread)
+    assert screener.screen("Demo User") is None
+    assert screener.screen("Other Persn").entry_id == "B"
+
+
+class _InlineThread:
+    """Run the background reload synchronously."""
+
+    def __init__(self, target, args, **_):
+        self._run = lambda: target(*args)
+
+    def start(self):
+        self._run()
+
+
+@pytest.mark.asyncio
+async def test_pipeline_sends_sanctions_hit(uploaded_application, tmp_path, monkeypatch):
+    """The OCR name is screened and the hit reaches the risk features."""
+
+    path = tmp_path / "sanctions.csv"
+    path.write_text("id,name,aliases\nX-1,Demo Usr,\n", encoding="utf-8")
+    monkeypatch.setattr(settings, "sanctions_list_path", path)
+    monkeypatch.setattr(sanctions, "_screener", None)
+    sent = {}
+    real_risk = pipeline.call_risk_service
+
+    def _capture(application_id, features, meta):
+        sent.update(features)
+        return real_risk(application_id, features, meta=meta)
+
+    monkeypatch.setattr(pipeline, "call_risk_service", _capture)
+
+    app_id = await uploaded_application("sanctions@example.com")
+    await _process_kyc(app_id)
+    assert sent["sanctions_hit"] == 1
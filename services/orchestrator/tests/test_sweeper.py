@@ -0,0 +1,80 @@
+"""Tests for the stuck-application sweeper."""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import select, text
+
+from app import metrics
+from app.config import settings
+from app.models import KYCApplication, KYCStatus, User
+from app.services import sweeper
+from app.workers import tasks
+
+
+@pytest.mark.asyncio
+async def test_sweeper_rescues_stuck_applications(db_session, monkeypatch):
+    """Only applications idle past the threshold and their estimate are re-enqueued, once."""
+
+    enqueued: list[str] = []
+    monkeypatch.setattr(tasks.process_kyc, "delay", enqueued.append)
+    monkeypatch.setattr(settings, "sweeper_batch_size", 2)
+    owner = User(email="sweeper@example.com", password_hash="x")
+    db_session.add(owner)
+    await db_session.flush()
+
+    now = datetime.utcnow()
+    old = now - timedelta(seconds=settings.sweeper_stuck_seconds + 60)
+
+    def application(status: str = KYCStatus.PROCESSING.value, **fields) -> KYCApplication:
+        fields.setdefault("updated_at", old)
+        return KYCApplication(user_id=owner.id, method="doc", status=status, **fields)
+
+    stuck = [application() for _ in range(3)]
+    stuck.append(application(estimated_completion_at=old - timedelta(minutes=5)))
+    fine = [
+        application(updated_at=now),
+        application(estimated_completion_at=now + timedelta(hours=2)),
+        application(status=KYCStatus.FLAGGED.value),
+    ]
+    exhausted = application(rescue_count=settings.sweeper_max_rescues)
+    db_session.add_all([*stuck, *fine, exhausted])
+    await db_session.commit()
+
+    rescued = await tasks._sweep_stuck_applications()
+    assert rescued == len(stuck)
+    assert sorted(enqueued) == sorted(str(app.id) for app in stuck)
+    assert metrics.STUCK_APPLICATIONS_ABANDONED._value.get() == 1
+
+    counts = await db_session.execute(
+        select(KYCApplication.id, KYCApplication.rescue_count).where(
+            KYCApplication.id.in_([app.id for app in stuck + fine])
+        )
+    )
+    assert {app_id: count for app_id, count in counts} == {
+        **{app.id: 1 for app in stuck},
+        **{app.id: 0 for app in fine},
+    }
+
+    # The claim moved updated_at, so a second sweep finds nothing.
+    assert await tasks._sweep_stuck_applications() == 0
+    assert len(enqueued) == len(stuck)
+
+
+@pytest.mark.asyncio
+async def test_sweeper_query_uses_partial_index(db_session):
+    """The watchdog scan is served by idx_applications_processing_updated."""
+
+    query = (
+        select(KYCApplication.id)
+        .where(sweeper._stuck(datetime.utcnow()))
+        .order_by(KYCApplication.updated_at)
+        .limit(100)
+    )
+    compiled = query.compile(
+        dialect=db_session.bind.dialect, compile_kwargs={"literal_binds": True}
+    )
+    plan = await db_session.execute(text(f"EXPLAIN QUERY PLAN {compiled}"))
+    assert "idx_applications_processing_updated" in " ".join(str(row) for row in plan)